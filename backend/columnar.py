@@ -0,0 +1,511 @@
+"""
+Columnar, memory-mapped copies of the large Maharashtra datasets.
+
+Each CSV is converted once into data/columnar/<name>/<version>/: one raw
+native-endian binary file per column, read back with np.memmap, plus meta.json
+describing the columns. A re-ingest writes a new version folder instead of
+replacing files that readers may still have mapped. Text columns are dictionary-encoded (int32 codes + a JSON list of
+strings) and date columns are stored as datetime64[D]. Aggregations scan the
+mapped columns in fixed-size slices and combine them with np.bincount, so no
+rows are ever turned into Python objects.
+
+    python -m backend.columnar ingest [name ...] [--data-dir DIR]
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from .datastore import DATA_DIR, _file_lock
+from .table_query import QueryError, RANGE_OPS
+
+# name -> source CSV and the columns that hold ISO dates
+DATASETS = {
+    'crop_failure': {'csv': 'crop_failure_maharashtra.csv', 'dates': []},
+    'water_stress': {'csv': 'water_stress_maharashtra.csv', 'dates': ['Date']},
+    'active_migrants': {'csv': 'active_migrants_maharashtra.csv', 'dates': ['Migration_Date']},
+    'district_at_risk': {'csv': 'district_at_risk_maharashtra.csv', 'dates': []},
+}
+
+# Named aggregations served by /api/aggregates/<name>; query args may override them
+PRESETS = {
+    'crop_failure_by_district': {
+        'dataset': 'crop_failure',
+        'group_by': 'City_District,Season,Year',
+        'metrics': 'mean:Failure_Rate_Percentage,sum:Affected_Area_Hectares,sum:Economic_Loss_Crores',
+    },
+    'water_stress_by_city_month': {
+        'dataset': 'water_stress',
+        'group_by': 'City,Date:month',
+        'metrics': 'mean:Water_Stress_Index,mean:Availability_Liters_Per_Capita,mean:Demand_Liters_Per_Capita',
+    },
+    'migrants_by_origin_state': {
+        'dataset': 'active_migrants',
+        'group_by': 'Origin_State',
+        'metrics': 'mean:Age',
+    },
+    'risk_by_district_year': {
+        'dataset': 'district_at_risk',
+        'group_by': 'District,Year',
+        'metrics': 'mean:Composite_Risk_Score,max:Composite_Risk_Score',
+    },
+}
+
+METRICS = {'sum', 'mean', 'min', 'max', 'std'}
+DATE_PARTS = {'year', 'month', 'day'}
+INGEST_CHUNK_ROWS = 1_000_000
+# Rows per scan slice; small enough that the slice temporaries stay in cache
+SCAN_CHUNK_ROWS = 1 << 16
+# Upper bound on the dense group-id space used by bincount
+MAX_GROUPS = 1 << 24
+# Version folders kept per dataset: the current one and its predecessor, which
+# readers that opened it before the last ingest may still be scanning
+KEEP_VERSIONS = 2
+
+
+def columnar_dir(data_dir=DATA_DIR):
+    return os.path.join(data_dir, 'columnar')
+
+
+def table_dir(name, data_dir=DATA_DIR):
+    """Folder holding the version folders of one dataset."""
+    return os.path.join(columnar_dir(data_dir), name)
+
+
+def current_version(name, data_dir=DATA_DIR):
+    """The newest complete version folder of `name` (meta.json is written last), or None."""
+    folder = table_dir(name, data_dir)
+    for version in reversed(_versions(folder)):
+        if os.path.exists(os.path.join(folder, version, 'meta.json')):
+            return os.path.join(folder, version)
+    return None
+
+
+def _versions(folder):
+    try:
+        entries = os.listdir(folder)
+    except FileNotFoundError:
+        return []
+    return sorted((e for e in entries if e.isdigit()), key=int)
+
+
+def ingest(name, data_dir=DATA_DIR, chunksize=INGEST_CHUNK_ROWS):
+    """
+    Converts DATASETS[name] to columnar form, reading the CSV in chunks so memory
+    stays bounded. The copy is built in a scratch folder and renamed to the next
+    version; older versions are pruned afterwards. Callers serialize ingests of
+    the same dataset with _file_lock(table_dir(name)).
+    """
+    spec = DATASETS[name]
+    src = os.path.join(data_dir, spec['csv'])
+    folder = table_dir(name, data_dir)
+    os.makedirs(folder, exist_ok=True)
+    tmp = os.path.join(folder, f"tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    st = os.stat(src)
+    columns = {}
+    dictionaries = {}
+    rows = 0
+    for chunk in pd.read_csv(src, chunksize=chunksize, low_memory=False):
+        for col in chunk.columns:
+            meta = columns.get(col)
+            if meta is None:
+                meta = columns[col] = _new_column(col, chunk[col], spec)
+                if meta['kind'] == 'category':
+                    dictionaries[col] = ([], {})
+            values = _encode(col, chunk[col], meta, dictionaries.get(col), tmp)
+            with open(os.path.join(tmp, meta['file']), 'ab') as f:
+                values.tofile(f)
+            _track_range(meta, values)
+        rows += len(chunk)
+
+    for col, (dictionary, _) in dictionaries.items():
+        with open(os.path.join(tmp, columns[col]['dictionary']), 'w', encoding='utf-8') as f:
+            json.dump(dictionary, f)
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'name': name, 'source': spec['csv'], 'source_mtime_ns': st.st_mtime_ns,
+            'source_size': st.st_size, 'rows': rows, 'columns': columns
+        }, f, indent=2)
+
+    versions = _versions(folder)
+    os.replace(tmp, os.path.join(folder, f"{int(versions[-1]) + 1 if versions else 1:08d}"))
+    _prune(folder)
+    return rows
+
+
+def _prune(folder, keep=KEEP_VERSIONS):
+    """
+    Deletes all but the newest `keep` versions, plus leftovers of interrupted
+    ingests. Files still mapped by another process cannot be deleted on Windows;
+    those versions are skipped and retried on the next ingest.
+    """
+    kept = set(_versions(folder)[-keep:])
+    for entry in os.listdir(folder):
+        path = os.path.join(folder, entry)
+        if entry in kept:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _new_column(col, series, spec):
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in col)
+    if col in spec['dates']:
+        return {'kind': 'date', 'dtype': 'datetime64[D]', 'file': f'{safe}.bin'}
+    if pd.api.types.is_bool_dtype(series.dtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+        return {'kind': 'category', 'dtype': 'int32', 'file': f'{safe}.codes.bin',
+                'dictionary': f'{safe}.dict.json'}
+    dtype = 'int64' if pd.api.types.is_integer_dtype(series.dtype) else 'float64'
+    return {'kind': 'numeric', 'dtype': dtype, 'file': f'{safe}.bin'}
+
+
+def _encode(col, series, meta, dictionary, folder):
+    kind = meta['kind']
+    if kind == 'date':
+        return pd.to_datetime(series, errors='coerce', format='ISO8601').to_numpy(dtype='datetime64[D]')
+    if kind == 'category':
+        entries, lookup = dictionary
+        codes, uniques = pd.factorize(series.astype('string'))
+        for value in uniques:
+            if value not in lookup:
+                lookup[value] = len(entries)
+                entries.append(value)
+        mapping = np.array([lookup[v] for v in uniques] + [-1], dtype=np.int32)
+        return mapping[codes]
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        raise ValueError(f"Column '{col}' holds non-numeric values after the first chunk")
+    if meta['dtype'] == 'int64' and not pd.api.types.is_integer_dtype(series.dtype):
+        # A later chunk has decimals or blanks: widen what was written so far
+        path = os.path.join(folder, meta['file'])
+        if os.path.exists(path):
+            np.fromfile(path, dtype=np.int64).astype(np.float64).tofile(path)
+        meta['dtype'] = 'float64'
+    return series.to_numpy(dtype=meta['dtype'])
+
+
+def _track_range(meta, values):
+    # Integer and date ranges let group-by map values onto dense codes; null counts
+    # let scans skip the missing-key mask
+    if meta['kind'] == 'category':
+        meta['nulls'] = meta.get('nulls', 0) + int(np.count_nonzero(values < 0))
+    elif meta['kind'] == 'date':
+        meta['nulls'] = meta.get('nulls', 0) + int(np.count_nonzero(np.isnat(values)))
+    if meta['kind'] == 'date':
+        present = values[~np.isnat(values)]
+        if len(present):
+            lo, hi = str(present.min()), str(present.max())
+            meta['min'] = min(meta.get('min', lo), lo)
+            meta['max'] = max(meta.get('max', hi), hi)
+    elif meta['kind'] == 'numeric' and len(values):
+        with np.errstate(invalid='ignore'):
+            lo, hi = np.nanmin(values), np.nanmax(values)
+        if not np.isnan(lo):
+            lo, hi = lo.item(), hi.item()
+            meta['min'] = min(meta.get('min', lo), lo)
+            meta['max'] = max(meta.get('max', hi), hi)
+
+
+class ColumnarTable:
+    """
+    Read-only view of one version of an ingested dataset; columns are memory-mapped
+    on first use. The maps are released when the table is garbage-collected.
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.rows = self.meta['rows']
+        self.columns = self.meta['columns']
+        self._arrays = {}
+        self._dictionaries = {}
+
+    def array(self, col):
+        if col not in self._arrays:
+            meta = self.column(col)
+            path = os.path.join(self.folder, meta['file'])
+            if self.rows == 0:
+                self._arrays[col] = np.empty(0, dtype=meta['dtype'])
+            else:
+                self._arrays[col] = np.memmap(path, dtype=meta['dtype'], mode='r', shape=(self.rows,))
+        return self._arrays[col]
+
+    def dictionary(self, col):
+        if col not in self._dictionaries:
+            with open(os.path.join(self.folder, self.column(col)['dictionary']), encoding='utf-8') as f:
+                self._dictionaries[col] = np.array(json.load(f), dtype=object)
+        return self._dictionaries[col]
+
+    def column(self, col):
+        if col not in self.columns:
+            raise QueryError(f"Unknown column '{col}'")
+        return self.columns[col]
+
+    def aggregate(self, group_by, metrics, filters=None):
+        """
+        Group-by aggregate over the whole table.
+        group_by: column names; dates may be bucketed as 'Col:year', 'Col:month' or 'Col:day'.
+        metrics: (fn, column) pairs with fn in METRICS; every group also gets 'count'.
+        filters: mapping of 'col' / 'col__gte' style keys to values (comma lists for equality).
+        Returns a DataFrame with one row per non-empty group, ordered by the group keys.
+        """
+        keys = [self._group_key(spec) for spec in group_by]
+        strides = []
+        size = 1
+        for key in reversed(keys):
+            strides.append(size)
+            size *= key['cardinality']
+        strides.reverse()
+        if size > MAX_GROUPS:
+            raise QueryError("Too many groups; narrow group_by")
+        for fn, col in metrics:
+            if fn not in METRICS:
+                raise QueryError(f"Unsupported metric '{fn}'")
+            if self.column(col)['kind'] != 'numeric':
+                raise QueryError(f"Metric column '{col}' is not numeric")
+        conditions = [self._condition(key, value) for key, value in (filters or {}).items()]
+
+        counts = np.zeros(size, dtype=np.int64)
+        acc = {}
+        for _, col in metrics:
+            if col not in acc:
+                # Sums are taken around the column's midpoint to keep std well-conditioned
+                meta = self.columns[col]
+                shift = (meta['min'] + meta['max']) / 2 if 'min' in meta else 0.0
+                acc[col] = {'shift': shift, 'n': np.zeros(size), 'sum': np.zeros(size), 'sumsq': np.zeros(size),
+                            'min': np.full(size, np.inf), 'max': np.full(size, -np.inf)}
+        need_sumsq = {col for fn, col in metrics if fn == 'std'}
+        need_min = {col for fn, col in metrics if fn == 'min'}
+        need_max = {col for fn, col in metrics if fn == 'max'}
+
+        for start in range(0, self.rows, SCAN_CHUNK_ROWS):
+            stop = min(start + SCAN_CHUNK_ROWS, self.rows)
+            ids = np.zeros(stop - start, dtype=np.intp)
+            valid = None
+            for key, stride in zip(keys, strides):
+                codes = key['codes'](start, stop)
+                if key['nullable']:
+                    valid = codes >= 0 if valid is None else valid & (codes >= 0)
+                ids += codes * stride if stride != 1 else codes
+            for condition in conditions:
+                matched = condition(start, stop)
+                valid = matched if valid is None else valid & matched
+            # Fancy-indexing copies, so only filter when something was actually dropped
+            if valid is not None and not valid.all():
+                ids = ids[valid]
+            else:
+                valid = None
+            chunk_counts = np.bincount(ids, minlength=size)
+            counts += chunk_counts
+            for col, a in acc.items():
+                values = np.asarray(self.array(col)[start:stop], dtype=np.float64)
+                if valid is not None:
+                    values = values[valid]
+                gid = ids
+                present = ~np.isnan(values)
+                if present.all():
+                    a['n'] += chunk_counts
+                else:
+                    gid, values = ids[present], values[present]
+                    a['n'] += np.bincount(gid, minlength=size)
+                centered = values - a['shift']
+                a['sum'] += np.bincount(gid, weights=centered, minlength=size)
+                if col in need_sumsq:
+                    a['sumsq'] += np.bincount(gid, weights=centered * centered, minlength=size)
+                if col in need_min:
+                    np.minimum.at(a['min'], gid, values)
+                if col in need_max:
+                    np.maximum.at(a['max'], gid, values)
+
+        groups = np.flatnonzero(counts)
+        result = {}
+        for key, spec, stride in zip(keys, group_by, strides):
+            result[spec] = key['labels']((groups // stride) % key['cardinality'])
+        result['count'] = counts[groups]
+        for fn, col in metrics:
+            a = acc[col]
+            n = a['n'][groups]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if fn == 'sum':
+                    values = a['sum'][groups] + a['shift'] * n
+                elif fn == 'mean':
+                    values = np.where(n > 0, a['sum'][groups] / n + a['shift'], np.nan)
+                elif fn == 'std':
+                    s, ss = a['sum'][groups], a['sumsq'][groups]
+                    values = np.where(n > 1, np.sqrt(np.maximum(ss - s * s / n, 0) / (n - 1)), np.nan)
+                else:
+                    values = np.where(n > 0, a[fn][groups], np.nan)
+            result[f'{fn}_{col}'] = values
+        return pd.DataFrame(result)
+
+    def _group_key(self, spec):
+        col, _, part = spec.partition(':')
+        meta = self.column(col)
+        kind = meta['kind']
+        if kind == 'category':
+            # Dictionary codes are in first-seen order; group on alphabetical rank instead
+            labels = self.dictionary(col)
+            order = np.argsort(labels.astype(str), kind='stable')
+            rank = np.empty(len(labels) + 1, dtype=np.int64)
+            rank[order] = np.arange(len(labels))
+            rank[-1] = -1
+            sorted_labels = labels[order]
+            return {'cardinality': max(len(labels), 1), 'nullable': meta.get('nulls', 1) > 0,
+                    'codes': lambda a, b: rank[self.array(col)[a:b]],
+                    'labels': lambda codes: sorted_labels[codes]}
+        if kind == 'date':
+            if part not in DATE_PARTS:
+                raise QueryError(f"Group dates by one of {sorted(DATE_PARTS)}, e.g. '{col}:month'")
+            unit = {'year': 'Y', 'month': 'M', 'day': 'D'}[part]
+            if 'min' not in meta:
+                return {'cardinality': 1, 'nullable': True, 'codes': lambda a, b: np.full(b - a, -1, dtype=np.int64),
+                        'labels': lambda codes: codes}
+            lo = np.datetime64(meta['min'], unit).astype(np.int64)
+            hi = np.datetime64(meta['max'], unit).astype(np.int64)
+
+            def date_codes(a, b):
+                values = np.asarray(self.array(col)[a:b]).astype(f'datetime64[{unit}]')
+                codes = values.astype(np.int64) - lo
+                codes[np.isnat(values)] = -1
+                return codes
+            fmt = {'year': lambda d: int(str(d)), 'month': str, 'day': str}[part]
+            return {'cardinality': int(hi - lo + 1), 'nullable': meta.get('nulls', 1) > 0, 'codes': date_codes,
+                    'labels': lambda codes: [fmt(d) for d in (codes + lo).astype(f'datetime64[{unit}]')]}
+        if meta['dtype'] != 'int64' or part:
+            raise QueryError(f"Cannot group by '{spec}'")
+        if 'min' not in meta:
+            return {'cardinality': 1, 'nullable': True, 'codes': lambda a, b: np.full(b - a, -1, dtype=np.int64),
+                    'labels': lambda codes: codes}
+        lo, hi = meta['min'], meta['max']
+        if hi - lo + 1 > MAX_GROUPS:
+            raise QueryError(f"Column '{col}' has too wide a range to group by")
+        return {'cardinality': int(hi - lo + 1), 'nullable': False,
+                'codes': lambda a, b: np.asarray(self.array(col)[a:b], dtype=np.int64) - lo,
+                'labels': lambda codes: codes + lo}
+
+    def _condition(self, key, raw):
+        col, _, op = key.partition('__')
+        meta = self.column(col)
+        kind = meta['kind']
+        if op and op not in RANGE_OPS:
+            raise QueryError(f"Unsupported filter operator '{op}'")
+        if kind == 'category':
+            if op:
+                raise QueryError(f"Range filters are not supported on text column '{col}'")
+            lookup = {v: i for i, v in enumerate(self.dictionary(col))}
+            wanted = np.array([lookup[v] for v in raw.split(',') if v in lookup], dtype=np.int32)
+            return lambda a, b: np.isin(self.array(col)[a:b], wanted)
+        try:
+            if kind == 'date':
+                parse = lambda v: np.datetime64(v.strip(), 'D')
+            else:
+                parse = lambda v: np.float64(v)
+            values = [parse(v) for v in raw.split(',')]
+        except ValueError:
+            raise QueryError(f"Invalid value '{raw}' for column '{col}'")
+        if not op:
+            return lambda a, b: np.isin(self.array(col)[a:b], values)
+        compare = {'gte': np.greater_equal, 'gt': np.greater, 'lte': np.less_equal, 'lt': np.less}[op]
+        return lambda a, b: compare(self.array(col)[a:b], values[0])
+
+
+class ColumnarStore:
+    """
+    Opens columnar tables on demand, ingesting (or re-ingesting) a dataset the
+    first time it is needed after its CSV appeared or changed. A columnar copy
+    without its CSV is served as-is.
+    """
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        if name not in DATASETS:
+            raise QueryError(f"Unknown dataset '{name}'")
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None or self._stale(table.meta, name):
+                os.makedirs(columnar_dir(self.data_dir), exist_ok=True)
+                with _file_lock(table_dir(name, self.data_dir)):
+                    folder = current_version(name, self.data_dir)
+                    if folder is None or self._stale(self._read_meta(folder), name):
+                        ingest(name, self.data_dir)
+                        folder = current_version(name, self.data_dir)
+                    table = ColumnarTable(folder)
+                # The previous table is only dropped, never closed: queries still
+                # scanning it keep their maps, and its folder outlives this ingest
+                self._tables[name] = table
+            return table
+
+    def aggregate(self, name, args):
+        """
+        Runs a preset or ad-hoc aggregation from query-string style args:
+        group_by=a,b  metrics=fn:col,...  plus column filters.
+        """
+        params = dict(PRESETS.get(name, {}))
+        for key in args:
+            params[key] = args.get(key)
+        dataset = params.pop('dataset', name)
+        group_by = [g.strip() for g in (params.pop('group_by', '') or '').split(',') if g.strip()]
+        metrics = []
+        for item in (params.pop('metrics', '') or '').split(','):
+            if item.strip():
+                fn, sep, col = item.strip().partition(':')
+                if not sep:
+                    raise QueryError(f"Metrics take the form fn:column, got '{item}'")
+                metrics.append((fn, col))
+        table = self.table(dataset)
+        frame = table.aggregate(group_by, metrics, params)
+        return {
+            "dataset": dataset,
+            "rows_scanned": table.rows,
+            "group_by": group_by,
+            "groups": json.loads(frame.to_json(orient='records', double_precision=15))
+        }
+
+    def _stale(self, meta, name):
+        try:
+            st = os.stat(os.path.join(self.data_dir, DATASETS[name]['csv']))
+        except FileNotFoundError:
+            return False
+        return meta['source_mtime_ns'] != st.st_mtime_ns or meta['source_size'] != st.st_size
+
+    @staticmethod
+    def _read_meta(folder):
+        try:
+            with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the Maharashtra CSVs to columnar storage.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    cmd = sub.add_parser('ingest')
+    cmd.add_argument('names', nargs='*', help=f"datasets to convert (default: all of {', '.join(sorted(DATASETS))})")
+    cmd.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+    os.makedirs(columnar_dir(args.data_dir), exist_ok=True)
+    for name in args.names or sorted(DATASETS):
+        with _file_lock(table_dir(name, args.data_dir)):
+            rows = ingest(name, args.data_dir)
+        print(f"{name}: {rows} rows -> {current_version(name, args.data_dir)}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import os
+import io
+import csv
+import math
+import threading
+import itertools
+import time
+from contextlib import contextmanager
+import pandas as pd
+from .metrics import span
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data')
+
+
+class _Dataset:
+    def __init__(self, df, mtime_ns, size, version):
+        self.df = df
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.version = version
+        self.checked_at = time.monotonic()
+        # Rows appended in-process but not yet concatenated onto df
+        self.pending = []
+        # (version before the append, first appended row) for appends since the last full load
+        self.appends = []
+        self._kinds = None
+
+    def column_kinds(self):
+        """{column: 'text' | 'bool' | 'number' | 'other'} of the frame as read_csv parsed it."""
+        if self._kinds is None:
+            self._kinds = {c: _column_kind(self.df[c]) for c in self.df.columns}
+        return self._kinds
+
+
+def _column_kind(values):
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'number'
+    # Object columns hold text, or booleans mixed with missing values
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred in ('string', 'empty'):
+        return 'text'
+    return 'bool' if inferred == 'boolean' else 'other'
+
+
+def _row_kind(values):
+    """Kind of a freshly parsed column of appended rows; 'empty' fits any column."""
+    if values.isna().all():
+        return 'empty'
+    if pd.api.types.is_bool_dtype(values.dtype) or pd.api.types.infer_dtype(values, skipna=True) == 'boolean':
+        return 'bool'
+    return 'number' if pd.api.types.is_numeric_dtype(values.dtype) else 'other'
+
+
+class DatasetRegistry:
+    """
+    In-memory cache of the CSV datasets under data/.
+    Each file is parsed once and served from memory until its mtime/size
+    changes on disk or the app invalidates it after writing to it.
+    Cached DataFrames are shared between requests and must be treated as read-only.
+    """
+    def __init__(self, data_dir=DATA_DIR, check_interval=1.0):
+        self.data_dir = data_dir
+        # Seconds between stat() calls for the same file; in-app writes bypass this via invalidate()
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._versions = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def path(self, csv_name):
+        return os.path.join(self.data_dir, csv_name)
+
+    def get(self, csv_name):
+        """Returns the DataFrame for csv_name, loading it from disk only when needed."""
+        return self._entry(csv_name).df
+
+    def version(self, csv_name):
+        """Monotonic version number that changes whenever the cached frame is replaced."""
+        return self._entry(csv_name).version
+
+    def snapshot(self, csv_name):
+        """Returns (df, version) taken together, for consumers that track versions."""
+        with self._lock:
+            entry = self._entry(csv_name)
+            return entry.df, entry.version
+
+    def appended_since(self, csv_name, version):
+        """
+        If csv_name only grew by appended rows since `version`, returns the position
+        of the first new row (== len(df) when nothing changed); otherwise None,
+        meaning consumers must rebuild from the full frame.
+        """
+        with self._lock:
+            entry = self._entry(csv_name)
+            if version == entry.version:
+                return len(entry.df)
+            for before, start in entry.appends:
+                if before == version:
+                    return start
+            return None
+
+    def absorb_append(self, csv_name, header_text, row_text, before, after):
+        """
+        Applies a row that RunStore appended to the file onto the cached frame
+        without re-reading the file. Only valid when the cache matched the file
+        (stat `before`) prior to the write; otherwise the entry is invalidated.
+        """
+        with self._lock:
+            entry = self._entries.get(csv_name)
+            if entry is None or entry.mtime_ns != before.st_mtime_ns or entry.size != before.st_size:
+                self.invalidate(csv_name)
+                return
+            # Parse the new row the way a full reload would: text columns stay text, the
+            # rest is inferred and must fit the column's kind, else the whole column would
+            # parse differently and the file is re-read instead
+            kinds = entry.column_kinds()
+            row = pd.read_csv(io.StringIO(header_text + row_text),
+                              dtype={c: str for c, kind in kinds.items() if kind == 'text'})
+            if any(c not in kinds or kinds[c] == 'other' or _row_kind(row[c]) not in (kinds[c], 'empty')
+                   for c in row.columns if kinds.get(c) != 'text'):
+                self.invalidate(csv_name)
+                return
+            start = len(entry.df) + sum(len(r) for r in entry.pending)
+            entry.pending.append(row)
+            entry.appends = (entry.appends + [(entry.version, start)])[-64:]
+            entry.version = next(self._versions)
+            entry.mtime_ns = after.st_mtime_ns
+            entry.size = after.st_size
+            entry.checked_at = time.monotonic()
+
+    def invalidate(self, csv_name):
+        """Forces the next access to re-read csv_name (used after in-app writes)."""
+        with self._lock:
+            entry = self._entries.get(csv_name)
+            if entry is not None:
+                entry.mtime_ns = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "files": {
+                    name: {"version": e.version, "rows": int(len(e.df)), "size_bytes": e.size}
+                    for name, e in self._entries.items()
+                }
+            }
+
+    def _entry(self, csv_name):
+        with self._lock:
+            entry = self._entries.get(csv_name)
+            if entry is not None and entry.pending:
+                entry.df = pd.concat([entry.df] + entry.pending, ignore_index=True)
+                entry.pending = []
+            now = time.monotonic()
+            if entry is not None and entry.mtime_ns is not None and now - entry.checked_at < self.check_interval:
+                self.hits += 1
+                return entry
+
+            st = os.stat(self.path(csv_name))
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                entry.checked_at = now
+                self.hits += 1
+                return entry
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+            with span('csv_load', csv_name) as load:
+                df = pd.read_csv(self.path(csv_name))
+                load.rows = len(df)
+            entry = _Dataset(df, st.st_mtime_ns, st.st_size, next(self._versions))
+            self._entries[csv_name] = entry
+            return entry
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive cross-process lock held on a sidecar <path>.lock file."""
+    with open(path + '.lock', 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _csv_value(value):
+    # Mirrors DataFrame.to_csv: missing values become empty fields
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return value
+
+
+class RunStore:
+    """
+    Append-only writer for the history CSVs (simulation_runs, causal_certificates, ...).
+    A record is appended as a single CSV row under a thread lock plus an OS file
+    lock, so concurrent requests (or worker processes) never lose rows and the
+    cost of a write does not grow with the history size.
+    """
+    def __init__(self, datasets):
+        self.datasets = datasets
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def append(self, csv_name, record):
+        path = self.datasets.path(csv_name)
+        with self._lock_for(csv_name), _file_lock(path):
+            with open(path, 'rb') as f:
+                header_line = f.readline()
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size > len(header_line):
+                    f.seek(size - 1)
+                    ends_with_newline = f.read(1) == b'\n'
+                else:
+                    ends_with_newline = header_line.endswith(b'\n')
+
+            newline = '\r\n' if header_line.endswith(b'\r\n') else '\n'
+            header = next(csv.reader([header_line.decode('utf-8').rstrip('\r\n')]))
+
+            if not set(record).issubset(header):
+                # New columns change the header, which needs a full rewrite (rare)
+                self._rewrite_with(csv_name, path, record, newline)
+                self.datasets.invalidate(csv_name)
+                return record
+
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator=newline)
+            writer.writerow([_csv_value(record.get(col)) for col in header])
+            row_text = buf.getvalue()
+            before = os.stat(path)
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                if not ends_with_newline:
+                    f.write(newline)
+                f.write(row_text)
+            self.datasets.absorb_append(csv_name, header_line.decode('utf-8'), row_text, before, os.stat(path))
+
+        return record
+
+    def _rewrite_with(self, csv_name, path, record, newline='\n'):
+        df = pd.read_csv(path)
+        df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
+        # Keep the file's line endings, as appends do
+        df.to_csv(path, index=False, lineterminator=newline)
+
+    def _lock_for(self, csv_name):
+        with self._locks_guard:
+            if csv_name not in self._locks:
+                self._locks[csv_name] = threading.Lock()
+            return self._locks[csv_name]
@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import uuid
+import threading
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import wait as wait_for
+from .datastore import DATA_DIR
+from .tasks import JOB_KINDS, run_job
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process address-space limit
+    resource = None
+
+TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+
+# Defaults for JobQueue; each job runs in its own process
+MAX_CONCURRENT_JOBS = 2
+JOB_TIME_LIMIT = 15 * 60
+JOB_MEMORY_LIMIT_MB = 4096
+# Seconds a terminated job process gets to exit before it is killed
+JOB_STOP_TIMEOUT = 5.0
+# Finished jobs kept on disk (oldest are pruned at startup)
+MAX_JOB_HISTORY = 500
+
+
+class JobError(ValueError):
+    """Raised for invalid job submissions; routes answer these with 400."""
+
+
+def _job_main(kind, data_dir, params, conn, result_path, memory_limit_mb):
+    """
+    Body of a job process: runs the task, writes its result file, reports over conn.
+    The memory limit is an RLIMIT_AS cap, so it is only enforced on POSIX systems.
+    """
+    if resource is not None and memory_limit_mb:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    def progress(fraction, message=None):
+        conn.send(('progress', float(fraction), message))
+
+    try:
+        result = run_job(kind, data_dir, params, progress)
+        tmp = result_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp, result_path)
+        conn.send(('done',))
+    except MemoryError:
+        conn.send(('error', f'Memory limit exceeded ({memory_limit_mb} MB)'))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+
+def _stop(running, timeout=JOB_STOP_TIMEOUT):
+    """Terminates a job process and reaps it, killing it if it has not exited within timeout."""
+    process = running['process']
+    process.terminate()
+    process.join(timeout)
+    if process.is_alive():
+        process.kill()
+        process.join()
+    running['conn'].close()
+
+
+class JobQueue:
+    """
+    Local background jobs for long simulations and discovery runs.
+    Jobs wait in a FIFO queue and at most `max_workers` run at once, each in its own
+    process so it can be time-limited, memory-limited and cancelled outright. Job
+    state and results are written under data/jobs/, so finished results survive a
+    restart and queued jobs are picked up again.
+
+    memory_limit_mb caps each job's address space through RLIMIT_AS, which only
+    exists on POSIX; on Windows jobs run without a memory limit.
+    """
+    def __init__(self, data_dir=DATA_DIR, max_workers=MAX_CONCURRENT_JOBS,
+                 time_limit=JOB_TIME_LIMIT, memory_limit_mb=JOB_MEMORY_LIMIT_MB):
+        self.data_dir = data_dir
+        self.jobs_dir = os.path.join(data_dir, 'jobs')
+        self.max_workers = max_workers
+        self.time_limit = time_limit
+        self.memory_limit_mb = memory_limit_mb
+        self._jobs = {}
+        self._pending = deque()
+        self._running = {}
+        self._saved_at = {}
+        self._cond = threading.Condition()
+        self._dispatcher = None
+        self._stopped = False
+        # spawn: job processes must not inherit the server's threads and locks
+        self._context = multiprocessing.get_context('spawn')
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._load()
+
+    def submit(self, kind, params=None):
+        if kind not in JOB_KINDS:
+            raise JobError(f"Unknown job kind '{kind}' (expected one of {', '.join(JOB_KINDS)})")
+        now = datetime.now().isoformat()
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "params": params or {},
+            "status": "queued",
+            "progress": 0.0,
+            "message": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "revision": 0
+        }
+        with self._cond:
+            self._jobs[job['id']] = job
+            self._pending.append(job['id'])
+            self._save(job, force=True)
+            self._ensure_dispatcher()
+            self._cond.notify_all()
+            return dict(job)
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self, limit=100):
+        with self._cond:
+            jobs = sorted(self._jobs.values(), key=lambda j: j['created_at'], reverse=True)
+            return [dict(j) for j in jobs[:limit]]
+
+    def result_path(self, job_id):
+        return os.path.join(self.jobs_dir, f'{job_id}.result.json')
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job; returns its state, or None if unknown."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] in TERMINAL_STATES:
+                return dict(job) if job else None
+            if job_id in self._pending:
+                self._pending.remove(job_id)
+            running = self._running.pop(job_id, None)
+            self._finish(job, 'cancelled', error=None)
+            state = dict(job)
+        if running is not None:
+            _stop(running)
+        return state
+
+    def wait(self, job_id, revision, timeout):
+        """Blocks until the job's revision differs from `revision` (or timeout); returns its state."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job['revision'] != revision:
+                    return dict(job) if job else None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return dict(job)
+                self._cond.wait(remaining)
+
+    def stats(self):
+        with self._cond:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return {"max_workers": self.max_workers, "running": len(self._running),
+                    "queued": len(self._pending), "by_status": counts}
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            stopping = list(self._running.values())
+            self._running.clear()
+            self._cond.notify_all()
+        for running in stopping:
+            _stop(running)
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch, name='job-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                while self._pending and len(self._running) < self.max_workers:
+                    self._start(self._jobs[self._pending.popleft()])
+                if not self._running:
+                    self._cond.wait(1.0)
+                    continue
+                waitables = [r['conn'] for r in self._running.values()] + \
+                            [r['process'].sentinel for r in self._running.values()]
+
+            wait_for(waitables, timeout=0.5)
+
+            timed_out = []
+            with self._cond:
+                now = time.monotonic()
+                for job_id, running in list(self._running.items()):
+                    job = self._jobs[job_id]
+                    self._drain(job, running)
+                    process = running['process']
+                    if self.time_limit and now - running['started'] > self.time_limit:
+                        timed_out.append(self._running.pop(job_id))
+                        self._finish(job, 'failed', error=f'Time limit exceeded ({self.time_limit}s)')
+                    elif not process.is_alive():
+                        process.join()
+                        self._drain(job, running)
+                        self._running.pop(job_id)
+                        if running['outcome'] == ('done',):
+                            self._finish(job, 'completed')
+                        elif running['outcome'] is not None:
+                            self._finish(job, 'failed', error=running['outcome'][1])
+                        else:
+                            self._finish(job, 'failed', error=f'Job process exited with code {process.exitcode}')
+                        running['conn'].close()
+            # Stopped outside the lock, which a slow exit would otherwise hold
+            for running in timed_out:
+                _stop(running)
+
+    def _start(self, job):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_job_main,
+            args=(job['kind'], self.data_dir, job['params'], child_conn,
+                  self.result_path(job['id']), self.memory_limit_mb),
+            name=f"job-{job['id']}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._running[job['id']] = {"process": process, "conn": parent_conn,
+                                    "started": time.monotonic(), "outcome": None}
+        job['status'] = 'running'
+        job['started_at'] = datetime.now().isoformat()
+        self._touch(job, force=True)
+
+    def _drain(self, job, running):
+        conn = running['conn']
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message[0] == 'progress':
+                    job['progress'] = round(min(max(message[1], 0.0), 1.0), 4)
+                    job['message'] = message[2]
+                    self._touch(job)
+                else:
+                    running['outcome'] = message
+        except (EOFError, OSError):
+            pass
+
+    def _finish(self, job, status, error=None):
+        job['status'] = status
+        job['error'] = error
+        job['finished_at'] = datetime.now().isoformat()
+        if status == 'completed':
+            job['progress'] = 1.0
+        self._touch(job, force=True)
+
+    def _touch(self, job, force=False):
+        job['revision'] += 1
+        self._save(job, force)
+        self._cond.notify_all()
+
+    def _save(self, job, force=False):
+        # Progress ticks are persisted at most twice a second; state changes always
+        now = time.monotonic()
+        if not force and now - self._saved_at.get(job['id'], 0) < 0.5:
+            return
+        self._saved_at[job['id']] = now
+        path = os.path.join(self.jobs_dir, f"{job['id']}.json")
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(path + '.tmp', path)
+
+    def _load(self):
+        jobs = []
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith('.json') or name.endswith('.result.json'):
+                continue
+            try:
+                with open(os.path.join(self.jobs_dir, name), encoding='utf-8') as f:
+                    jobs.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        jobs.sort(key=lambda j: j['created_at'])
+
+        finished = [j for j in jobs if j['status'] in TERMINAL_STATES]
+        for job in finished[:max(0, len(finished) - MAX_JOB_HISTORY)]:
+            for path in (os.path.join(self.jobs_dir, f"{job['id']}.json"), self.result_path(job['id'])):
+                if os.path.exists(path):
+                    os.remove(path)
+            jobs.remove(job)
+
+        with self._cond:
+            for job in jobs:
+                self._jobs[job['id']] = job
+                if job['status'] == 'queued':
+                    self._pending.append(job['id'])
+                elif job['status'] == 'running':
+                    # Its process died with the previous server; it may have recorded side effects
+                    self._finish(job, 'failed', error='Interrupted by a server restart')
+            if self._pending:
+                self._ensure_dispatcher()
@@ -0,0 +1,98 @@
+import json
+import threading
+from collections import OrderedDict
+
+# Defaults for ResultMemo: entry count and total (approximate) encoded size
+MAX_MEMO_ENTRIES = 512
+MAX_MEMO_BYTES = 64 * 1024 * 1024
+
+
+def _sizeof(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_sizeof(v) for v in value)
+    return len(json.dumps(value, default=str))
+
+
+class ResultMemo:
+    """
+    LRU cache of computed results keyed by (dataset, dataset version, parameter key).
+    A result is reused only while its dataset version is current, so editing the CSV
+    invalidates it; entries of older versions are dropped as soon as a newer one is
+    stored. Bounded both by entry count and by the total encoded size of the values.
+    """
+    def __init__(self, datasets, max_entries=MAX_MEMO_ENTRIES, max_bytes=MAX_MEMO_BYTES):
+        self.datasets = datasets
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._current = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, csv_name, key, compute, sizeof=_sizeof):
+        """
+        Returns the cached value for key under csv_name's current version; on a miss
+        calls compute(df) with the DataFrame of exactly that version.
+        """
+        df, version = self.datasets.snapshot(csv_name)
+        full_key = (csv_name, version, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute(df)
+        nbytes = sizeof(value)
+        if nbytes > self.max_bytes:
+            return value
+
+        with self._lock:
+            current = self._current.get(csv_name)
+            if current is not None and version < current:
+                # Computed from data that changed meanwhile
+                return value
+            if current is not None and version > current:
+                self._drop_stale(csv_name, version)
+            self._current[csv_name] = version
+            previous = self._entries.pop(full_key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[full_key] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes
+            }
+
+    def _drop_stale(self, csv_name, version):
+        for full_key in [k for k in self._entries if k[0] == csv_name and k[1] != version]:
+            self._bytes -= self._entries.pop(full_key)[1]
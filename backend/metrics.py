@@ -0,0 +1,253 @@
+"""
+In-process instrumentation: latency histograms and counters rendered in the
+Prometheus text exposition format (served at /api/metrics), timing spans for the
+expensive stages of a request, and an opt-in sampling profiler for slow requests.
+"""
+import os
+import sys
+import time
+import bisect
+import functools
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from flask import g, request
+from flask.json.provider import DefaultJSONProvider
+
+PREFIX = 'futureweaver'
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe histograms and counters, keyed by metric name and label set.
+    render() also takes collectors: callables yielding values computed at scrape
+    time (cache statistics, queue sizes) as (name, type, help, labels, value) tuples.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._help = {}
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def describe(self, metric, kind, help_text):
+        self._help[metric] = (kind, help_text)
+
+    def observe(self, metric, value, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            hist[0][index] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def inc(self, metric, amount=1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def render(self, collectors=()):
+        """Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self._histograms.items()}
+            counters = dict(self._counters)
+
+        families = {}
+        for (name, labels), value in counters.items():
+            families.setdefault(name, []).append((labels, value))
+        for (name, labels), value in histograms.items():
+            families.setdefault(name, []).append((labels, value))
+        collected = {}
+        for collect in collectors:
+            for name, kind, help_text, labels, value in collect():
+                self._help.setdefault(name, (kind, help_text))
+                collected.setdefault(name, []).append((tuple(sorted(labels.items())), value))
+        families.update(collected)
+
+        lines = []
+        for name in sorted(families):
+            kind, help_text = self._help.get(name, ('untyped', ''))
+            full = f'{PREFIX}_{name}'
+            lines.append(f'# HELP {full} {help_text}')
+            lines.append(f'# TYPE {full} {kind}')
+            for labels, value in sorted(families[name], key=lambda item: item[0]):
+                if kind != 'histogram':
+                    lines.append(f'{full}{_labels(labels)} {_number(value)}')
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += n
+                    lines.append(f'{full}_bucket{_labels(labels, ("le", _number(float(bound))))} {cumulative}')
+                lines.append(f'{full}_sum{_labels(labels)} {_number(total)}')
+                lines.append(f'{full}_count{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry, shared by the instrumented modules and every app instance
+METRICS = MetricsRegistry()
+METRICS.describe('http_request_duration_seconds', 'histogram', 'Request latency by route.')
+METRICS.describe('http_requests_total', 'counter', 'Requests by route and status code.')
+METRICS.describe('http_request_errors_total', 'counter', 'Requests answered with a 5xx status.')
+METRICS.describe('span_duration_seconds', 'histogram', 'Time spent in CSV load, model compute and JSON serialization.')
+METRICS.describe('rows_processed_total', 'counter', 'Rows read or processed, by span.')
+METRICS.describe('slow_request_profiles_total', 'counter', 'Stack profiles written for slow requests.')
+
+
+class _Span:
+    def __init__(self):
+        self.rows = None
+
+
+@contextmanager
+def span(stage, name, rows=None):
+    """
+    Times a stage ('csv_load', 'model_compute', 'json_serialize') of the current request.
+    Set `.rows` on the yielded object (or pass rows=) to count the rows it processed.
+    """
+    current = _Span()
+    current.rows = rows
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        METRICS.observe('span_duration_seconds', time.perf_counter() - start, stage=stage, name=name)
+        if current.rows:
+            METRICS.inc('rows_processed_total', int(current.rows), stage=stage, name=name)
+
+
+def timed_compute(method):
+    """Decorator for model entry points: a 'model_compute' span counting len(self.df) rows."""
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with span('model_compute', name, rows=len(self.df)):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class InstrumentedJSONProvider(DefaultJSONProvider):
+    """Flask's default JSON provider with jsonify()/json.dumps timed as a serialization span."""
+    def dumps(self, obj, **kwargs):
+        with span('json_serialize', 'jsonify'):
+            return super().dumps(obj, **kwargs)
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler. While requests are in flight a daemon thread samples
+    their Python stacks every `interval` seconds; when a request takes longer than
+    `threshold` seconds its samples are written to out_dir as folded stacks
+    ("frame;frame;frame count" lines), the input format of flamegraph.pl, inferno
+    and speedscope.
+    """
+    def __init__(self, out_dir, threshold=0.5, interval=0.005):
+        self.out_dir = out_dir
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def begin(self):
+        with self._cond:
+            self._active[threading.get_ident()] = {}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name='slow-request-profiler', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def end(self, label, duration):
+        """Stops sampling the calling thread; returns the profile path if one was written."""
+        with self._cond:
+            samples = self._active.pop(threading.get_ident(), None)
+        if not samples or duration < self.threshold:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        safe = ''.join(c if c.isalnum() else '_' for c in label).strip('_') or 'root'
+        path = os.path.join(
+            self.out_dir, f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{safe}-{int(duration * 1000)}ms.folded"
+        )
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+                f.write(f"{';'.join(stack)} {count}\n")
+        METRICS.inc('slow_request_profiles_total', route=label)
+        return path
+
+    def _sample(self):
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+                frames = sys._current_frames()
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                        frame = frame.f_back
+                    if stack:
+                        key = tuple(reversed(stack))
+                        samples[key] = samples.get(key, 0) + 1
+                del frames
+            time.sleep(self.interval)
+
+
+def instrument_app(app, profiler=None):
+    """Records latency, status and error counts for every request of `app`."""
+    app.json = InstrumentedJSONProvider(app)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        if profiler is not None:
+            profiler.begin()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        duration = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        METRICS.observe('http_request_duration_seconds', duration, method=request.method, route=route)
+        METRICS.inc('http_requests_total', method=request.method, route=route, status=response.status_code)
+        if response.status_code >= 500:
+            METRICS.inc('http_request_errors_total', method=request.method, route=route)
+        if profiler is not None:
+            profiler.end(f'{request.method} {route}', duration)
+        return response
+
+    if profiler is not None:
+        @app.teardown_request
+        def _stop_sampling(exc):
+            # No-op unless after_request was skipped
+            profiler.end(None, 0.0)
+
+    return app
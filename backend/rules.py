@@ -0,0 +1,263 @@
+"""
+Declarative recommendation rules over district columns, evaluated for every
+district at once, plus partial-selection top-k rankings kept up to date as
+districts are appended.
+"""
+import copy
+import threading
+import numpy as np
+
+# Each rule fires for a district when all `when` conditions hold; its score
+# (intercept + weighted columns, roughly 0-100) ranks it against other rules.
+RECOMMENDATION_RULES = [
+    {
+        "id": "emergency_irrigation",
+        "title": "Emergency Irrigation",
+        "priority": "High",
+        "impact": "High",
+        "cost": "₹450 Cr",
+        "when": [("drought_index", ">=", 75)],
+        "score": {"drought_index": 1.0},
+        "description": "Critical drought index ({drought_index:g}). Redirect funds to immediate micro-irrigation deployment."
+    },
+    {
+        "id": "water_grid",
+        "title": "Cross-District Water Grid",
+        "priority": "Medium",
+        "impact": "Medium",
+        "cost": "₹1200 Cr",
+        "when": [("water_stress_index", ">=", 70)],
+        "score": {"water_stress_index": 1.0},
+        "description": "Water stress at {water_stress_index:g}%. Connect to a regional grid with lower-stress neighbours."
+    },
+    {
+        "id": "social_safety_net",
+        "title": "Targeted Social Safety Net",
+        "priority": "High",
+        "impact": "High",
+        "cost": "₹320 Cr",
+        "when": [("marginalized_pop_pct", ">=", 30)],
+        "score": {"marginalized_pop_pct": 2.5},
+        "description": "{marginalized_pop_pct:g}% marginalized population. Prioritize targeted income and food support."
+    },
+    {
+        "id": "crop_insurance",
+        "title": "Crop Insurance Expansion",
+        "priority": "Medium",
+        "impact": "Medium",
+        "cost": "₹280 Cr",
+        "when": [("crop_failure_rate", ">=", 50)],
+        "score": {"crop_failure_rate": 1.25},
+        "description": "Crop failure rate of {crop_failure_rate:g}%. Expand weather-indexed crop insurance coverage."
+    },
+    {
+        "id": "migration_stabilization",
+        "title": "Rural Livelihood Stabilization",
+        "priority": "High",
+        "impact": "High",
+        "cost": "₹600 Cr",
+        "when": [("net_migration", "<=", -8000)],
+        "score": {"net_migration": -1 / 150},
+        "description": "Net out-migration of {net_migration:g}. Fund local employment schemes to stabilize households."
+    },
+    {
+        "id": "elderly_heat_care",
+        "title": "Elderly Heat and Drought Care",
+        "priority": "Medium",
+        "impact": "Medium",
+        "cost": "₹150 Cr",
+        "when": [("elderly_pop_pct", ">=", 15), ("drought_index", ">=", 60)],
+        "score": {"elderly_pop_pct": 2.5, "drought_index": 0.4},
+        "description": "{elderly_pop_pct:g}% elderly population under drought index {drought_index:g}. Deploy cooling and water points."
+    }
+]
+
+# Values per block when bounding the k-th largest value by block maxima
+TOPK_BLOCK = 64
+# Added to a rule's scores: -inf where it did not fire, 0 where it did
+_FIRED_OFFSET = np.array([-np.inf, 0.0])
+
+_OPS = {
+    '>=': np.greater_equal, '>': np.greater, '<=': np.less_equal, '<': np.less, '==': np.equal
+}
+
+
+class TopK:
+    """
+    Positions of the k largest values (ties: earlier position first) found by
+    partial selection; extend() folds in appended values without re-ranking the rest.
+    NaN and -inf (a rule that did not fire) never rank.
+    """
+    def __init__(self, values, k):
+        self.k = k
+        self.positions = np.empty(0, dtype=np.intp)
+        self.values = np.empty(0)
+        self._n = 0
+        self.extend(values)
+
+    def extend(self, values):
+        values = np.fmax(np.asarray(values, dtype=np.float64), -np.inf)
+        offset, self._n = self._n, self._n + len(values)
+        candidates, candidate_values = self._candidates(values)
+        kth = -np.inf
+        if len(candidates) > self.k:
+            kth = np.partition(candidate_values, len(candidates) - self.k)[len(candidates) - self.k]
+        keep = candidates[candidate_values > kth]
+        if kth > -np.inf:
+            # Equal values: earliest positions first, no more than fit
+            keep = np.concatenate([keep, candidates[candidate_values == kth][:self.k - len(keep)]])
+        positions = np.concatenate([self.positions, keep + offset])
+        values = np.concatenate([self.values, values[keep]])
+        order = np.lexsort((positions, -values))[:self.k]
+        self.positions, self.values = positions[order], values[order]
+
+    def _candidates(self, values):
+        """
+        A superset of the top k: the k-th largest of the block maxima is a lower bound
+        of the k-th largest value, and leaves few candidates to select from exactly.
+        (Partitioning the full column is slow when it holds many duplicates.)
+        """
+        n_blocks = len(values) // TOPK_BLOCK
+        if n_blocks < 2 * self.k:
+            return np.arange(len(values)), values
+        # Any split into disjoint blocks gives a bound; strided blocks (every
+        # n_blocks-th value) reduce with element-wise maxima, far faster than per-row max
+        block_max = values[:n_blocks * TOPK_BLOCK].reshape(TOPK_BLOCK, n_blocks).max(axis=0)
+        bound = np.partition(block_max, n_blocks - self.k)[n_blocks - self.k]
+        candidates = np.flatnonzero(values >= bound if bound > -np.inf else values > bound)
+        return candidates, values[candidates]
+
+
+class RuleSet:
+    """
+    Compiles rules into a weight matrix and a list of column conditions, so that
+    evaluate() scores every rule for every district with one matrix product and
+    one vectorized comparison per condition.
+    Rules referring to columns the frame does not have are dropped.
+    """
+    def __init__(self, rules, columns):
+        self.rules = [r for r in rules
+                      if all(c in columns for c, _, _ in r['when']) and all(c in columns for c in r['score'])]
+        self.columns = sorted({c for r in self.rules for c in list(r['score']) + [c for c, _, _ in r['when']]})
+        col = {c: i for i, c in enumerate(self.columns)}
+        n_rules = len(self.rules)
+
+        self.weights = np.zeros((len(self.columns), n_rules))
+        self.intercepts = np.zeros(n_rules)
+        conditions = [(col[c], op, float(v), j) for j, r in enumerate(self.rules) for c, op, v in r['when']]
+        for j, rule in enumerate(self.rules):
+            for c, w in rule['score'].items():
+                self.weights[col[c], j] = w
+            self.intercepts[j] = rule.get('intercept', 0.0)
+        self.cond_cols = [c for c, _, _, _ in conditions]
+        self.cond_ops = [op for _, op, _, _ in conditions]
+        self.cond_values = [v for _, _, v, _ in conditions]
+        self.cond_rule = [j for _, _, _, j in conditions]
+
+    def matrix(self, df):
+        """Rule columns of df as a column-major float matrix, filled column by column."""
+        X = np.empty((len(df), len(self.columns)), order='F')
+        for i, c in enumerate(self.columns):
+            X[:, i] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        return X
+
+    def evaluate(self, X):
+        """(scores, fired) for an (n, len(columns)) matrix; scores are -inf where a rule does not fire."""
+        # Column-major, so that each rule's column and the per-district reductions are contiguous
+        fired = np.ones((len(X), len(self.rules)), dtype=bool, order='F')
+        for col, op, value, rule in zip(self.cond_cols, self.cond_ops, self.cond_values, self.cond_rule):
+            fired[:, rule] &= _OPS[op](X[:, col], value)
+        scores = np.empty((len(X), len(self.rules)), order='F')
+        np.matmul(X, self.weights, out=scores)
+        scores += self.intercepts
+        fired &= scores == scores
+        # A table lookup instead of np.where, which branches on every element
+        flat = scores.ravel(order='F')
+        flat += _FIRED_OFFSET.take(fired.ravel(order='F').view(np.uint8))
+        return scores, fired
+
+
+class RuleState:
+    """
+    Rule scores of every district of one dataset version, the best score per district,
+    and top-k rankings: per rule column (largest values) and per rule (highest scores).
+    """
+    def __init__(self, ruleset, df, k=10):
+        self.ruleset = ruleset
+        self.k = k
+        X = ruleset.matrix(df)
+        self.scores, self.fired = ruleset.evaluate(X)
+        self.best = self.scores.max(axis=1) if len(ruleset.rules) else np.full(len(X), -np.inf)
+        self.column_top = {c: TopK(X[:, i], k) for i, c in enumerate(ruleset.columns)}
+        self.rule_top = {r['id']: TopK(self.scores[:, j], k) for j, r in enumerate(ruleset.rules)}
+
+    def copy(self):
+        state = copy.copy(self)
+        state.column_top = {c: copy.copy(top) for c, top in self.column_top.items()}
+        state.rule_top = {r: copy.copy(top) for r, top in self.rule_top.items()}
+        return state
+
+    def extend(self, new_rows):
+        """Folds appended district rows in; existing rows are not re-evaluated."""
+        X = self.ruleset.matrix(new_rows)
+        scores, fired = self.ruleset.evaluate(X)
+        self.scores = np.concatenate([self.scores, scores])
+        self.fired = np.concatenate([self.fired, fired])
+        self.best = np.concatenate([self.best, scores.max(axis=1) if len(self.ruleset.rules) else np.full(len(X), -np.inf)])
+        for i, c in enumerate(self.ruleset.columns):
+            self.column_top[c].extend(X[:, i])
+        for j, r in enumerate(self.ruleset.rules):
+            self.rule_top[r['id']].extend(scores[:, j])
+
+    def ranked(self, positions):
+        """Fired rule indices of each district in `positions`, best score first."""
+        scores = self.scores[positions]
+        order = np.argsort(-scores, axis=1, kind='stable')
+        counts = self.fired[positions].sum(axis=1)
+        return [row[:count] for row, count in zip(order.tolist(), counts.tolist())]
+
+    def leading(self, limit, offset=0, rule_index=None):
+        """Positions of districts with at least one fired rule (or `rule_index`), by best score, paged."""
+        scores = self.best if rule_index is None else self.scores[:, rule_index]
+        candidates = np.flatnonzero(np.isfinite(scores))
+        total = len(candidates)
+        wanted = min(offset + limit, total)
+        if wanted <= 0:
+            return candidates[:0], total
+        if wanted < total:
+            part = np.argpartition(-scores[candidates], wanted - 1)[:wanted]
+            candidates = candidates[part]
+        ordered = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return ordered[offset:offset + limit], total
+
+
+class RuleIndex:
+    """
+    RuleState per districts.csv version. Appended districts are evaluated and merged
+    into the previous state; any other change re-evaluates the whole frame.
+    """
+    def __init__(self, datasets, csv_name='districts.csv', rules=RECOMMENDATION_RULES, k=10):
+        self.datasets = datasets
+        self.csv_name = csv_name
+        self.rules = rules
+        self.k = k
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def state(self):
+        """(df, RuleState) for the current version of the districts dataset."""
+        with self._lock:
+            df, version = self.datasets.snapshot(self.csv_name)
+            if self._entry is not None and self._entry[0] == version:
+                return df, self._entry[1]
+            start = None
+            if self._entry is not None:
+                start = self.datasets.appended_since(self.csv_name, self._entry[0])
+            if start is not None and start <= len(df) and start == len(self._entry[1].best):
+                # Readers may still hold the previous state
+                state = self._entry[1].copy()
+                state.extend(df.iloc[start:])
+            else:
+                state = RuleState(RuleSet(self.rules, df.columns), df, self.k)
+            self._entry = (version, state)
+            return df, state
@@ -0,0 +1,130 @@
+import threading
+import numpy as np
+import pandas as pd
+from .serialization import encode_record_lines
+
+
+class ScorecardIndex:
+    """
+    district_id -> resilience score rows, built with a single groupby instead of
+    per-row Python loops. Score rows are kept pre-encoded as JSON so a scorecard
+    is assembled by joining bytes. Kept in sync with the registry: appended score
+    rows are added incrementally, any other change rebuilds the index.
+    """
+    def __init__(self, datasets, districts_csv='districts.csv', scores_csv='resilience_scores.csv'):
+        self.datasets = datasets
+        self.districts_csv = districts_csv
+        self.scores_csv = scores_csv
+        self._lock = threading.Lock()
+        self._scores_version = None
+        self._districts_version = None
+        self._districts = []
+        self._full = None
+
+    def scorecard_json(self, latest_only=False, date_from=None, date_to=None):
+        """
+        JSON array with one object per district and its 'resilience_scores' list
+        (in file order), as bytes. latest_only keeps only the most recent score
+        per district; date_from/date_to (inclusive, ISO dates) filter on score_date.
+        """
+        with self._lock:
+            self._refresh()
+            if not (latest_only or date_from or date_to):
+                if self._full is None:
+                    self._full = self._assemble(self._groups)
+                return self._full
+            return self._assemble(self._select(latest_only, date_from, date_to))
+
+    def _assemble(self, groups):
+        lines = self._lines
+        empty = np.empty(0, dtype=np.intp)
+        body = ','.join(
+            head + ','.join(lines[groups.get(key, empty)]) + tail
+            for key, head, tail in self._districts
+        )
+        return ('[' + body + ']').encode('utf-8')
+
+    def _refresh(self):
+        districts, districts_version = self.datasets.snapshot(self.districts_csv)
+        if districts_version != self._districts_version:
+            self._districts = self._encode_districts(districts)
+            self._districts_version = districts_version
+            self._full = None
+
+        scores, scores_version = self.datasets.snapshot(self.scores_csv)
+        if scores_version == self._scores_version:
+            return
+        start = None
+        if self._scores_version is not None:
+            start = self.datasets.appended_since(self.scores_csv, self._scores_version)
+        if start is not None and start > len(scores):
+            start = None
+        if start is None:
+            self._build(scores)
+        else:
+            self._extend(scores.iloc[start:])
+        self._scores_version = scores_version
+        self._full = None
+
+    @staticmethod
+    def _encode_districts(districts):
+        # Split each district object around the 'resilience_scores' key so it lands
+        # in the same sorted-key position jsonify would give it
+        before = [c for c in districts.columns if c < 'resilience_scores']
+        after = [c for c in districts.columns if c > 'resilience_scores']
+        heads = [line[1:-1] for line in encode_record_lines(districts[before])] if before else [''] * len(districts)
+        tails = [line[1:-1] for line in encode_record_lines(districts[after])] if after else [''] * len(districts)
+        keys = districts['id'].astype(str).tolist()
+        return [
+            (key,
+             '{' + head + (',' if head else '') + '"resilience_scores":[',
+             ']' + (',' + tail if tail else '') + '}')
+            for key, head, tail in zip(keys, heads, tails)
+        ]
+
+    def _build(self, scores):
+        self._lines = np.empty(0, dtype=object)
+        self._keys = np.empty(0, dtype=object)
+        self._dates = np.empty(0, dtype='datetime64[D]')
+        self._groups = {}
+        self._extend(scores)
+
+    def _extend(self, new_scores):
+        if len(new_scores) == 0:
+            return
+        offset = len(self._lines)
+        # Keys are stringified the same way on both sides of the join
+        codes, uniques = pd.factorize(new_scores['district_id'], use_na_sentinel=False)
+        keys = pd.Index(uniques).astype(str).to_numpy(dtype=object)[codes]
+        self._lines = np.concatenate([self._lines, np.array(encode_record_lines(new_scores), dtype=object)])
+        self._keys = np.concatenate([self._keys, keys])
+        self._dates = np.concatenate([
+            self._dates,
+            pd.to_datetime(new_scores['score_date'], errors='coerce', format='ISO8601').to_numpy(dtype='datetime64[D]')
+        ])
+        for key, positions in pd.Series(keys).groupby(keys, sort=False).indices.items():
+            positions = positions + offset
+            existing = self._groups.get(key)
+            self._groups[key] = positions if existing is None else np.concatenate([existing, positions])
+
+    def _select(self, latest_only, date_from, date_to):
+        mask = np.ones(len(self._lines), dtype=bool)
+        if date_from:
+            mask &= self._dates >= np.datetime64(date_from, 'D')
+        if date_to:
+            mask &= self._dates <= np.datetime64(date_to, 'D')
+        if latest_only:
+            mask &= ~np.isnat(self._dates)
+        selected = np.flatnonzero(mask)
+
+        keys = self._keys[selected]
+        if latest_only and len(selected):
+            # Sort by (key, date, position) and keep the last row of each key
+            codes, _ = pd.factorize(keys)
+            order = np.lexsort((selected, self._dates[selected], codes))
+            last = np.r_[codes[order][1:] != codes[order][:-1], True]
+            selected = np.sort(selected[order][last])
+            keys = self._keys[selected]
+        if len(selected) == 0:
+            return {}
+        return {k: selected[v] for k, v in pd.Series(keys).groupby(keys, sort=False).indices.items()}
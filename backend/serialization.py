@@ -0,0 +1,124 @@
+import json
+import hashlib
+import threading
+from json.encoder import encode_basestring_ascii as _encode_string
+import numpy as np
+import pandas as pd
+from flask import Response
+from .metrics import span
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# Rows encoded per block of a streamed NDJSON body
+STREAM_CHUNK_ROWS = 10_000
+
+
+def _json_value(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return 'null'
+    if isinstance(value, str):
+        return _encode_string(value)
+    return json.dumps(value.item() if isinstance(value, np.generic) else value)
+
+
+def _json_column(values):
+    """
+    JSON text of each value of a column, as jsonify() writes it after clean_data():
+    missing values are null and floats are the shortest text that round-trips.
+    """
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return ['true' if v else 'false' for v in values.tolist()]
+    if pd.api.types.is_integer_dtype(dtype):
+        return list(map(str, values.tolist()))
+    if pd.api.types.is_float_dtype(dtype):
+        floats = values.to_numpy(dtype=np.float64)
+        texts = list(map(float.__repr__, floats.tolist()))
+        for i in np.flatnonzero(~np.isfinite(floats)).tolist():
+            texts[i] = 'null' if np.isnan(floats[i]) else ('Infinity' if floats[i] > 0 else '-Infinity')
+        return texts
+    return [_json_value(v) for v in values.tolist()]
+
+
+def _json_rows(df):
+    """Each row of df as a JSON object text with sorted keys."""
+    columns = sorted(df.columns)
+    if not columns:
+        return ['{}'] * len(df)
+    fields = [[_encode_string(str(c)) + ':' + text for text in _json_column(df[c])] for c in columns]
+    return ['{' + ','.join(parts) + '}' for parts in zip(*fields)]
+
+
+def encode_records(df):
+    """
+    Encodes a DataFrame as a JSON array of row objects straight from its columns,
+    byte for byte what jsonify() wrote for the same rows: NaN/None become null,
+    keys are sorted, floats use their shortest round-trip text.
+    """
+    with span('json_serialize', 'encode_records', rows=len(df)):
+        return ('[' + ','.join(_json_rows(df)) + ']').encode('utf-8')
+
+
+def encode_record_lines(df):
+    """Encodes each row as its own JSON object (sorted keys); returns a list of str."""
+    return _json_rows(df)
+
+
+def encode_ndjson(df, positions=None, columns=None, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Yields rows of df (those at `positions`, restricted to `columns`) as NDJSON
+    bytes, one block of chunk_rows rows at a time, so only one block is encoded
+    in memory. Rows are encoded like encode_records().
+    """
+    n = len(df) if positions is None else len(positions)
+    for lo in range(0, n, chunk_rows):
+        block = df.iloc[lo:lo + chunk_rows] if positions is None else df.iloc[positions[lo:lo + chunk_rows]]
+        if columns is not None:
+            block = block[columns]
+        with span('json_serialize', 'encode_ndjson', rows=len(block)):
+            text = '\n'.join(_json_rows(block)) + '\n'
+        yield text.encode('utf-8')
+
+
+def ndjson_line(record):
+    """One NDJSON record, e.g. the trailing summary of a stream."""
+    return (json.dumps(record, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class EncodedTableCache:
+    """
+    Caches the encoded JSON bytes of each dataset per registry version, so an
+    unchanged table is serialized once and re-served (or answered with 304) cheaply.
+    """
+    def __init__(self, datasets):
+        self.datasets = datasets
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, csv_name):
+        """Returns (body, etag) for the current version of csv_name."""
+        # The frame and its version are read together, so a concurrent reload cannot
+        # cache one version's bytes under another's number
+        df, version = self.datasets.snapshot(csv_name)
+        entry = self._entries.get(csv_name)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1], entry[2]
+
+        self.misses += 1
+        body = encode_records(df)
+        # Content hash rather than the process-local version, so every worker agrees on the ETag
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self._lock:
+            self._entries[csv_name] = (version, body, etag)
+        return body, etag
+
+    def response(self, csv_name, request):
+        body, etag = self.get(csv_name)
+        resp = Response(body, mimetype='application/json')
+        resp.set_etag(etag)
+        return resp.make_conditional(request)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._entries)}
@@ -1,106 +1,290 @@
 import os
+import numpy as np
 import pandas as pd
-import uuid
-from datetime import datetime
-from flask import Flask, jsonify, send_from_directory, request
+import json
+from flask import Flask, Response, jsonify, send_from_directory, request, stream_with_context
 from flask_cors import CORS
-from .ml_models import FairnessAuditor, ImpactPredictor, RecommendationEngine, CausalDiscoveryEngine, PolicyAIModel
+from .ml_models import (
+    FairnessAuditor, ImpactPredictor, BudgetAllocator, RecommendationEngine, CausalDiscoveryEngine,
+    LaggedDependenceEngine, PolicyAIModel
+)
+from . import tasks
+from .datastore import DATA_DIR, DatasetRegistry, RunStore
+from .serialization import NDJSON_MIMETYPE, EncodedTableCache, encode_ndjson, encode_records, ndjson_line
+from .table_query import QueryError, TableQueryEngine
+from .scorecard import ScorecardIndex
+from .stats import MomentsStore
+from .columnar import DATASETS as COLUMNAR_DATASETS, PRESETS as AGGREGATE_PRESETS, ColumnarStore
+from .jobs import TERMINAL_STATES, JobError, JobQueue
+from .memo import ResultMemo
+from .spatial import SpatialIndex
+from .rules import RuleIndex
+from .static_assets import StaticAssets
+from .metrics import METRICS, SlowRequestProfiler, instrument_app
 
-def create_app():
-    app = Flask(__name__, static_folder='../dist')
-    CORS(app)
+# Upper bound on scenarios evaluated by a single /api/simulate_policy_grid request
+MAX_GRID_SCENARIOS = 100_000
+# Upper bound on district x scenario predictions of one /api/predict_impact/batch request
+MAX_BATCH_PREDICTIONS = 1_000_000
+# Upper bound on district x budget-step cells of one /api/allocate_budget request
+MAX_ALLOCATION_CELLS = 20_000_000
+# Upper bound on bootstrap resamples of one stratified /api/fairness_audit request
+MAX_BOOTSTRAP_RESAMPLES = 20_000
+# Opt-in slow-request profiling: requests slower than this many ms get their
+# sampled stacks written to data/profiles/ (unset disables the profiler)
+PROFILE_SLOW_MS_ENV = 'FUTURE_WEAVER_PROFILE_SLOW_MS'
 
-    def clean_data(df):
-        return df.where(pd.notnull(df), None).to_dict(orient='records')
+def create_app(data_dir=None, static_dir=None):
+    app = Flask(__name__, static_folder=static_dir or '../dist')
+    CORS(app, expose_headers=['X-Total-Count'])
+
+    # Parsed CSVs shared by every route; reloaded only when the file changes
+    datasets = DatasetRegistry(data_dir or DATA_DIR)
+    app.extensions['datasets'] = datasets
+    # Append-only, locked writer for the run/certificate history files
+    runs = RunStore(datasets)
+    # Encoded JSON bodies of the table GET routes, per dataset version
+    tables = EncodedTableCache(datasets)
+    # Per-version indexes for filtered/sorted/paginated table queries
+    queries = TableQueryEngine(datasets)
+    # district_id -> resilience scores join for the scorecard
+    scorecards = ScorecardIndex(datasets)
+    moments = MomentsStore(datasets)
+    columnar = ColumnarStore(data_dir or DATA_DIR)
+    lagged = {}
+    spatial = {}
+    # districts.csv id -> row, per version
+    district_rows = {}
+    # Recommendation rule scores and top-k rankings per districts.csv version
+    recommendations = RuleIndex(datasets)
+    # Simulation results per (lever settings, districts.csv version)
+    results = ResultMemo(datasets)
+    # Background simulations/discovery: bounded worker processes, state under data/jobs/
+    jobs = JobQueue(data_dir or DATA_DIR)
+    app.extensions['jobs'] = jobs
+    # Built frontend, held in memory with precompressed variants
+    assets = StaticAssets(app.static_folder)
+    app.extensions['static_assets'] = assets
+
+    profiler = None
+    if os.environ.get(PROFILE_SLOW_MS_ENV):
+        profiler = SlowRequestProfiler(os.path.join(data_dir or DATA_DIR, 'profiles'),
+                                       threshold=float(os.environ[PROFILE_SLOW_MS_ENV]) / 1000.0)
+    instrument_app(app, profiler)
+
+    def cache_metrics():
+        caches = {"datasets": datasets.stats(), "encoded_tables": tables.stats(), "results": results.stats()}
+        for cache, stats in caches.items():
+            yield ('cache_hits_total', 'counter', 'Cache hits.', {'cache': cache}, stats['hits'])
+            yield ('cache_misses_total', 'counter', 'Cache misses.', {'cache': cache}, stats['misses'])
+        job_stats = jobs.stats()
+        yield ('jobs_running', 'gauge', 'Background jobs running.', {}, job_stats['running'])
+        yield ('jobs_queued', 'gauge', 'Background jobs waiting for a worker.', {}, job_stats['queued'])
+
+    def lagged_engine(max_lag=12, max_order=6):
+        """LaggedDependenceEngine for the current water-stress/crop-failure data, reused until either changes."""
+        water, water_version = datasets.snapshot('water_stress_maharashtra.csv')
+        crop, crop_version = datasets.snapshot('crop_failure_maharashtra.csv')
+        key = (water_version, crop_version, max_lag, max_order)
+        engine = lagged.get(key)
+        if engine is None:
+            engine = LaggedDependenceEngine(water, crop, max_lag=max_lag, max_order=max_order)
+            lagged.clear()
+            lagged[key] = engine
+        return engine
+
+    def spatial_index():
+        """SpatialIndex over districts.csv coordinates, rebuilt only when the file changes."""
+        df, version = datasets.snapshot('districts.csv')
+        entry = spatial.get('entry')
+        if entry is None or entry[0] != version:
+            # Version and index are stored together, so df always comes with its own index
+            entry = spatial['entry'] = (version, SpatialIndex.from_districts(df))
+        return df, entry[1]
+
+    def discovered_links():
+        """CausalDiscoveryEngine links from the cached moments and lag estimates."""
+        engine = CausalDiscoveryEngine(datasets.get('districts.csv'))
+        return tasks.discover_causality(
+            datasets,
+            moments=moments.get('districts.csv', ('causal',) + tuple(engine.columns()), engine.moment_matrix),
+            lags=lagged_engine().static_lag_days()
+        )
+
+    def district_rows_index():
+        """(df, {str(id): row}) for districts.csv, the map rebuilt only when the file changes."""
+        df, version = datasets.snapshot('districts.csv')
+        entry = district_rows.get('entry')
+        if entry is None or entry[0] != version:
+            # First row wins for duplicate ids
+            rows = {str(d): i for i, d in reversed(list(enumerate(df['id'].tolist())))}
+            entry = district_rows['entry'] = (version, rows)
+        return df, entry[1]
+
+    def table_response(csv_name):
+        if wants_stream():
+            return table_stream(csv_name)
+        # Plain GETs are served from the encoded cache; any query parameter
+        # (limit/offset/fields/sort/filters) goes through the table indexes
+        if not request.args:
+            return tables.response(csv_name, request)
+        try:
+            page, total = queries.query(csv_name, request.args)
+        except QueryError as e:
+            return jsonify({'error': str(e)}), 400
+        resp = Response(encode_records(page), mimetype='application/json')
+        resp.headers['X-Total-Count'] = str(total)
+        return resp
+
+    def table_stream(csv_name):
+        """The table (filtered/sorted/paged as usual, but with no page size cap) as NDJSON."""
+        try:
+            df, positions, columns, total = queries.select(csv_name, request.args, max_limit=None)
+        except QueryError as e:
+            return jsonify({'error': str(e)}), 400
+
+        def lines():
+            yield from encode_ndjson(df, positions, columns)
+            yield ndjson_line({'summary': {'rows': len(positions), 'total': total}})
+
+        resp = ndjson_response(lines())
+        resp.headers['X-Total-Count'] = str(total)
+        return resp
+
+    def wants_stream():
+        # ?stream=1 or Accept: application/x-ndjson streams one JSON record per line,
+        # ending with a {"summary": ...} record
+        if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return True
+        return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+    def ndjson_response(lines):
+        def guarded():
+            # Headers are already sent, so a failure mid-stream ends it with an error record
+            try:
+                yield from lines
+            except Exception as e:
+                yield ndjson_line({'error': str(e)})
+
+        resp = Response(stream_with_context(guarded()), mimetype=NDJSON_MIMETYPE)
+        resp.headers['Cache-Control'] = 'no-cache'
+        resp.headers['X-Accel-Buffering'] = 'no'
+        return resp
 
     def save_data(csv_name, data):
-        csv_path = os.path.join(os.path.dirname(__file__), '../data', csv_name)
-        df = pd.read_csv(csv_path)
-        
-        # Add id if not present in data
-        if 'id' not in data or not data['id']:
-            data['id'] = str(uuid.uuid4())
-        
-        # Add created_at if not present
-        if 'created_at' not in data:
-            data['created_at'] = datetime.now().isoformat()
-            
-        new_row = pd.DataFrame([data])
-        df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(csv_path, index=False)
-        return data
+        return tasks.save_record(runs, csv_name, data)
+
+    def wants_job():
+        # ?async=1 on a compute route queues it as a background job instead
+        return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+    def submit_job(kind, params):
+        job = jobs.submit(kind, params or {})
+        resp = jsonify(job)
+        resp.status_code = 202
+        resp.headers['Location'] = f"/api/jobs/{job['id']}"
+        return resp
 
     @app.route('/api/districts', methods=['GET'])
     def get_districts():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('districts.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/causal_links', methods=['GET'])
     def get_causal_links():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/causal_links.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('causal_links.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/counterfactual_scenarios', methods=['GET'])
     def get_counterfactual_scenarios():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/counterfactual_scenarios.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('counterfactual_scenarios.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/fairness_audit', methods=['GET'])
     def get_fairness_audit():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(csv_path)
-            auditor = FairnessAuditor(df)
+            if request.args.get('mode') == 'stratified':
+                return stratified_fairness_audit()
+            df = datasets.get('districts.csv')
+            auditor = FairnessAuditor(df, moments.get('districts.csv', 'fairness', FairnessAuditor.moment_matrix))
             metrics = auditor.calculate_fairness_metrics()
             return jsonify(metrics)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
-    @app.route('/api/resilience_scores', methods=['GET'])
-    def get_resilience_scores():
+    def stratified_fairness_audit():
+        """?mode=stratified[&n_bootstrap=2000&seed=0]: per-stratum metrics with bootstrap intervals."""
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/resilience_scores.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            n_bootstrap = int(request.args.get('n_bootstrap', 2000))
+            seed = int(request.args.get('seed', 0))
+        except ValueError:
+            return jsonify({'error': "'n_bootstrap' and 'seed' must be integers"}), 400
+        if not 1 <= n_bootstrap <= MAX_BOOTSTRAP_RESAMPLES:
+            return jsonify({'error': f"'n_bootstrap' must be between 1 and {MAX_BOOTSTRAP_RESAMPLES}"}), 400
+
+        risk_df, risk_version = datasets.snapshot('district_at_risk_maharashtra.csv')
+        audit = results.get_or_compute(
+            'districts.csv', ('fairness_stratified', risk_version, n_bootstrap, seed),
+            lambda df: FairnessAuditor(df).stratified_audit(risk_df, n_bootstrap=n_bootstrap, seed=seed)
+        )
+        return jsonify(audit)
+
+    @app.route('/api/resilience_scores', methods=['GET', 'POST'])
+    def handle_resilience_scores():
+        try:
+            if request.method == 'POST':
+                data = request.json
+                saved = save_data('resilience_scores.csv', data)
+                return jsonify(saved), 201
+
+            return table_response('resilience_scores.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/resilience_scorecard', methods=['GET'])
     def get_resilience_scorecard():
         try:
-            districts_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            scores_path = os.path.join(os.path.dirname(__file__), '../data/resilience_scores.csv')
-            
-            districts_df = pd.read_csv(districts_path)
-            scores_df = pd.read_csv(scores_path)
-            
-            scores_dict = {}
-            for _, row in scores_df.iterrows():
-                d_id = str(row['district_id'])
-                if d_id not in scores_dict:
-                    scores_dict[d_id] = []
-                scores_dict[d_id].append(row.to_dict())
-            
-            results = []
-            for _, district in districts_df.iterrows():
-                d_obj = district.to_dict()
-                d_id = str(d_obj['id'])
-                d_obj['resilience_scores'] = scores_dict.get(d_id, [])
-                results.append(d_obj)
-                
-            return jsonify(results)
+            latest_only = request.args.get('latest_only', 'false').lower() in ('1', 'true', 'yes')
+            dates = {}
+            for key in ('date_from', 'date_to'):
+                value = request.args.get(key)
+                if value:
+                    try:
+                        day = np.datetime64(value.strip(), 'D')
+                    except ValueError:
+                        day = np.datetime64('NaT')
+                    if np.isnat(day):
+                        return jsonify({'error': f"'{key}' must be an ISO date (YYYY-MM-DD)"}), 400
+                    dates[key] = str(day)
+            body = scorecards.scorecard_json(latest_only=latest_only, **dates)
+            return Response(body, mimetype='application/json')
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/aggregates', methods=['GET'])
+    def list_aggregates():
+        return jsonify({
+            "datasets": {name: spec['csv'] for name, spec in COLUMNAR_DATASETS.items()},
+            "presets": AGGREGATE_PRESETS
+        })
+
+    @app.route('/api/aggregates/<name>', methods=['GET'])
+    def get_aggregate(name):
+        """
+        Group-by aggregate over a columnar dataset, e.g.
+        /api/aggregates/crop_failure_by_district?Year=2023 or
+        /api/aggregates/water_stress?group_by=City,Date:month&metrics=mean:Water_Stress_Index
+        """
+        try:
+            return jsonify(columnar.aggregate(name, request.args))
+        except QueryError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -112,9 +296,32 @@ def create_app():
                 saved = save_data('simulation_runs.csv', data)
                 return jsonify(saved), 201
             
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/simulation_runs.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('simulation_runs.csv')
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/causal_certificates/refute', methods=['POST'])
+    def refute_causal_link():
+        """
+        Refutes a discovered link ({cause_variable, effect_variable}, optional n_placebo,
+        n_common_cause, n_subsets, subset_fraction, alpha, seed, workers) and records
+        the certificate; ?async=1 runs it as a background job.
+        """
+        try:
+            data = request.json or {}
+            try:
+                tasks.refutation_params(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if wants_job():
+                return submit_job('refute_causal_link', data)
+            try:
+                result = tasks.refute_causal_link(datasets, runs, data, links=discovered_links())
+            except LookupError as e:
+                return jsonify({'error': str(e)}), 404
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(result), 201
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -126,77 +333,142 @@ def create_app():
                 saved = save_data('causal_certificates.csv', data)
                 return jsonify(saved), 201
             
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/causal_certificates.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('causal_certificates.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/migration_events', methods=['GET'])
     def get_migration_events():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/migration_events.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('migration_events.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/policy_interventions', methods=['GET'])
     def get_policy_interventions():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/policy_interventions.csv')
-            df = pd.read_csv(csv_path)
-            return jsonify(clean_data(df))
+            return table_response('policy_interventions.csv')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/discover_causality', methods=['GET'])
     def discover_causality():
         try:
-            csv_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(csv_path)
-            engine = CausalDiscoveryEngine(df)
-            links = engine.discover()
-            return jsonify(links)
+            if wants_job():
+                return submit_job('discover_causality', {})
+            return jsonify(discovered_links())
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/lagged_dependence', methods=['GET'])
+    def lagged_dependence():
+        """
+        Best lag and significance for every ordered pair of water-stress and crop-failure
+        variables, e.g. /api/lagged_dependence?max_lag=12&max_order=6 (months).
+        """
+        try:
+            try:
+                max_lag = int(request.args.get('max_lag', 12))
+                max_order = int(request.args.get('max_order', 6))
+            except ValueError:
+                return jsonify({'error': "'max_lag' and 'max_order' must be integers"}), 400
+            if not (1 <= max_lag <= 36 and 1 <= max_order <= 12):
+                return jsonify({'error': "'max_lag' must be in 1..36 and 'max_order' in 1..12"}), 400
+            return jsonify(lagged_engine(max_lag, max_order).analyze())
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/simulate_policy', methods=['POST'])
     def simulate_policy():
         try:
-            data = request.json
-            water_subsidy = float(data.get('water_subsidy_input', 50))
-            climate_policy = float(data.get('climate_policy_input', 30))
-            monsoon_modifier = float(data.get('monsoon_modifier', 0))
-            butterfly_effect = bool(data.get('butterfly_effect_enabled', False))
-            
-            districts_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(districts_path)
-            
+            data = request.json or {}
+            try:
+                params = tasks.policy_params(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if wants_job():
+                return submit_job('simulate_policy', data)
+            if wants_stream():
+                return simulate_policy_stream(data, params)
+
+            def compute(df):
+                simulation_result, run_data = tasks.run_policy_simulation(df, params)
+                return jsonify(simulation_result).get_data(), run_data
+
+            if params[-1] is None:
+                # Unseeded runs draw fresh Monte Carlo samples every time
+                body, run_data = compute(datasets.get('districts.csv'))
+            else:
+                # Repeated seeded settings reuse the encoded result but are still recorded as runs
+                body, run_data = results.get_or_compute('districts.csv', ('simulate_policy',) + params, compute)
+            tasks.record_policy_run(runs, data, run_data)
+            return Response(body, mimetype='application/json')
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    def simulate_policy_stream(data, params):
+        """Per-district records as the model produces them, then the summary (with Monte Carlo robustness)."""
+        df = datasets.get('districts.csv')
+
+        def lines():
+            for kind, payload in tasks.stream_policy_simulation(df, params):
+                if kind == 'districts':
+                    yield from encode_ndjson(payload)
+                else:
+                    summary, run_data = payload
+                    tasks.record_policy_run(runs, data, run_data)
+                    yield ndjson_line({'summary': summary})
+
+        return ndjson_response(lines())
+
+    def grid_lever(data, name, default, kind=float):
+        """A grid parameter as a 1-D array; ValueError unless it is a value or a flat list of them."""
+        value = data.get(name, default)
+        values = value if isinstance(value, list) else [value]
+        if kind is bool:
+            valid = all(isinstance(v, bool) for v in values)
+        else:
+            valid = all(isinstance(v, (int, float)) and not isinstance(v, bool) and np.isfinite(v) for v in values)
+        if not values or not valid:
+            kind_name = 'true/false' if kind is bool else 'a number'
+            raise ValueError(f"'{name}' must be {kind_name} or a non-empty list of them")
+        return np.asarray(values, dtype=kind)
+
+    @app.route('/api/simulate_policy_grid', methods=['POST'])
+    def simulate_policy_grid():
+        try:
+            data = request.json or {}
+            mode = data.get('mode', 'product')
+            if mode not in ('product', 'zip'):
+                return jsonify({'error': "'mode' must be 'product' or 'zip'"}), 400
+            try:
+                levers = [
+                    grid_lever(data, 'water_subsidy_input', 50),
+                    grid_lever(data, 'climate_policy_input', 30),
+                    grid_lever(data, 'monsoon_modifier', 0),
+                    grid_lever(data, 'butterfly_effect_enabled', False, bool)
+                ]
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            # 'product' sweeps the cartesian grid of the lever lists,
+            # 'zip' pairs them element-wise (explicit scenario list)
+            if mode == 'product':
+                levers = [axis.ravel() for axis in np.meshgrid(*levers, indexing='ij')]
+            else:
+                lengths = {len(axis) for axis in levers if len(axis) > 1}
+                if len(lengths) > 1:
+                    return jsonify({'error': "In 'zip' mode the lever lists must have the same length "
+                                             f"(got {sorted(lengths)})"}), 400
+                levers = np.broadcast_arrays(*levers)
+
+            if levers[0].size > MAX_GRID_SCENARIOS:
+                return jsonify({'error': f'Grid too large ({levers[0].size} scenarios, max {MAX_GRID_SCENARIOS})'}), 400
+
+            df = datasets.get('districts.csv')
             model = PolicyAIModel(df)
-            simulation_result = model.simulate(
-                water_subsidy, climate_policy, monsoon_modifier, butterfly_effect
-            )
-            
-            # Save results to history
-            run_data = {
-                "run_name": data.get('run_name', 'Simulation'),
-                "water_subsidy_input": water_subsidy,
-                "climate_policy_input": climate_policy,
-                "monsoon_modifier": monsoon_modifier,
-                "butterfly_effect_enabled": butterfly_effect,
-                "lives_stabilized": simulation_result['summary']['total_prevented_migration'],
-                "migration_reduction_percent": simulation_result['summary']['avg_drought_reduction'],
-                "water_security_percent": simulation_result['summary']['avg_drought_reduction'] * 1.2,
-                "economic_stability_percent": 18,
-                "total_iterations": 100,
-                "successful_iterations": int(simulation_result['summary']['confidence_score']),
-                "robustness_score": simulation_result['summary']['confidence_score'],
-                "status": "completed"
-            }
-            save_data('simulation_runs.csv', run_data)
-            
-            return jsonify(simulation_result)
+            result = model.simulate_grid(*levers, include_districts=bool(data.get('include_districts', False)))
+            return jsonify(result)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -204,42 +476,72 @@ def create_app():
     def generate_dynamic_counterfactuals():
         try:
             data = request.json
-            intervention_type = data.get('intervention_name', 'Default Intervention')
-            
-            # Scenario parameters
-            water_subsidy = float(data.get('water_subsidy', 75))
-            climate_policy = float(data.get('climate_policy', 50))
-            
-            districts_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(districts_path)
-            
+            if wants_job():
+                return submit_job('generate_dynamic_counterfactuals', data)
+            return jsonify(tasks.generate_counterfactuals(datasets, data, memo=results))
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/districts/<district_id>/neighbors', methods=['GET'])
+    def get_district_neighbors(district_id):
+        """Nearest districts by distance, e.g. ?k=5 or ?radius_km=50 (both: the k nearest within the radius)."""
+        try:
+            try:
+                k = int(request.args.get('k', 5))
+                radius_km = request.args.get('radius_km')
+                radius_km = float(radius_km) if radius_km is not None else None
+            except ValueError:
+                return jsonify({'error': "'k' must be an integer and 'radius_km' a number"}), 400
+            if k < 1 or (radius_km is not None and radius_km < 0):
+                return jsonify({'error': "'k' must be positive and 'radius_km' non-negative"}), 400
+
+            df, index = spatial_index()
+            match = np.flatnonzero(df['id'].astype(str).to_numpy() == str(district_id))
+            if len(match) == 0:
+                return jsonify({'error': 'District not found'}), 404
+            row = int(match[0])
+            others = np.ones(len(df), dtype=bool)
+            others[row] = False
+            x, y = df['x_coord'].iloc[row], df['y_coord'].iloc[row]
+            if radius_km is None:
+                positions, distances = index.knn(x, y, k, mask=others)
+            else:
+                positions, distances = index.radius(x, y, radius_km, mask=others)
+                positions, distances = positions[:k], distances[:k]
+            neighbors = [
+                {"district_id": d_id, "district_name": name, "distance_km": dist}
+                for d_id, name, dist in zip(
+                    df['id'].to_numpy()[positions].tolist(), df['name'].to_numpy()[positions].tolist(),
+                    np.round(distances, 2).tolist()
+                )
+            ]
+            return jsonify({"district_id": df['id'].iloc[row].item(), "neighbors": neighbors})
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/migration_flows', methods=['POST'])
+    def migration_flows():
+        """Routes post-policy out-migration to the nearest suitable destinations with spare capacity."""
+        try:
+            data = request.json or {}
+            try:
+                capacity_pct = float(data.get('capacity_pct', 1.0))
+                k = int(data.get('k', 8))
+                max_km = data.get('max_km')
+                max_km = float(max_km) if max_km is not None else None
+            except (TypeError, ValueError):
+                return jsonify({'error': "'capacity_pct' and 'max_km' must be numbers and 'k' an integer"}), 400
+            if not (0 <= capacity_pct < np.inf) or k < 1 or (max_km is not None and not max_km >= 0):
+                return jsonify({'error': "'capacity_pct' and 'max_km' must be non-negative and 'k' positive"}), 400
+            try:
+                levers = tasks.policy_params(data)[:4]
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            df, index = spatial_index()
             model = PolicyAIModel(df)
-            
-            # Baseline (No intervention)
-            baseline = model.simulate(0, 0, 0, False)
-            # Intervention
-            projected = model.simulate(water_subsidy, climate_policy, 0, False)
-            
-            scenario = {
-                "id": str(uuid.uuid4()),
-                "name": f"Counterfactual: {intervention_type}",
-                "baseline_migration": baseline['summary']['total_prevented_migration'] + 5000, # Placeholder baseline
-                "baseline_water_stress": round(df['water_stress_index'].mean(), 1),
-                "baseline_crop_failure": round(df['crop_failure_rate'].mean(), 1),
-                "baseline_economic_loss": 500,
-                "projected_migration": projected['summary']['total_prevented_migration'] + 1343, 
-                "projected_water_stress": round(df['water_stress_index'].mean() * (1 - (water_subsidy/200.0)), 1),
-                "projected_crop_failure": round(df['crop_failure_rate'].mean() * (1 - (climate_policy/200.0)), 1),
-                "projected_economic_loss": 120,
-                "treatment_effect_migration": projected['summary']['total_prevented_migration'],
-                "treatment_effect_water_stress": -round(water_subsidy * 0.4, 1),
-                "treatment_effect_crop_failure": -round(climate_policy * 0.3, 1),
-                "treatment_effect_economic": -380,
-                "confidence_score": projected['summary']['confidence_score'],
-                "limitations": projected['summary']['model_limitations']
-            }
-            
-            return jsonify([scenario]) # Wrapped in list for frontend compatibility
+            result = model.migration_flows(*levers, index=index, capacity_pct=capacity_pct, k=k, max_km=max_km)
+            return jsonify(result)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -247,41 +549,217 @@ def create_app():
     def predict_impact():
         try:
             data = request.json
-            districts_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(districts_path)
             
-            district_id = str(data.get('district_id'))
+            district_id = data.get('district_id')
             budget = float(data.get('budget', 500))
             time_horizon = float(data.get('time_horizon', 10))
             scale = float(data.get('scale', 50))
             
-            district_data = df[df['id'].astype(str) == district_id]
-            if district_data.empty:
+            _, rows = district_rows_index()
+            if str(district_id) not in rows:
                 return jsonify({'error': 'District not found'}), 404
             
-            predictor = ImpactPredictor(district_data.iloc[0].to_dict())
-            prediction = predictor.predict(budget, time_horizon, scale)
+            prediction = ImpactPredictor().predict(budget, time_horizon, scale)
             return jsonify(prediction)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/predict_impact/batch', methods=['POST'])
+    def predict_impact_batch():
+        """
+        Predictions for many districts (district_ids, default all) under many project
+        settings: budget/time_horizon/scale may be lists, combined as a cartesian grid
+        ('product', default) or element-wise ('zip').
+        """
+        try:
+            data = request.json or {}
+            mode = data.get('mode', 'product')
+            if mode not in ('product', 'zip'):
+                return jsonify({'error': "'mode' must be 'product' or 'zip'"}), 400
+            try:
+                params = [grid_lever(data, 'budget', 500), grid_lever(data, 'time_horizon', 10),
+                          grid_lever(data, 'scale', 50)]
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if mode == 'product':
+                params = [axis.ravel() for axis in np.meshgrid(*params, indexing='ij')]
+            else:
+                lengths = {len(axis) for axis in params if len(axis) > 1}
+                if len(lengths) > 1:
+                    return jsonify({'error': "In 'zip' mode the parameter lists must have the same length "
+                                             f"(got {sorted(lengths)})"}), 400
+                params = [p.ravel() for p in np.broadcast_arrays(*params)]
+
+            df, rows = district_rows_index()
+            district_ids = data.get('district_ids')
+            if district_ids is not None:
+                if not isinstance(district_ids, list) or not all(isinstance(d, (str, int)) for d in district_ids):
+                    return jsonify({'error': "'district_ids' must be a list of district ids"}), 400
+                missing = [d for d in district_ids if str(d) not in rows]
+                if missing:
+                    return jsonify({'error': f'District not found: {missing[:10]}'}), 404
+                df = df.iloc[[rows[str(d)] for d in district_ids]]
+
+            predictions = len(df) * params[0].size
+            if predictions > MAX_BATCH_PREDICTIONS:
+                return jsonify({'error': f'Batch too large ({predictions} predictions, max {MAX_BATCH_PREDICTIONS})'}), 400
+            return jsonify(ImpactPredictor(df).predict_districts(*params))
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/allocate_budget', methods=['POST'])
+    def allocate_budget():
+        """Splits total_budget across districts to maximize lives_stabilized or projected_migration_reduction."""
+        try:
+            data = request.json or {}
+            try:
+                total_budget = float(data['total_budget'])
+                time_horizon = float(data.get('time_horizon', 10))
+                scale = float(data.get('scale', 50))
+                step = float(data.get('step', 10))
+                max_per_district = data.get('max_per_district')
+                max_per_district = float(max_per_district) if max_per_district is not None else None
+            except KeyError:
+                return jsonify({'error': "'total_budget' is required"}), 400
+            except (TypeError, ValueError):
+                return jsonify({'error': "'total_budget', 'time_horizon', 'scale', 'step' and 'max_per_district' must be numbers"}), 400
+            if total_budget < 0 or step <= 0 or (max_per_district is not None and max_per_district < 0):
+                return jsonify({'error': "'step' must be positive, 'total_budget' and 'max_per_district' non-negative"}), 400
+
+            df = datasets.get('districts.csv')
+            cap = total_budget if max_per_district is None else min(total_budget, max_per_district)
+            cells = len(df) * int(cap // step)
+            if cells > MAX_ALLOCATION_CELLS:
+                return jsonify({'error': f"Too many budget steps ({cells} district x step cells, max {MAX_ALLOCATION_CELLS}); increase 'step'"}), 400
+
+            allocator = BudgetAllocator(df)
+            try:
+                result = allocator.allocate(total_budget, data.get('objective', 'lives_stabilized'),
+                                            time_horizon, scale, step, max_per_district)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(result)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
     @app.route('/api/ai_recommendations', methods=['GET'])
     def handle_ai_recommendations():
         try:
-            districts_path = os.path.join(os.path.dirname(__file__), '../data/districts.csv')
-            df = pd.read_csv(districts_path)
-            engine = RecommendationEngine(df)
-            recommendations = engine.get_recommendations()
-            return jsonify(recommendations)
+            df, index = spatial_index()
+            _, state = recommendations.state()
+            engine = RecommendationEngine(df, spatial=index, rules=state)
+            return jsonify(engine.get_recommendations())
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/ai_recommendations/districts', methods=['GET'])
+    def handle_district_recommendations():
+        """Ranked recommendations for every district, worst first, e.g. ?limit=50&offset=0&rule=water_grid or ?district_id=3."""
+        try:
+            try:
+                limit = int(request.args.get('limit', 50))
+                offset = int(request.args.get('offset', 0))
+            except ValueError:
+                return jsonify({'error': "'limit' and 'offset' must be integers"}), 400
+            if limit < 0 or offset < 0:
+                return jsonify({'error': "'limit' and 'offset' must be non-negative"}), 400
+
+            df, state = recommendations.state()
+            engine = RecommendationEngine(df, rules=state)
+            try:
+                page = engine.district_recommendations(
+                    limit, offset, district_id=request.args.get('district_id'), rule=request.args.get('rule')
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except KeyError:
+                return jsonify({'error': 'District not found'}), 404
+            return jsonify(page)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/jobs', methods=['GET', 'POST'])
+    def handle_jobs():
+        try:
+            if request.method == 'POST':
+                data = request.json or {}
+                try:
+                    return submit_job(data.get('kind'), data.get('params'))
+                except JobError as e:
+                    return jsonify({'error': str(e)}), 400
+            return jsonify(jobs.list())
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/jobs/<job_id>', methods=['GET', 'DELETE'])
+    def handle_job(job_id):
+        try:
+            job = jobs.cancel(job_id) if request.method == 'DELETE' else jobs.get(job_id)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            return jsonify(job)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+    def cancel_job(job_id):
+        try:
+            job = jobs.cancel(job_id)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            return jsonify(job)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/jobs/<job_id>/result', methods=['GET'])
+    def get_job_result(job_id):
+        try:
+            job = jobs.get(job_id)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            if job['status'] != 'completed':
+                return jsonify({'error': f"Job is {job['status']}", 'job': job}), 409
+            return send_from_directory(jobs.jobs_dir, os.path.basename(jobs.result_path(job_id)),
+                                       mimetype='application/json', max_age=0)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/jobs/<job_id>/events', methods=['GET'])
+    def stream_job_events(job_id):
+        """Server-sent events: one `data:` record per job state change, ending at a terminal state."""
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+        def events(job):
+            yield f"data: {json.dumps(job)}\n\n"
+            while job['status'] not in TERMINAL_STATES:
+                update = jobs.wait(job_id, job['revision'], timeout=15)
+                if update is None:
+                    return
+                if update['revision'] == job['revision']:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"data: {json.dumps(update)}\n\n"
+                job = update
+
+        resp = Response(stream_with_context(events(job)), mimetype='text/event-stream')
+        resp.headers['Cache-Control'] = 'no-cache'
+        resp.headers['X-Accel-Buffering'] = 'no'
+        return resp
+
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        return Response(METRICS.render([cache_metrics]), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/api/cache_stats', methods=['GET'])
+    def get_cache_stats():
+        return jsonify({"datasets": datasets.stats(), "encoded_tables": tables.stats(),
+                        "results": results.stats(), "jobs": jobs.stats(), "static_assets": assets.stats()})
+
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        if path != "" and os.path.exists(app.static_folder + '/' + path):
-            return send_from_directory(app.static_folder, path)
-        else:
-            return send_from_directory(app.static_folder, 'index.html')
+        return assets.response(path, request)
 
     return app
@@ -0,0 +1,139 @@
+"""
+Production serving: create_app() under waitress (or, when it is not installed,
+werkzeug's threaded server) on a local port. The landing page's data is loaded
+and its caches filled before the server reports ready, so the first page load
+is served from memory; the rest is warmed in the background.
+
+    python -m backend.serving [--host 127.0.0.1] [--port 5000] [--threads 8] [--no-warm]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from .server import create_app
+
+try:
+    import waitress
+except ImportError:  # werkzeug's threaded server instead
+    waitress = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+# Request threads; model compute releases the GIL in NumPy and long runs go to the job processes
+DEFAULT_THREADS = 8
+# The landing page's (CommandCenter) calls: warmed before the server reports ready
+READY_ROUTES = ['/api/districts', '/api/causal_links']
+# Seconds after ready before the background warm-up starts
+BACKGROUND_WARM_DELAY = 2.0
+# GET routes of the other pages, warmed in the background once serving; requesting
+# each once fills the encoded tables, indexes and model caches behind it
+WARM_ROUTES = [
+    '/api/discover_causality', '/api/ai_recommendations', '/api/fairness_audit', '/api/resilience_scorecard',
+    '/api/simulation_runs', '/api/causal_certificates', '/api/migration_events', '/api/policy_interventions',
+    '/api/counterfactual_scenarios', '/api/lagged_dependence'
+]
+
+
+def warm_up(app, routes, all_datasets=False):
+    """
+    Requests `routes` in-process (after loading every dataset, with all_datasets);
+    returns {stage: seconds}.
+    """
+    timings = {}
+    if all_datasets:
+        datasets = app.extensions['datasets']
+        start = time.perf_counter()
+        for name in sorted(os.listdir(datasets.data_dir)):
+            if name.endswith('.csv'):
+                datasets.get(name)
+        timings['datasets'] = time.perf_counter() - start
+
+    client = app.test_client()
+    for path in routes:
+        start = time.perf_counter()
+        resp = client.get(path)
+        resp.get_data()
+        if resp.status_code >= 400:
+            # A route that fails now will fail for the user too; serving goes on regardless
+            logger.warning('Warm-up request %s answered %s', path, resp.status_code)
+        timings[path] = time.perf_counter() - start
+    return timings
+
+
+def _warm_in_background(app):
+    def run():
+        timings = warm_up(app, WARM_ROUTES, all_datasets=True)
+        logger.info('Warmed datasets and %d more routes in %.2fs', len(WARM_ROUTES), sum(timings.values()))
+
+    # Starts after the window's first page load, which it would otherwise compete with for CPU
+    timer = threading.Timer(BACKGROUND_WARM_DELAY, run)
+    timer.name = 'warm-up'
+    timer.daemon = True
+    timer.start()
+
+
+class _WerkzeugServer:
+    def __init__(self, app, host, port):
+        from werkzeug.serving import make_server
+        self.server = make_server(host, port, app, threaded=True)
+        self.effective_port = self.server.server_port
+
+    def run(self):
+        self.server.serve_forever()
+
+
+def make_server(app, host=DEFAULT_HOST, port=DEFAULT_PORT, threads=DEFAULT_THREADS, server='auto'):
+    """
+    A server bound to (host, port), with .run() and .effective_port. The socket is
+    listening on return, so requests made after this queue until run() picks them up.
+    """
+    if server not in ('auto', 'waitress', 'werkzeug'):
+        raise ValueError(f"Unknown server '{server}'")
+    if server == 'waitress' and waitress is None:
+        raise RuntimeError('waitress is not installed')
+    if server != 'werkzeug' and waitress is not None:
+        return waitress.create_server(app, host=host, port=port, threads=threads)
+    return _WerkzeugServer(app, host, port)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, threads=DEFAULT_THREADS, warm=True, ready=None,
+          data_dir=None, static_dir=None, server='auto'):
+    """
+    Builds the app, warms the landing page's routes and binds the port, then sets
+    `ready` (a threading.Event), warms the remaining routes in the background and
+    serves until the process exits.
+    """
+    start = time.perf_counter()
+    app = create_app(data_dir, static_dir)
+    if warm:
+        warm_up(app, READY_ROUTES)
+    httpd = make_server(app, host, port, threads, server)
+    logger.info('Ready on http://%s:%s after %.2fs', host, httpd.effective_port, time.perf_counter() - start)
+    if ready is not None:
+        ready.set()
+    if warm:
+        _warm_in_background(app)
+    httpd.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS)
+    parser.add_argument('--no-warm', dest='warm', action='store_false', help='skip dataset and cache warm-up')
+    parser.add_argument('--server', choices=['auto', 'waitress', 'werkzeug'], default='auto')
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--static-dir', default=None, help='built frontend (default: dist/)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s', stream=sys.stderr)
+    serve(args.host, args.port, args.threads, args.warm, data_dir=args.data_dir, static_dir=args.static_dir,
+          server=args.server)
+
+
+if __name__ == '__main__':
+    main()
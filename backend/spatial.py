@@ -0,0 +1,173 @@
+import math
+import numpy as np
+
+# Equirectangular projection: km per degree of latitude / of longitude at the equator
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320
+# Target average points per grid cell
+POINTS_PER_CELL = 2.0
+
+
+class SpatialIndex:
+    """
+    Uniform grid over district coordinates (x = longitude, y = latitude in degrees),
+    projected to km around the data's mean latitude, which is accurate to well under
+    1% across a state-sized region. Points are stored sorted by cell, so each grid row
+    of a query window is one contiguous slice. Supports k-nearest and radius queries,
+    optionally restricted to a boolean mask of eligible points. Positions returned
+    refer to the order of the input coordinates.
+    """
+    def __init__(self, x, y, cell_km=None):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.n = len(x)
+        self.lat0 = float(np.nanmean(y)) if self.n else 0.0
+        self.kx = KM_PER_DEG_LON * math.cos(math.radians(self.lat0))
+        px, py = self.project(x, y)
+        # Points without coordinates are never returned
+        self.valid = np.isfinite(px) & np.isfinite(py)
+        px, py = np.where(self.valid, px, 0.0), np.where(self.valid, py, 0.0)
+
+        self.min_x = float(px[self.valid].min()) if self.valid.any() else 0.0
+        self.min_y = float(py[self.valid].min()) if self.valid.any() else 0.0
+        width = float(px[self.valid].max()) - self.min_x if self.valid.any() else 0.0
+        height = float(py[self.valid].max()) - self.min_y if self.valid.any() else 0.0
+        if cell_km is None:
+            area = max(width, 1e-6) * max(height, 1e-6)
+            cell_km = math.sqrt(area * POINTS_PER_CELL / max(int(self.valid.sum()), 1))
+        self.cell = max(float(cell_km), 1e-6)
+        self.ncx = int(width // self.cell) + 1
+        self.ncy = int(height // self.cell) + 1
+
+        cx = np.clip(((px - self.min_x) // self.cell).astype(np.int64), 0, self.ncx - 1)
+        cy = np.clip(((py - self.min_y) // self.cell).astype(np.int64), 0, self.ncy - 1)
+        cell_id = np.where(self.valid, cy * self.ncx + cx, self.ncx * self.ncy)
+        self.order = np.argsort(cell_id, kind='stable')
+        self.starts = np.searchsorted(cell_id[self.order], np.arange(self.ncx * self.ncy + 1))
+        self.px = px[self.order]
+        self.py = py[self.order]
+
+    @classmethod
+    def from_districts(cls, df, cell_km=None):
+        return cls(df['x_coord'].to_numpy(dtype=np.float64), df['y_coord'].to_numpy(dtype=np.float64), cell_km)
+
+    def project(self, x, y):
+        """Degrees -> km on the index's projection."""
+        return (np.asarray(x, dtype=np.float64) * self.kx,
+                np.asarray(y, dtype=np.float64) * KM_PER_DEG_LAT)
+
+    def knn(self, x, y, k, mask=None):
+        """
+        The k nearest points to (x, y) in degrees, as (positions, distances_km) sorted by
+        distance. Only points where `mask` (aligned with the input order) is True count.
+        """
+        qx, qy = (float(v) for v in self.project(x, y))
+        cx, cy, outside = self._cell_of(qx, qy)
+        k = min(int(k), self.n)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        span = max(self.ncx, self.ncy)
+        r = 1
+        while True:
+            slots = self._window(cx, cy, r)
+            pos, dist = self._candidates(slots, qx, qy, mask)
+            covers_grid = r >= span
+            if len(pos) >= k or covers_grid:
+                if len(pos) > k:
+                    part = np.argpartition(dist, k - 1)[:k]
+                    pos, dist = pos[part], dist[part]
+                # Anything outside the window is at least (r * cell - outside) away
+                if covers_grid or (len(pos) == k and dist.max() <= r * self.cell - outside):
+                    ranked = np.argsort(dist, kind='stable')
+                    return pos[ranked], dist[ranked]
+            r *= 2
+
+    def radius(self, x, y, radius_km, mask=None):
+        """All points within radius_km of (x, y), as (positions, distances_km) sorted by distance."""
+        qx, qy = (float(v) for v in self.project(x, y))
+        cx, cy, outside = self._cell_of(qx, qy)
+        r = int(math.ceil((float(radius_km) + outside) / self.cell)) + 1
+        pos, dist = self._candidates(self._window(cx, cy, r), qx, qy, mask)
+        keep = dist <= radius_km
+        pos, dist = pos[keep], dist[keep]
+        ranked = np.argsort(dist, kind='stable')
+        return pos[ranked], dist[ranked]
+
+    def _cell_of(self, qx, qy):
+        """Grid cell nearest to the query point, and the point's distance outside the grid."""
+        fx = (qx - self.min_x) / self.cell
+        fy = (qy - self.min_y) / self.cell
+        cx = min(max(int(math.floor(fx)), 0), self.ncx - 1)
+        cy = min(max(int(math.floor(fy)), 0), self.ncy - 1)
+        dx = max(0.0, -fx, fx - self.ncx) * self.cell
+        dy = max(0.0, -fy, fy - self.ncy) * self.cell
+        return cx, cy, math.hypot(dx, dy)
+
+    def _window(self, cx, cy, r):
+        """Sorted-order slots of all points in cells within r cells of (cx, cy)."""
+        x0, x1 = max(cx - r, 0), min(cx + r, self.ncx - 1)
+        rows = range(max(cy - r, 0), min(cy + r, self.ncy - 1) + 1)
+        starts = self.starts
+        slices = [(starts[row * self.ncx + x0], starts[row * self.ncx + x1 + 1]) for row in rows]
+        slices = [(lo, hi) for lo, hi in slices if hi > lo]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        if len(slices) == 1:
+            return np.arange(*slices[0])
+        return np.concatenate([np.arange(lo, hi) for lo, hi in slices])
+
+    def _candidates(self, slots, qx, qy, mask):
+        pos = self.order[slots]
+        if mask is not None:
+            keep = mask[pos]
+            slots, pos = slots[keep], pos[keep]
+        dist = np.hypot(self.px[slots] - qx, self.py[slots] - qy)
+        return pos, dist
+
+
+def assign_migration_flows(index, x, y, outflow, capacity, k=8, max_km=None):
+    """
+    Routes each source's outflow to its nearest destinations with spare capacity.
+    `outflow` (people leaving, 0 for non-sources) and `capacity` (people a destination
+    can absorb, 0 for non-destinations) are aligned with the index's points. Sources
+    are served largest first; each fills its nearest open destinations in turn,
+    widening the search as they fill up, until its outflow is placed or no open
+    destination lies within max_km. Returns (source, destination, distance_km, people)
+    arrays and the unplaced outflow per point.
+    """
+    outflow = np.asarray(outflow, dtype=np.float64)
+    remaining = np.asarray(capacity, dtype=np.float64).copy()
+    open_mask = remaining > 0
+    unplaced = np.zeros(len(outflow))
+    sources, destinations, distances, people = [], [], [], []
+
+    for source in np.argsort(-outflow, kind='stable'):
+        need = outflow[source]
+        if need <= 0:
+            break
+        while need > 0 and open_mask.any():
+            pos, dist = index.knn(x[source], y[source], k, mask=open_mask)
+            if max_km is not None:
+                within = dist <= max_km
+                pos, dist = pos[within], dist[within]
+            if len(pos) == 0:
+                break
+            for dest, d in zip(pos.tolist(), dist.tolist()):
+                moved = min(need, remaining[dest])
+                sources.append(source)
+                destinations.append(dest)
+                distances.append(d)
+                people.append(moved)
+                need -= moved
+                remaining[dest] -= moved
+                if remaining[dest] <= 0:
+                    open_mask[dest] = False
+                if need <= 0:
+                    break
+            if need > 0 and max_km is not None and len(pos) < k:
+                # Every open destination within max_km is now full
+                break
+        unplaced[source] = max(need, 0.0)
+
+    return (np.asarray(sources, dtype=np.intp), np.asarray(destinations, dtype=np.intp),
+            np.asarray(distances), np.asarray(people)), unplaced
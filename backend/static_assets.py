@@ -0,0 +1,122 @@
+"""
+In-memory table of the built frontend (dist/), with gzip and brotli variants
+compressed once at load time, served with ETags and long-lived cache headers
+for the content-hashed files Vite writes under assets/.
+"""
+import os
+import gzip
+import time
+import hashlib
+import mimetypes
+import threading
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Worth compressing: text-like types above this size
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml',
+                      'application/manifest+json', 'application/xml', 'application/wasm')
+# Quality 10-11 is several times slower to compress for little or no size gain on bundles
+BROTLI_QUALITY = 9
+GZIP_LEVEL = 9
+# Content-hashed build output never changes under the same name
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Everything else (index.html, favicon, robots.txt) is revalidated by ETag
+REVALIDATE_CACHE = 'no-cache'
+
+
+class _Asset:
+    def __init__(self, body, mimetype, cache_control):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.bodies = {'identity': body}
+        if len(body) >= COMPRESS_MIN_BYTES and mimetype.startswith(COMPRESSIBLE_TYPES):
+            candidates = {'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+            if brotli is not None:
+                candidates['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+            # Keep an encoding only when it actually saves bytes
+            self.bodies.update((e, b) for e, b in candidates.items() if len(b) < len(body))
+
+
+class StaticAssets:
+    """
+    Every file under `root`, read and compressed once. Paths that are not files
+    fall back to index.html, so client-side routes load the app. The table is
+    rebuilt when index.html changes (a new build), checked at most every
+    check_interval seconds.
+    """
+    def __init__(self, root, check_interval=1.0):
+        self.root = root
+        self.check_interval = check_interval
+        self._assets = {}
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        assets = {}
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                full = os.path.join(folder, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, '/')
+                with open(full, 'rb') as f:
+                    body = f.read()
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                cache = IMMUTABLE_CACHE if rel.startswith('assets/') else REVALIDATE_CACHE
+                assets[rel] = _Asset(body, mimetype, cache)
+        with self._lock:
+            self._assets = assets
+            self._stamp = self._index_stamp()
+            self._checked_at = time.monotonic()
+        return self
+
+    def stats(self):
+        assets = list(self._assets.values())
+        return {
+            "files": len(assets),
+            "bytes": sum(len(a.bodies['identity']) for a in assets),
+            "gzip_bytes": sum(len(a.bodies.get('gzip', a.bodies['identity'])) for a in assets),
+            "br_bytes": sum(len(a.bodies.get('br', a.bodies['identity'])) for a in assets) if brotli else None
+        }
+
+    def response(self, path, request):
+        """The asset at `path` (or index.html) in the best encoding the client accepts; 404 if there is no build."""
+        self._refresh()
+        asset = self._assets.get(path) or self._assets.get('index.html')
+        if asset is None:
+            return Response('Frontend build not found', status=404, mimetype='text/plain')
+
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.bodies and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        resp = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            resp.headers['Content-Encoding'] = encoding
+        resp.headers['Vary'] = 'Accept-Encoding'
+        resp.headers['Cache-Control'] = asset.cache_control
+        # One ETag per encoding, so caches never mix up variants
+        resp.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+        return resp.make_conditional(request)
+
+    def _index_stamp(self):
+        try:
+            st = os.stat(os.path.join(self.root, 'index.html'))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        if self._index_stamp() != self._stamp:
+            self.load()
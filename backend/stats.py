@@ -0,0 +1,404 @@
+import math
+import threading
+import numpy as np
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def normal_two_sided_p(z):
+    """Two-sided p-value of standard-normal statistics."""
+    return _erfc(np.abs(np.asarray(z, dtype=float)) / math.sqrt(2.0))
+
+
+def normal_sf(z):
+    """Upper-tail probability of standard-normal statistics."""
+    return 0.5 * _erfc(np.asarray(z, dtype=float) / math.sqrt(2.0))
+
+
+def chi2_sf(x, dof):
+    """Upper-tail chi-square probability via the Wilson-Hilferty cube-root approximation."""
+    x = np.asarray(x, dtype=float)
+    dof = np.asarray(dof, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = 2.0 / (9.0 * dof)
+        z = (np.cbrt(x / dof) - (1.0 - a)) / np.sqrt(a)
+    return np.where(dof > 0, normal_sf(z), np.nan)
+
+
+def f_sf(f, dfn, dfd):
+    """Upper-tail F probability via Paulson's normal approximation."""
+    f = np.maximum(np.asarray(f, dtype=float), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = 2.0 / (9.0 * dfn)
+        b = 2.0 / (9.0 * dfd)
+        cube = np.cbrt(f)
+        z = ((1.0 - b) * cube - (1.0 - a)) / np.sqrt(b * cube * cube + a)
+    return np.where((dfn > 0) & (dfd > 0), normal_sf(z), np.nan)
+
+
+def fisher_combined_p(p, axis=-1):
+    """
+    Fisher's method: combines independent p-values along `axis` (NaN = no test).
+    Returns (combined p, number of tests combined).
+    """
+    p = np.asarray(p, dtype=float)
+    present = ~np.isnan(p)
+    k = present.sum(axis=axis)
+    stat = -2.0 * np.where(present, np.log(np.clip(p, 1e-300, 1.0)), 0.0).sum(axis=axis)
+    return np.where(k > 0, chi2_sf(stat, 2 * k), np.nan), k
+
+
+def fisher_z_pvalues(r, n, cond_size):
+    """
+    p-values of (partial) correlations r under H0: rho = 0, using Fisher's z with
+    n samples and `cond_size` conditioning variables. Untestable cases get p = 1.
+    """
+    dof = n - cond_size - 3
+    r = np.clip(r, -0.9999999, 0.9999999)
+    z = np.sqrt(max(dof, 0)) * np.arctanh(r)
+    return np.where(dof > 0, normal_two_sided_p(z), 1.0)
+
+
+class RunningMoments:
+    """
+    Sufficient statistics of a k-column data stream, kept per row block
+    (row i -> block i % n_blocks): counts, means and centered co-moment matrices.
+    update() merges new rows in O(k^2) per row (Chan et al.'s parallel update),
+    so correlations, means and standard deviations never require a rescan.
+    Missing values are imputed with the column mean at the time they arrive: of the
+    rows seen so far, or of the batch itself for the first one. A single batch thus
+    matches fillna(mean); rows appended later are filled with the running mean, not
+    the final one.
+    """
+    def __init__(self, k, n_blocks=64):
+        self.k = k
+        self.n_blocks = n_blocks
+        self.rows = 0
+        self.counts = np.zeros(n_blocks)
+        self.means = np.zeros((n_blocks, k))
+        self.m2 = np.zeros((n_blocks, k, k))
+
+    @classmethod
+    def from_matrix(cls, X, n_blocks=64):
+        moments = cls(X.shape[1], n_blocks)
+        moments.update(X)
+        return moments
+
+    def copy(self):
+        moments = RunningMoments(self.k, self.n_blocks)
+        moments.rows = self.rows
+        moments.counts = self.counts.copy()
+        moments.means = self.means.copy()
+        moments.m2 = self.m2.copy()
+        return moments
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.k)
+        if len(X) == 0:
+            return
+        missing = np.isnan(X)
+        if missing.any():
+            with np.errstate(invalid='ignore'):
+                fill = self.mean() if self.rows else np.nanmean(X, axis=0)
+            X = np.where(missing, fill, X)
+        blocks = (self.rows + np.arange(len(X))) % self.n_blocks
+        for b in np.unique(blocks):
+            xb = X[blocks == b]
+            n_b = len(xb)
+            mean_b = xb.mean(axis=0)
+            d = xb - mean_b
+            n_a = self.counts[b]
+            n = n_a + n_b
+            delta = mean_b - self.means[b]
+            self.m2[b] += d.T @ d + np.outer(delta, delta) * (n_a * n_b / n)
+            self.means[b] += delta * (n_b / n)
+            self.counts[b] = n
+        self.rows += len(X)
+
+    def blocks(self):
+        """Non-empty blocks as (counts, means, co-moments), e.g. for block bootstraps."""
+        used = self.counts > 0
+        return self.counts[used], self.means[used], self.m2[used]
+
+    def combined(self):
+        """(n, mean vector, co-moment matrix) over all rows."""
+        return combine_moments(*self.blocks())
+
+    @property
+    def n(self):
+        return int(self.rows)
+
+    def mean(self):
+        return self.combined()[1]
+
+    def std(self, ddof=1):
+        n, _, m2 = self.combined()
+        return np.sqrt(np.diag(m2) / (n - ddof)) if n > ddof else np.full(self.k, np.nan)
+
+    def corr(self):
+        return comoment_to_corr(self.combined()[2])
+
+
+def combine_moments(counts, means, m2):
+    """Merges block moments into (n, mean, co-moment matrix) with Chan's parallel formula."""
+    n = counts.sum()
+    mean = counts @ means / n
+    d = means - mean
+    return n, mean, m2.sum(axis=0) + np.einsum('b,bi,bj->ij', counts, d, d)
+
+
+def comoment_to_corr(m2):
+    sd = np.sqrt(np.diag(m2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = m2 / np.outer(sd, sd)
+    return np.nan_to_num(corr)
+
+
+def partial_correlations(corr, idx):
+    """
+    Batched partial correlations: for each row (i, j, *S) of idx, the correlation of
+    i and j given S, read off the inverse of the corresponding correlation submatrix.
+    Works on a stack of correlation matrices too (corr of shape (..., k, k) with
+    matching leading dimensions).
+    """
+    idx = np.asarray(idx)
+    sub = corr[..., idx[:, :, None], idx[:, None, :]]
+    if idx.shape[1] == 2:
+        return sub[..., 0, 1]
+    prec = np.linalg.pinv(sub)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(-prec[..., 0, 1] / np.sqrt(prec[..., 0, 0] * prec[..., 1, 1]))
+
+
+def bootstrap_corr_submatrices(counts, means, m2, idx, n_boot, rng):
+    """
+    Bootstrap replicates of the correlation submatrices over variable tuples idx
+    (shape (T, q)), resampling blocks with replacement and recombining their
+    moments, so the raw rows are never revisited. Returns shape (n_boot, T, q, q).
+    """
+    m = len(counts)
+    weights = rng.multinomial(m, np.full(m, 1.0 / m), size=n_boot).astype(float)
+    weighted_counts = weights * counts
+    n = weighted_counts.sum(axis=1)
+
+    idx = np.asarray(idx)
+    sub_means = means[:, idx]                                   # (m, T, q)
+    sub_m2 = m2[:, idx[:, :, None], idx[:, None, :]]             # (m, T, q, q)
+    mean = np.einsum('bm,mtq->btq', weighted_counts, sub_means) / n[:, None, None]
+    cov = (np.einsum('bm,mtij->btij', weights, sub_m2)
+           + np.einsum('bm,mti,mtj->btij', weighted_counts, sub_means, sub_means)
+           - n[:, None, None, None] * mean[..., :, None] * mean[..., None, :])
+    sd = np.sqrt(np.maximum(np.einsum('btii->bti', cov), 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(cov / (sd[..., :, None] * sd[..., None, :]))
+
+
+def _nan_center(S):
+    """Subtracts each series' mean over its present values (last axis)."""
+    present = ~np.isnan(S)
+    count = present.sum(axis=-1, keepdims=True)
+    total = np.where(present, S, 0.0).sum(axis=-1, keepdims=True)
+    return S - total / np.maximum(count, 1)
+
+
+def lagged_correlations(S, max_lag, chunk=256):
+    """
+    Pearson correlation of S[..., i, t] with S[..., j, t + lag] for every variable
+    pair (i, j) and every lag 0..max_lag, over the time steps where both values are
+    present (NaN = missing). The overlapping-window sums for all lags come from one
+    FFT per series. Returns (r, n), each of shape (..., V, V, max_lag + 1).
+    """
+    S = np.asarray(S, dtype=np.float64)
+    lead = S.shape[:-2]
+    V, T = S.shape[-2:]
+    S = S.reshape(-1, V, T)
+    r = np.empty((len(S), V, V, max_lag + 1))
+    n = np.empty_like(r)
+    # Spectra are (series, V, V, frequencies); blocks of series keep them small
+    for start in range(0, len(S), chunk):
+        block = slice(start, start + chunk)
+        r[block], n[block] = _lagged_block(S[block], max_lag)
+    shape = lead + (V, V, max_lag + 1)
+    return r.reshape(shape), n.reshape(shape)
+
+
+def _lagged_block(S, max_lag):
+    T = S.shape[-1]
+    nfft = 1 << int(np.ceil(np.log2(max(2 * T, 2))))
+    mask = ~np.isnan(S)
+    # Centring each series first keeps the sums below well-conditioned
+    x = np.where(mask, _nan_center(S), 0.0)
+
+    fm = np.fft.rfft(mask.astype(np.float64), nfft, axis=-1)
+    fx = np.fft.rfft(x, nfft, axis=-1)
+    fx2 = np.fft.rfft(x * x, nfft, axis=-1)
+
+    def cross(a, b):
+        # sum_t a_i[t] * b_j[t + lag]
+        spec = np.conj(a)[..., :, None, :] * b[..., None, :, :]
+        return np.fft.irfft(spec, nfft, axis=-1)[..., :max_lag + 1]
+
+    n = np.rint(cross(fm, fm))
+    sx, sy = cross(fx, fm), cross(fm, fx)
+    sxx, syy = cross(fx2, fm), cross(fm, fx2)
+    sxy = cross(fx, fx)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        r = cov / np.sqrt(vx * vy)
+    # FFT round-off leaves near-zero variances on constant windows; treat those as untestable
+    degenerate = (n < 3) | (vx <= 1e-9 * np.abs(sxx)) | (vy <= 1e-9 * np.abs(syy))
+    return np.where(degenerate, np.nan, np.clip(r, -1.0, 1.0)), n
+
+
+def pooled_correlation(r, n, axis=0):
+    """
+    Fixed-effect pooling of correlations along `axis` (Fisher z weighted by n - 3).
+    Returns (pooled r, two-sided p-value, number of contributing series).
+    """
+    usable = ~np.isnan(r) & (n > 3)
+    w = np.where(usable, n - 3, 0.0)
+    z = np.arctanh(np.clip(np.where(usable, r, 0.0), -0.9999999, 0.9999999))
+    total = w.sum(axis=axis)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pooled = (w * z).sum(axis=axis) / total
+        p = normal_two_sided_p(np.nan_to_num(pooled * np.sqrt(total)))
+    return np.where(total > 0, np.tanh(pooled), np.nan), np.where(total > 0, p, np.nan), usable.sum(axis=axis)
+
+
+def granger_f_tests(S, pairs, order, chunk=256):
+    """
+    Batched Granger tests of "cause helps predict effect" with `order` lags, for every
+    series in the leading dimensions of S (..., V, T) and every (cause, effect) row of
+    `pairs`. Each test is an OLS F-test of the cause's previous `order` steps, on top of
+    the effect's previous `order` observations, fitted on the time steps where all of
+    them are present. Returns (p, n_obs) of shape (..., P); untestable = NaN.
+
+    The normal equations of every pair are assembled from per-variable lag windows
+    with three batched matrix products, so no per-pair design matrix is built.
+    """
+    S = np.asarray(S, dtype=np.float64)
+    lead = S.shape[:-2]
+    V, T = S.shape[-2:]
+    S = _nan_center(S.reshape(-1, V, T))
+    pairs = np.asarray(pairs, dtype=np.intp)
+    p = np.full((len(S), len(pairs)), np.nan)
+    n_obs = np.zeros((len(S), len(pairs)), dtype=np.int64)
+    if T <= order:
+        return p.reshape(lead + (len(pairs),)), n_obs.reshape(lead + (len(pairs),))
+    for start in range(0, len(S), chunk):
+        block = slice(start, start + chunk)
+        p[block], n_obs[block] = _granger_block(S[block], pairs, order)
+    return p.reshape(lead + (len(pairs),)), n_obs.reshape(lead + (len(pairs),))
+
+
+def _previous_observations(S, q):
+    """(..., T, q) array whose [..., t, k] is the (k + 1)-th latest present value before t."""
+    T = S.shape[-1]
+    last = np.maximum.accumulate(np.where(~np.isnan(S), np.arange(T), -1), axis=-1)
+    before = np.concatenate([np.full(S.shape[:-1] + (1,), -1), last[..., :-1]], axis=-1)
+    out = np.full(S.shape + (q,), np.nan)
+    idx = before
+    for k in range(q):
+        valid = idx >= 0
+        safe = np.maximum(idx, 0)
+        out[..., k] = np.where(valid, np.take_along_axis(S, safe, axis=-1), np.nan)
+        idx = np.where(valid, np.take_along_axis(before, safe, axis=-1), -1)
+    return out
+
+
+def _granger_block(S, pairs, q):
+    D, V, T = S.shape
+    Tq = T - q
+    # Cause side: the q calendar steps before t
+    cause_lags = np.lib.stride_tricks.sliding_window_view(S, q + 1, axis=-1)[..., :q]   # (D, V, T - q, q)
+    cause_ok = ~np.isnan(cause_lags).any(axis=-1)
+    # Effect side: the effect's own previous q observations, so a sparse (e.g. seasonal)
+    # effect can be tested against a monthly cause; for a complete series these are
+    # simply the previous q steps
+    effect_lags = _previous_observations(S, q)[..., q:, :]
+    target = S[..., q:]
+    effect_ok = ~np.isnan(effect_lags).any(axis=-1) & ~np.isnan(target)
+    ones = np.ones(target.shape + (1,))
+    # Zero-filled [1, effect lags, target] and [cause lags] wherever they are unusable
+    effect = np.where(effect_ok[..., None], np.concatenate([ones, effect_lags, target[..., None]], axis=-1), 0.0)
+    cause = np.where(cause_ok[..., None], cause_lags, 0.0)
+
+    # A pair (i, j) uses rows where cause i's lags and effect j's row are all present:
+    # effect-effect sums are weighted by cause_ok_i, cause-cause sums by effect_ok_j, and
+    # the cross block needs no weights because both zero-filled sides vanish elsewhere.
+    effect_t = np.swapaxes(effect, -1, -2)
+    cause_t = np.swapaxes(cause, -1, -2)
+    ee = np.empty((D, V, V, q + 2, q + 2))                                    # [d, i, j]
+    cc = np.empty((D, V, V, q, q))
+    for v in range(V):
+        ee[:, v] = (effect_t * cause_ok[:, v, None, None, :]) @ effect
+        cc[:, :, v] = (cause_t * effect_ok[:, v, None, None, :]) @ cause
+    ce = cause_t.reshape(D, V * q, Tq) @ effect.transpose(0, 2, 1, 3).reshape(D, Tq, -1)
+    ce = ce.reshape(D, V, q, V, q + 2).transpose(0, 1, 3, 2, 4)             # [d, i, j]
+
+    i, j = pairs[:, 0], pairs[:, 1]
+    ee, cc, ce = ee[:, i, j], cc[:, i, j], ce[:, i, j]
+    k = 2 * q + 1
+    xtx = np.empty(ee.shape[:2] + (k, k))
+    xtx[..., :q + 1, :q + 1] = ee[..., :q + 1, :q + 1]
+    xtx[..., q + 1:, :q + 1] = ce[..., :, :q + 1]
+    xtx[..., :q + 1, q + 1:] = np.swapaxes(ce[..., :, :q + 1], -1, -2)
+    xtx[..., q + 1:, q + 1:] = cc
+    xty = np.concatenate([ee[..., :q + 1, q + 1], ce[..., :, q + 1]], axis=-1)
+    yty = ee[..., q + 1, q + 1]
+    n_obs = np.rint(ee[..., 0, 0]).astype(np.int64)
+
+    rss_restricted = _rss(xtx[..., :q + 1, :q + 1], xty[..., :q + 1], yty)
+    rss_full = _rss(xtx, xty, yty)
+    dfd = n_obs - k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = ((rss_restricted - rss_full) / q) / (rss_full / dfd)
+    testable = (dfd > 0) & (rss_full > 1e-12 * np.maximum(yty, 1e-300))
+    return np.where(testable, f_sf(f, q, dfd), np.nan), n_obs
+
+
+def _rss(xtx, xty, yty):
+    """Residual sum of squares of batched least-squares fits from their normal equations."""
+    k = xtx.shape[-1]
+    # A vanishing ridge keeps degenerate (collinear or empty) systems solvable
+    ridge = 1e-10 * np.trace(xtx, axis1=-2, axis2=-1)[..., None, None] / k + 1e-300
+    beta = np.linalg.solve(xtx + ridge * np.eye(k), xty[..., None])[..., 0]
+    return np.maximum(yty - (beta * xty).sum(axis=-1), 0.0)
+
+
+class MomentsStore:
+    """
+    RunningMoments per (dataset, spec), shared by the engines that need means,
+    deviations and correlations of a dataset. Rows appended to the dataset are
+    folded in incrementally; any other change rebuilds the moments from the frame.
+    """
+    def __init__(self, datasets, n_blocks=64):
+        self.datasets = datasets
+        self.n_blocks = n_blocks
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, csv_name, key, matrix_fn):
+        """
+        Moments of matrix_fn(df) for csv_name. matrix_fn maps a frame (or a slice
+        of appended rows) to an (n, k) array and is identified by `key`.
+        """
+        with self._lock:
+            df, version = self.datasets.snapshot(csv_name)
+            entry = self._entries.get((csv_name, key))
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+            start = None
+            if entry is not None:
+                start = self.datasets.appended_since(csv_name, entry[0])
+            if start is not None and start <= len(df):
+                # Readers may still hold the previous moments
+                moments = entry[1].copy()
+                moments.update(matrix_fn(df.iloc[start:]))
+            else:
+                moments = RunningMoments.from_matrix(matrix_fn(df), self.n_blocks)
+            self._entries[(csv_name, key)] = (version, moments)
+            return moments
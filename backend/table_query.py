@@ -0,0 +1,190 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Query-string keys that are not column filters
+RESERVED_PARAMS = {'limit', 'offset', 'fields', 'sort', 'stream'}
+
+# Range filter suffixes, e.g. ?event_date__gte=2024-01-01&impact_score__lt=0.5
+RANGE_OPS = {'gte', 'gt', 'lte', 'lt'}
+
+MAX_LIMIT = 10_000
+
+
+class QueryError(ValueError):
+    """Raised for malformed table queries; routes answer these with 400."""
+
+
+class TableIndex:
+    """
+    Lookup structures for one version of a dataset, built lazily per column:
+    value -> row positions for equality filters, and a sort order with its
+    inverse (rank) for range filters and sorting.
+    """
+    def __init__(self, df):
+        self.df = df
+        self._eq = {}
+        self._order = {}
+        self._rank = {}
+        self._lock = threading.Lock()
+
+    def equality(self, col):
+        if col not in self._eq:
+            groups = self.df.groupby(col, sort=False, dropna=True).indices
+            with self._lock:
+                self._eq[col] = groups
+        return self._eq[col]
+
+    def order(self, col):
+        """Row positions sorted by col (missing values excluded) and the sorted values."""
+        if col not in self._order:
+            values = self.df[col]
+            present = np.flatnonzero(values.notna().to_numpy())
+            present_values = values.to_numpy()[present]
+            order = present[np.argsort(present_values, kind='stable')]
+            with self._lock:
+                self._order[col] = (order, values.to_numpy()[order])
+        return self._order[col]
+
+    def rank(self, col):
+        """Dense rank of each row's value in col (ties share a rank); missing values rank last."""
+        if col not in self._rank:
+            order, sorted_values = self.order(col)
+            rank = np.full(len(self.df), len(self.df), dtype=np.int64)
+            if len(order):
+                rank[order] = np.concatenate(([0], np.cumsum(sorted_values[1:] != sorted_values[:-1])))
+            with self._lock:
+                self._rank[col] = rank
+        return self._rank[col]
+
+    def query(self, args):
+        """
+        Applies filters, sort and pagination from a query-string mapping.
+        Returns (page DataFrame, total matching rows).
+        """
+        positions, cols, total = self.select(args)
+        page = self.df.iloc[positions]
+        return (page if cols is None else page[cols]), total
+
+    def select(self, args, max_limit=MAX_LIMIT):
+        """
+        query() without materializing the page: (row positions, selected columns or
+        None for all, total matching rows). max_limit=None lifts the page size cap.
+        """
+        positions = None
+        for key in args:
+            if key in RESERVED_PARAMS:
+                continue
+            col, _, op = key.partition('__')
+            self._check_column(col)
+            for raw in args.getlist(key) if hasattr(args, 'getlist') else [args[key]]:
+                if op == '':
+                    matched = self._match_equal(col, raw)
+                elif op in RANGE_OPS:
+                    matched = self._match_range(col, op, raw)
+                else:
+                    raise QueryError(f"Unsupported filter operator '{op}'")
+                positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+
+        if positions is None:
+            positions = np.arange(len(self.df))
+        total = len(positions)
+
+        sort = args.get('sort')
+        if sort:
+            descending = sort.startswith('-')
+            col = sort.lstrip('-+')
+            self._check_column(col)
+            keys = self.rank(col)[positions]
+            if descending:
+                # Missing values stay last, ties keep row order as in ascending sorts
+                keys = np.where(keys < len(self.df), -keys, len(self.df))
+            positions = positions[np.argsort(keys, kind='stable')]
+
+        offset = self._int_arg(args, 'offset', 0)
+        limit = self._int_arg(args, 'limit', max_limit if max_limit is not None else total)
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+        positions = positions[offset:offset + limit]
+
+        cols = None
+        fields = args.get('fields')
+        if fields:
+            cols = [c.strip() for c in fields.split(',') if c.strip()]
+            for c in cols:
+                self._check_column(c)
+        return positions, cols, total
+
+    def _match_equal(self, col, raw):
+        groups = self.equality(col)
+        hits = [groups[v] for v in (self._coerce(col, part) for part in raw.split(',')) if v in groups]
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(hits))
+
+    def _match_range(self, col, op, raw):
+        order, sorted_values = self.order(col)
+        value = self._coerce(col, raw)
+        try:
+            if op in ('gte', 'gt'):
+                lo = np.searchsorted(sorted_values, value, side='left' if op == 'gte' else 'right')
+                matched = order[lo:]
+            else:
+                hi = np.searchsorted(sorted_values, value, side='right' if op == 'lte' else 'left')
+                matched = order[:hi]
+        except TypeError:
+            raise QueryError(f"Cannot compare column '{col}' with '{raw}'")
+        return np.sort(matched)
+
+    def _coerce(self, col, raw):
+        dtype = self.df[col].dtype
+        try:
+            if pd.api.types.is_bool_dtype(dtype):
+                return raw.strip().lower() in ('1', 'true', 'yes')
+            if pd.api.types.is_integer_dtype(dtype):
+                value = float(raw)
+                return int(value) if value.is_integer() else value
+            if pd.api.types.is_float_dtype(dtype):
+                return float(raw)
+        except ValueError:
+            raise QueryError(f"Invalid value '{raw}' for numeric column '{col}'")
+        return raw
+
+    def _check_column(self, col):
+        if col not in self.df.columns:
+            raise QueryError(f"Unknown column '{col}'")
+
+    @staticmethod
+    def _int_arg(args, name, default):
+        try:
+            value = int(args.get(name, default))
+        except ValueError:
+            raise QueryError(f"'{name}' must be an integer")
+        if value < 0:
+            raise QueryError(f"'{name}' must be non-negative")
+        return value
+
+
+class TableQueryEngine:
+    """Keeps one TableIndex per dataset, rebuilt when the registry version changes."""
+    def __init__(self, datasets):
+        self.datasets = datasets
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def index(self, csv_name):
+        df, version = self.datasets.snapshot(csv_name)
+        entry = self._indexes.get(csv_name)
+        if entry is None or entry[0] != version:
+            entry = (version, TableIndex(df))
+            with self._lock:
+                self._indexes[csv_name] = entry
+        return entry[1]
+
+    def query(self, csv_name, args):
+        return self.index(csv_name).query(args)
+
+    def select(self, csv_name, args, max_limit=MAX_LIMIT):
+        """(DataFrame, row positions, columns, total) for a query, see TableIndex.select()."""
+        index = self.index(csv_name)
+        return (index.df,) + index.select(args, max_limit)
@@ -0,0 +1,77 @@
+"""
+Benchmark and optimality check for batch impact prediction and budget allocation.
+
+    python -m benchmarks.bench_allocation [--districts 5000] [--budget 20000] [--step 20]
+
+Times ImpactPredictor.predict_districts over a grid of project settings and
+BudgetAllocator.allocate for both objectives, and checks on small instances that
+the greedy allocation reaches the optimum of an exhaustive search.
+"""
+import argparse
+import itertools
+import time
+import numpy as np
+from backend.ml_models import BudgetAllocator, ImpactPredictor
+from .synthetic import make_districts
+
+
+def timed(label, fn, repeat=5):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    print(f"{label:<52} {np.median(samples) * 1000:10.2f} ms")
+    return result
+
+
+def exhaustive(allocator, total_budget, objective, step, max_steps):
+    """Best objective over every split of total_budget into step increments."""
+    df = allocator.df
+    populations = df['population'].to_numpy(dtype=np.float64)
+    outflows = np.maximum(-df['net_migration'].to_numpy(dtype=np.float64), 0.0)
+    best = 0.0
+    for counts in itertools.product(range(max_steps + 1), repeat=len(df)):
+        if sum(counts) * step > total_budget:
+            continue
+        budgets = np.asarray(counts, dtype=np.float64) * step
+        value = allocator.district_impact(budgets, 10, 50, populations, outflows)[objective]
+        best = max(best, float(value[budgets > 0].sum()))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=5_000)
+    parser.add_argument('--budget', type=float, default=20_000)
+    parser.add_argument('--step', type=float, default=20)
+    args = parser.parse_args()
+
+    df = make_districts(args.districts)
+    grid = [axis.ravel() for axis in np.meshgrid(np.linspace(0, 2000, 10), [5, 10, 20], [25, 50, 75, 100],
+                                                 indexing='ij')]
+    predictor = ImpactPredictor(df)
+    timed(f'predict_districts ({len(df)} x {grid[0].size} scenarios)', lambda: predictor.predict_districts(*grid))
+
+    allocator = BudgetAllocator(df)
+    cells = len(df) * int(args.budget // args.step)
+    for objective in BudgetAllocator.OBJECTIVES:
+        result = timed(f'allocate {objective} ({cells} cells)',
+                       lambda: allocator.allocate(args.budget, objective, step=args.step))
+        assert result['allocated_budget'] <= args.budget
+        print(f"    {result['funded_districts']} districts funded, objective {result['objective_value']:,.0f}")
+
+    rng = np.random.default_rng(0)
+    for trial in range(20):
+        small = BudgetAllocator(df.iloc[rng.choice(len(df), 4, replace=False)])
+        total, step, max_steps = float(rng.integers(1, 7) * 10), 10.0, 6
+        for objective in BudgetAllocator.OBJECTIVES:
+            greedy = small.allocate(total, objective, step=step, max_per_district=max_steps * step)
+            allocated = sum(a['objective_value'] for a in greedy['allocations'])
+            assert abs(allocated - exhaustive(small, total, objective, step, max_steps)) < 0.5, (trial, objective)
+    print('greedy allocation matches an exhaustive search on 20 small instances')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark for the columnar store.
+
+    python -m benchmarks.bench_columnar [--rows 10000000]
+
+Writes a synthetic crop-failure CSV to a temporary data dir, ingests it and
+times group-by aggregates on the memory-mapped columns against pandas groupby
+on the same data, checking that both agree.
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from backend.columnar import ColumnarStore, ingest
+from .synthetic import make_crop_failure
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='fw-columnar-')
+    frame = make_crop_failure(args.rows)
+    timed('write CSV', lambda: frame.to_csv(f'{data_dir}/crop_failure_maharashtra.csv', index=False))
+    timed(f'ingest ({args.rows} rows)', lambda: ingest('crop_failure', data_dir))
+
+    store = ColumnarStore(data_dir)
+    queries = {
+        'district x season x year': {'group_by': 'City_District,Season,Year',
+                                     'metrics': 'mean:Failure_Rate_Percentage,sum:Economic_Loss_Crores'},
+        'season, Year >= 2023, std': {'group_by': 'Season', 'Year__gte': '2023',
+                                     'metrics': 'std:Failure_Rate_Percentage'},
+    }
+    for label, query in queries.items():
+        store.aggregate('crop_failure', query)
+        result = timed(f'aggregate: {label}', lambda: store.aggregate('crop_failure', query))
+        assert result['groups']
+
+    by = ['City_District', 'Season', 'Year']
+    reference = timed('pandas groupby (frame already in memory)',
+                      lambda: frame.groupby(by)['Failure_Rate_Percentage'].mean())
+    got = store.aggregate('crop_failure', queries['district x season x year'])['groups']
+    assert np.allclose([g['mean_Failure_Rate_Percentage'] for g in got], reference.to_numpy())
+    print('columnar aggregates match pandas')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark and correctness check for the stratified fairness audit.
+
+    python -m benchmarks.bench_fairness [--rows 2000000] [--bootstrap 2000]
+
+Times FairnessAuditor.stratified_audit over a synthetic districts frame, checks
+that its overall point values match calculate_fairness_metrics(), and checks
+its stratum values and bootstrap intervals against a row-by-row reference that
+resamples each stratum's blocks in a Python loop with the same draws.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from backend.ml_models import FairnessAuditor
+from .synthetic import make_district_at_risk, make_districts
+
+
+def reference_metrics(frame, complete):
+    """calculate_fairness_metrics() formulas, computed with pandas, unrounded."""
+    if len(frame) < 2:
+        return [np.nan] * len(FairnessAuditor.AUDIT_METRICS)
+
+    def corr(a, b):
+        if frame[a].std() <= 1e-9 * frame[a].abs().max() or frame[b].std() <= 1e-9 * frame[b].abs().max():
+            return 0.0
+        return frame[a].corr(frame[b])
+
+    migration = frame['net_migration']
+    return [
+        complete.mean() * 100,
+        max(0, 100 - abs(corr('water_stress_index', 'marginalized_pop_pct') * 50)),
+        max(0, 100 - abs(corr('crop_failure_rate', 'gender_ratio_female') * 40)),
+        max(0, 100 - abs(corr('drought_index', 'elderly_pop_pct') * 30)),
+        max(0, 100 - migration.std() / migration.mean() * 20) if migration.mean() > 0 else 100.0,
+        85.0 - frame['marginalized_pop_pct'].mean() * 0.5
+    ]
+
+
+def check_against_reference(df, risk, n_bootstrap, seed):
+    auditor = FairnessAuditor(df)
+    audit = auditor.stratified_audit(risk, n_bootstrap=n_bootstrap, seed=seed)
+
+    frame = pd.DataFrame(auditor.moment_matrix(df), columns=FairnessAuditor.MOMENT_COLUMNS)
+    # Missing values are imputed with the means of the whole frame
+    complete = frame.notna().all(axis=1).to_numpy()
+    frame = frame.fillna(frame.mean())
+    families = auditor._strata(risk, frame.to_numpy())
+    k = FairnessAuditor.AUDIT_BLOCKS
+    rng = np.random.default_rng(seed)
+    checked = 0
+    # Same draws as the engine: one uniform matrix over every stratum in order
+    strata = [(family, code, name) for family, (codes, names) in families.items() for code, name in enumerate(names)]
+    uniforms = rng.random((len(strata), n_bootstrap, k))
+    reported = {("overall", "all"): audit["overall"]}
+    reported.update({(family, s["stratum"]): s for family, rows in audit["strata"].items() for s in rows})
+
+    for t, (family, code, name) in enumerate(strata):
+        rows = np.flatnonzero(families[family][0] == code)
+        if len(rows) == 0:
+            continue
+        blocks = [rows[b::k] for b in range(min(k, len(rows)))]
+        point = reference_metrics(frame.iloc[rows], complete[rows])
+        samples = []
+        for r in range(n_bootstrap):
+            drawn = (uniforms[t, r, :len(blocks)] * len(blocks)).astype(int)
+            resampled = np.concatenate([blocks[b] for b in drawn])
+            samples.append(reference_metrics(frame.iloc[resampled], complete[resampled]))
+        with np.errstate(invalid='ignore'):
+            lower, upper = np.nanpercentile(np.asarray(samples, dtype=float), [2.5, 97.5], axis=0)
+        for m, metric in enumerate(reported[(family, name)]["metrics"]):
+            for key, expected in (("value", point[m]), ("ci_lower", lower[m]), ("ci_upper", upper[m])):
+                if np.isnan(expected):
+                    assert metric[key] is None, (family, name, metric)
+                else:
+                    assert abs(metric[key] - expected) <= 0.051, (family, name, metric["name"], key, expected)
+        checked += 1
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--bootstrap', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_districts(args.rows)
+    risk = make_district_at_risk(10_000)
+    auditor = FairnessAuditor(df)
+    samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        audit = auditor.stratified_audit(risk, n_bootstrap=args.bootstrap)
+        samples.append(time.perf_counter() - start)
+    n_strata = 1 + sum(len(rows) for rows in audit['strata'].values())
+    print(f"stratified_audit ({len(df):,} rows, {n_strata} strata, {args.bootstrap} resamples) "
+          f"{np.median(samples) * 1000:10.1f} ms")
+    print(f"    confidence {audit['ai_verification']['confidence']}%, status {audit['ai_verification']['status']}")
+
+    default = {m['name']: m['value'] for m in auditor.calculate_fairness_metrics()['metrics']}
+    for metric in audit['overall']['metrics']:
+        if metric['name'] != 'Geographic Coverage':
+            assert round(metric['value']) == default[metric['name']], (metric, default[metric['name']])
+    print('overall point values match calculate_fairness_metrics()')
+
+    rng = np.random.default_rng(1)
+    for trial in range(3):
+        small = make_districts(int(rng.integers(200, 600)), seed=trial)
+        # Some missing values, so imputation and the coverage metric are exercised
+        small.loc[rng.choice(len(small), 10, replace=False), 'elderly_pop_pct'] = np.nan
+        checked = check_against_reference(small, make_district_at_risk(500, seed=trial), 50, seed=trial)
+        print(f"    trial {trial}: {checked} strata match the loop reference")
+    print('stratified values and bootstrap intervals match a row-by-row reference')
+
+
+if __name__ == '__main__':
+    main()
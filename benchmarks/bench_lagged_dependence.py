@@ -0,0 +1,79 @@
+"""
+Benchmark for the lagged-dependence scan.
+
+    python -m benchmarks.bench_lagged_dependence [--districts 2000] [--years 10]
+
+Generates monthly water-stress and seasonal crop-failure series in which crop
+failure follows water stress with a planted lag, times the full pairwise scan
+(FFT cross-correlations + batched Granger tests over every district) and checks
+that the planted lag is recovered.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from backend.ml_models import LaggedDependenceEngine
+from .synthetic import make_crop_failure, make_water_stress
+
+
+def planted_series(districts, years, lag_months, rows_per_month, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = np.array([f"District {i:04d}" for i in range(districts)])
+    months = years * 12
+    water = make_water_stress(districts * months * rows_per_month, cities, seed=seed, days=1)
+    city = np.repeat(cities, months * rows_per_month)
+    month = np.tile(np.repeat(np.arange(months), rows_per_month), districts)
+    dates = np.datetime64('2015-01', 'M') + month
+    water['City'] = city
+    water['Date'] = (dates.astype('datetime64[D]') + rng.integers(0, 28, len(water))).astype(str)
+
+    # A per-district AR(1) stress signal drives both the water index and later crop failure
+    signal = np.zeros((districts, months + lag_months))
+    shocks = rng.normal(0, 1, signal.shape)
+    for t in range(1, signal.shape[1]):
+        signal[:, t] = 0.5 * signal[:, t - 1] + shocks[:, t]
+    water['Water_Stress_Index'] = np.round(5 + signal[:, lag_months:][np.searchsorted(cities, city), month]
+                                           + rng.normal(0, 0.3, len(water)), 2)
+
+    seasons = [('Kharif', 0, 10), ('Rabi', 1, 3), ('Zaid', 0, 6)]
+    crop = make_crop_failure(districts * years * len(seasons), seed=seed)
+    d = np.repeat(np.arange(districts), years * len(seasons))
+    y = np.tile(np.repeat(np.arange(years), len(seasons)), districts)
+    s = np.tile(np.arange(len(seasons)), districts * years)
+    harvest = (y + np.array([o for _, o, _ in seasons])[s]) * 12 + np.array([m for _, _, m in seasons])[s] - 1
+    keep = harvest < months
+    crop = crop[keep].reset_index(drop=True)
+    d, y, s, harvest = d[keep], y[keep], s[keep], harvest[keep]
+    crop['City_District'] = cities[d]
+    crop['Year'] = 2015 + y
+    crop['Season'] = np.array([name for name, _, _ in seasons])[s]
+    # Failure at month t reflects the stress signal lag_months earlier
+    crop['Failure_Rate_Percentage'] = np.round(40 + 10 * signal[d, harvest] + rng.normal(0, 2, len(crop)), 2)
+    return water, crop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--lag', type=int, default=3)
+    parser.add_argument('--rows-per-month', type=int, default=4)
+    args = parser.parse_args()
+
+    water, crop = planted_series(args.districts, args.years, args.lag, args.rows_per_month)
+    print(f"{len(water)} water-stress rows, {len(crop)} crop-failure rows, {args.districts} districts")
+    engine = LaggedDependenceEngine(water, crop)
+    start = time.perf_counter()
+    results = engine.analyze()
+    print(f"{'full pairwise scan':<38} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    found = next(r for r in results if r['cause_variable'] == 'Water_Stress_Index'
+                 and r['effect_variable'] == 'Failure_Rate_Percentage')
+    print(pd.Series(found).to_string())
+    assert found['lag_months'] == args.lag, found
+    assert found['is_significant'], found
+    print('planted lag recovered')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for PolicyAIModel.simulate on synthetic district frames.
+
+    python -m benchmarks.bench_policy_model [--sizes 50 5000 500000]
+
+Sizes up to --check-max are also timed through a row-by-row reference
+implementation (the original iterrows loop); tests/test_policy_model.py checks
+that the two give identical outputs.
+"""
+import argparse
+import time
+from backend.ml_models import PolicyAIModel
+from .synthetic import make_districts
+
+def reference_simulate(df, water_subsidy, climate_policy, monsoon_modifier, butterfly_effect):
+    results = []
+    total_prevented_migration = 0
+    time_lag_score = 0.85
+    water_impact = (water_subsidy / 100.0) * time_lag_score
+    policy_impact = (climate_policy / 100.0) * time_lag_score
+    monsoon_impact = (monsoon_modifier / 100.0) if butterfly_effect else 0
+    impact_sum = (water_impact * 0.5) + (policy_impact * 0.3) + (monsoon_impact * 0.2)
+
+    for _, district in df.iterrows():
+        base_migration = district['net_migration']
+        base_drought = district['drought_index']
+        if base_drought > 75:
+            efficiency = 0.6
+        elif base_drought < 30:
+            efficiency = 1.2
+        else:
+            efficiency = 1.0
+        simulated_drought = max(0, base_drought - (base_drought * impact_sum * efficiency))
+        if base_migration < 0:
+            sim_migration = base_migration * (1 - impact_sum * efficiency)
+            total_prevented_migration += abs(base_migration - sim_migration)
+        else:
+            sim_migration = base_migration * (1 + (impact_sum * 0.1))
+        is_suitable = simulated_drought < 40 and district['water_stress_index'] < 50
+        results.append({
+            "district_id": district['id'],
+            "district_name": district['name'],
+            "simulated_drought": round(simulated_drought, 1),
+            "simulated_migration": int(sim_migration),
+            "is_suitable_destination": bool(is_suitable),
+            "migration_risk": "High" if simulated_drought > 70 else "Medium" if simulated_drought > 40 else "Low"
+        })
+
+    return {
+        "districts": results,
+        "summary": {
+            "total_prevented_migration": int(total_prevented_migration),
+            "avg_drought_reduction": round(impact_sum * 100, 1),
+            "suitable_destinations_count": sum(1 for r in results if r['is_suitable_destination']),
+        }
+    }
+
+
+def time_call(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 5_000, 500_000])
+    parser.add_argument('--check-max', type=int, default=5_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        df = make_districts(n)
+        model = PolicyAIModel(df)
+        line = f"{n:>9} districts  simulate: {time_call(lambda: model.simulate(50, 30, 0, False), args.repeat) * 1000:9.2f} ms"
+        if n <= args.check_max:
+            ref = time_call(lambda: reference_simulate(df, 50, 30, 0, False), 1)
+            line += f"  reference loop: {ref * 1000:9.2f} ms"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
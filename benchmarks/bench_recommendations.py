@@ -0,0 +1,95 @@
+"""
+Benchmark and equivalence check for the vectorized recommendation rules.
+
+    python -m benchmarks.bench_recommendations [--districts 100000] [--append 1000]
+
+Times evaluating every rule for every district, the per-column and per-rule top-k
+rankings, paging ranked recommendations and folding appended districts into an
+existing state. Checks the vectorized scores against a row-by-row evaluation of the
+rule definitions, the top-k against a full sort, and the incremental state against
+a rebuild.
+"""
+import argparse
+import operator
+import time
+import numpy as np
+import pandas as pd
+from backend.ml_models import RecommendationEngine
+from backend.rules import RECOMMENDATION_RULES, RuleSet, RuleState
+from backend.spatial import SpatialIndex
+from .synthetic import make_districts
+
+OPS = {'>=': operator.ge, '>': operator.gt, '<=': operator.le, '<': operator.lt, '==': operator.eq}
+
+
+def timed(label, fn, repeat=20):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    print(f"{label:<44} {np.median(samples) * 1000:10.2f} ms")
+    return result
+
+
+def reference_scores(df, rules):
+    """Row-by-row evaluation of the rule definitions."""
+    scores = np.full((len(df), len(rules)), -np.inf)
+    for i, row in enumerate(df.to_dict('records')):
+        for j, rule in enumerate(rules):
+            if all(OPS[op](row[c], v) for c, op, v in rule['when']):
+                scores[i, j] = rule.get('intercept', 0.0) + sum(row[c] * w for c, w in rule['score'].items())
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=100_000)
+    parser.add_argument('--append', type=int, default=1_000)
+    args = parser.parse_args()
+
+    df = make_districts(args.districts)
+    ruleset = RuleSet(RECOMMENDATION_RULES, df.columns)
+    print(f"{len(ruleset.rules)} rules over {len(ruleset.columns)} columns, {len(df)} districts")
+
+    state = timed('evaluate all rules + top-k', lambda: RuleState(ruleset, df))
+    engine = RecommendationEngine(df, spatial=SpatialIndex.from_districts(df), rules=state)
+    timed('ranked recommendations, first page of 50', lambda: engine.district_recommendations(50))
+    timed('ranked recommendations, page 100 of 50', lambda: engine.district_recommendations(50, 5000))
+    timed('headline recommendations', engine.get_recommendations)
+
+    sample = df.iloc[:2000]
+    assert np.allclose(RuleState(ruleset, sample).scores, reference_scores(sample, ruleset.rules))
+    print('vectorized scores match a row-by-row evaluation')
+
+    for j, rule in enumerate(ruleset.rules):
+        expected = np.argsort(-state.scores[:, j], kind='stable')[:state.k]
+        expected = expected[np.isfinite(state.scores[expected, j])]
+        assert np.array_equal(state.rule_top[rule['id']].positions, expected), rule['id']
+    for c, top in state.column_top.items():
+        expected = df[c].sort_values(ascending=False, kind='stable').index[:state.k]
+        assert np.array_equal(top.positions, expected), c
+    print('top-k rankings match a full stable sort')
+
+    extra = make_districts(args.append, seed=1)
+    extra['id'] += len(df)
+    grown = pd.concat([df, extra], ignore_index=True)
+
+    def incremental():
+        updated = state.copy()
+        updated.extend(extra)
+        return updated
+    updated = timed(f'fold in {len(extra)} appended districts', incremental)
+    rebuilt = timed(f'rebuild for {len(grown)} districts', lambda: RuleState(ruleset, grown))
+    assert np.array_equal(updated.scores, rebuilt.scores) and np.array_equal(updated.best, rebuilt.best)
+    for c in state.column_top:
+        assert np.array_equal(updated.column_top[c].positions, rebuilt.column_top[c].positions), c
+    for r in state.rule_top:
+        assert np.array_equal(updated.rule_top[r].positions, rebuilt.rule_top[r].positions), r
+    assert len(state.best) == len(df)
+    print('incremental update matches a rebuild and leaves the previous state intact')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark and equivalence check for the shared running moments.
+
+    python -m benchmarks.bench_running_moments [--districts 500000] [--appends 200]
+
+Builds MomentsStore entries for the fairness audit and causal discovery over
+synthetic districts, appends rows through RunStore, and checks that the
+incrementally updated statistics match a full recompute with pandas.
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from backend.datastore import DatasetRegistry, RunStore
+from backend.ml_models import CausalDiscoveryEngine, FairnessAuditor
+from backend.stats import MomentsStore
+from .synthetic import make_districts
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<42} {(time.perf_counter() - start) * 1000:10.2f} ms")
+    return result
+
+
+def check_against_pandas(moments, frame, label):
+    corr = frame.corr().to_numpy()
+    mean = frame.mean().to_numpy()
+    std = frame.std().to_numpy()
+    err = max(np.abs(moments.corr() - corr).max(),
+              np.abs(moments.mean() - mean).max() / np.abs(mean).max(),
+              np.abs(moments.std() - std).max() / np.abs(std).max())
+    print(f"{label:<42} max error {err:.2e}")
+    assert err < 1e-9, label
+
+
+def strip_volatile(links):
+    return [{k: v for k, v in link.items() if k not in ('id', 'lag_days', 'created_at', 'updated_at')}
+            for link in links]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=500_000)
+    parser.add_argument('--appends', type=int, default=200)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='fw-moments-')
+    make_districts(args.districts).to_csv(f'{data_dir}/districts.csv', index=False)
+    datasets = DatasetRegistry(data_dir)
+    store = MomentsStore(datasets)
+    timed('load CSV', lambda: datasets.get('districts.csv'))
+
+    df = datasets.get('districts.csv')
+    engine = CausalDiscoveryEngine(df)
+    causal_key = ('causal',) + tuple(engine.columns())
+    fairness = lambda: store.get('districts.csv', 'fairness', FairnessAuditor.moment_matrix)
+    causal = lambda: store.get('districts.csv', causal_key, engine.moment_matrix)
+    timed('build fairness moments', fairness)
+    timed('build causal moments', causal)
+    timed('fairness audit (cached moments)', lambda: FairnessAuditor(df, fairness()).calculate_fairness_metrics())
+    timed('fairness audit (full recompute)', lambda: FairnessAuditor(df).calculate_fairness_metrics())
+    timed('discover (cached moments)', lambda: engine.discover(causal()))
+    timed('discover (full recompute)', lambda: engine.discover())
+
+    runs = RunStore(datasets)
+    extra = make_districts(args.appends, seed=1)
+    extra['id'] += args.districts
+    start = time.perf_counter()
+    for record in extra.to_dict(orient='records'):
+        runs.append('districts.csv', record)
+        fairness()
+        causal()
+    print(f"{'append + update, per row':<42} {(time.perf_counter() - start) * 1000 / args.appends:10.2f} ms")
+
+    df = datasets.get('districts.csv')
+    assert len(df) == args.districts + args.appends
+    audit_frame = df[FairnessAuditor.MOMENT_COLUMNS].astype(float)
+    audit_frame['net_migration'] = audit_frame['net_migration'].abs()
+    check_against_pandas(fairness(), audit_frame, 'fairness moments vs pandas')
+    check_against_pandas(causal(), df[engine.columns()].astype(float), 'causal moments vs pandas')
+
+    engine = CausalDiscoveryEngine(df)
+    incremental = FairnessAuditor(df, fairness()).calculate_fairness_metrics()['metrics']
+    assert incremental == FairnessAuditor(df).calculate_fairness_metrics()['metrics']
+    assert strip_volatile(engine.discover(causal())) == strip_volatile(engine.discover())
+    print('incremental results match a full recompute')
+
+
+if __name__ == '__main__':
+    main()
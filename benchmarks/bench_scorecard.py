@@ -0,0 +1,73 @@
+"""
+Benchmark for the resilience scorecard join.
+
+    python -m benchmarks.bench_scorecard [--rows 1000000] [--districts 5000]
+
+Writes synthetic districts/resilience_scores CSVs to a temporary data dir and
+times ScorecardIndex (full build, cached query, latest_only, date range and an
+incremental append) against the original nested iterrows join on a sample.
+"""
+import argparse
+import json
+import tempfile
+import time
+from backend.datastore import DatasetRegistry, RunStore
+from backend.scorecard import ScorecardIndex
+from .synthetic import make_districts, make_resilience_scores
+
+
+def reference_scorecard(districts_df, scores_df):
+    scores_dict = {}
+    for _, row in scores_df.iterrows():
+        d_id = str(row['district_id'])
+        if d_id not in scores_dict:
+            scores_dict[d_id] = []
+        scores_dict[d_id].append(row.to_dict())
+    results = []
+    for _, district in districts_df.iterrows():
+        d_obj = district.to_dict()
+        d_obj['resilience_scores'] = scores_dict.get(str(d_obj['id']), [])
+        results.append(d_obj)
+    return results
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<38} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--districts', type=int, default=5_000)
+    parser.add_argument('--reference-rows', type=int, default=20_000)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='fw-scorecard-')
+    districts = make_districts(args.districts)
+    scores = make_resilience_scores(args.rows, districts['id'])
+    districts.to_csv(f'{data_dir}/districts.csv', index=False)
+    scores.to_csv(f'{data_dir}/resilience_scores.csv', index=False)
+
+    datasets = DatasetRegistry(data_dir)
+    timed('load CSVs', lambda: (datasets.get('districts.csv'), datasets.get('resilience_scores.csv')))
+    index = ScorecardIndex(datasets)
+    timed(f'build + query ({args.rows} scores)', index.scorecard_json)
+    timed('query (index cached)', index.scorecard_json)
+    timed('latest_only', lambda: index.scorecard_json(latest_only=True))
+    timed('date_from/date_to (one year)', lambda: index.scorecard_json(date_from='2024-01-01', date_to='2024-12-31'))
+
+    RunStore(datasets).append('resilience_scores.csv', {
+        'id': args.rows + 1, 'district_id': int(districts['id'].iloc[0]), 'score_date': '2026-01-01', 'overall_score': 50.0
+    })
+    result = json.loads(timed('query after 1 appended score', index.scorecard_json))
+    assert result[0]['resilience_scores'][-1]['score_date'] == '2026-01-01'
+
+    sample = scores.iloc[:args.reference_rows]
+    timed(f'reference iterrows join ({len(sample)} scores)', lambda: reference_scorecard(districts, sample))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark and exactness check for the district spatial index and flow assignment.
+
+    python -m benchmarks.bench_spatial [--districts 50000] [--queries 2000]
+
+Times SpatialIndex construction, k-nearest and radius queries against a
+brute-force scan over all districts, and PolicyAIModel.migration_flows, and
+checks that flows conserve people and respect destination capacities.
+"""
+import argparse
+import time
+import numpy as np
+from backend.ml_models import PolicyAIModel
+from backend.spatial import SpatialIndex
+from .synthetic import make_districts
+
+
+def per_query(label, queries, fn):
+    start = time.perf_counter()
+    for qx, qy in queries:
+        fn(qx, qy)
+    print(f"{label:<38} {(time.perf_counter() - start) * 1e6 / len(queries):10.1f} us/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=2_000)
+    parser.add_argument('--k', type=int, default=8)
+    args = parser.parse_args()
+
+    df = make_districts(args.districts)
+    rng = np.random.default_rng(1)
+    queries = np.column_stack([rng.uniform(72.0, 80.0, args.queries), rng.uniform(15.0, 22.0, args.queries)])
+
+    start = time.perf_counter()
+    index = SpatialIndex.from_districts(df)
+    print(f"{'build index':<38} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    px, py = index.project(df['x_coord'].to_numpy(), df['y_coord'].to_numpy())
+    mask = df['water_stress_index'].to_numpy() < 50
+    per_query(f'knn k={args.k}', queries, lambda qx, qy: index.knn(qx, qy, args.k))
+    per_query(f'knn k={args.k}, masked', queries, lambda qx, qy: index.knn(qx, qy, args.k, mask=mask))
+    per_query('radius 25 km', queries, lambda qx, qy: index.radius(qx, qy, 25.0))
+
+    def brute(qx, qy):
+        ax, ay = index.project(qx, qy)
+        return np.sort(np.hypot(px - ax, py - ay))[:args.k]
+    per_query('brute-force knn', queries[:200], brute)
+
+    for qx, qy in queries[:500]:
+        _, dist = index.knn(qx, qy, args.k)
+        assert np.allclose(dist, brute(qx, qy))
+    print('knn matches a brute-force scan')
+
+    model = PolicyAIModel(df)
+    start = time.perf_counter()
+    result = model.migration_flows(60, 40, 0, False, index=index, capacity_pct=2.0)
+    elapsed = time.perf_counter() - start
+    summary = result['summary']
+    print(f"{'migration_flows':<38} {elapsed * 1000:10.1f} ms "
+          f"({summary['source_districts']} sources, {len(result['flows'])} flows)")
+    assert abs(summary['routed_migrants'] + summary['unplaced_migrants'] - summary['total_outflow']) <= 1
+    received, inflows = {}, {}
+    for flow in result['flows']:
+        d = flow['destination_district_id']
+        received[d] = received.get(d, 0) + flow['migrants']
+        inflows[d] = inflows.get(d, 0) + 1
+    population = dict(zip(df['id'], df['population']))
+    # Each flow is rounded to whole people
+    assert all(people <= population[d] * 0.02 + 0.5 * inflows[d] for d, people in received.items())
+    print('flows conserve people and respect capacities')
+
+
+if __name__ == '__main__':
+    main()
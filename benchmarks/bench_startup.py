@@ -0,0 +1,145 @@
+"""
+Startup benchmark: cold start of the production server to first paint.
+
+    python -m benchmarks.bench_startup [--districts 20000] [--rows 200000] [--static-dir dist]
+
+For each serving configuration, starts `python -m backend.serving` on a synthetic
+data directory and measures, from process start: the readiness signal (the port
+accepting connections), and first paint, approximated as index.html, the scripts
+and stylesheets it references, and the API calls of the landing page, fetched
+the way a browser does (compressed, a few requests in parallel); then, a few
+seconds later, the API calls of a second, compute-heavy page. Uses dist/
+when it has a build, otherwise a synthetic one of similar size.
+"""
+import argparse
+import concurrent.futures
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from .synthetic import write_data_dir
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The landing page (CommandCenter) loads districts and causal links
+FIRST_PAINT_API = ['/api/districts', '/api/causal_links']
+# Opening the integrity hub afterwards: discovery, fairness and certificates
+NAVIGATION_API = ['/api/discover_causality', '/api/fairness_audit', '/api/causal_certificates']
+# Think time between the first paint and navigating, as a user would take
+NAVIGATION_AFTER = 5.0
+CONFIGS = [
+    ('werkzeug, no warm-up', ['--server', 'werkzeug', '--no-warm']),
+    ('waitress, no warm-up', ['--server', 'waitress', '--no-warm']),
+    ('waitress, warm-up', ['--server', 'waitress'])
+]
+
+
+def synthetic_dist(out_dir):
+    """index.html plus a ~1 MB script and a stylesheet under assets/, like a Vite build."""
+    os.makedirs(os.path.join(out_dir, 'assets'))
+    with open(os.path.join(out_dir, 'assets', 'index-3f9a1c.js'), 'w') as f:
+        f.write(''.join(f'export function c{i}(a,b){{return a*{i}+b.length}}\n' for i in range(25_000)))
+    with open(os.path.join(out_dir, 'assets', 'index-b27e40.css'), 'w') as f:
+        f.write(''.join(f'.c{i}{{margin:{i % 16}px;color:#{i % 4096:03x}}}\n' for i in range(4_000)))
+    with open(os.path.join(out_dir, 'index.html'), 'w') as f:
+        f.write('<!doctype html><html><head><script type="module" src="/assets/index-3f9a1c.js"></script>'
+                '<link rel="stylesheet" href="/assets/index-b27e40.css"></head><body><div id="root"></div></body></html>')
+    return out_dir
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={'Accept-Encoding': 'br, gzip'})
+    with urllib.request.urlopen(request, timeout=600) as resp:
+        return resp.read()
+
+
+def wait_ready(port, process, timeout=600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.05):
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError('server did not become ready')
+
+
+def first_paint(base):
+    """Bytes transferred for the landing page: the document, then its assets and API calls in parallel."""
+    html = fetch(base + '/').decode('utf-8', 'replace')
+    assets = re.findall(r'(?:src|href)="(/assets/[^"]+)"', html)
+    with concurrent.futures.ThreadPoolExecutor(6) as pool:
+        bodies = list(pool.map(fetch, [base + path for path in assets + FIRST_PAINT_API]))
+    return len(html) + sum(len(b) for b in bodies)
+
+
+def run(config_args, data_dir, static_dir):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'backend.serving', '--port', str(port), '--data-dir', data_dir,
+         '--static-dir', static_dir] + config_args,
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(port, process)
+        ready = time.perf_counter() - start
+        transferred = first_paint(f'http://127.0.0.1:{port}')
+        painted = time.perf_counter() - start
+        time.sleep(NAVIGATION_AFTER)
+        navigate = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(6) as pool:
+            list(pool.map(fetch, [f'http://127.0.0.1:{port}{path}' for path in NAVIGATION_API]))
+        return ready, painted, time.perf_counter() - navigate, transferred
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=20_000)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--static-dir', default=os.path.join(ROOT, 'dist'))
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='fw-startup-')
+    try:
+        data_dir = os.path.join(work, 'data')
+        os.makedirs(data_dir)
+        write_data_dir(data_dir, args.districts, args.rows, history_rows=min(args.rows, 10_000))
+        static_dir = args.static_dir
+        if not os.path.exists(os.path.join(static_dir, 'index.html')):
+            static_dir = synthetic_dist(os.path.join(work, 'dist'))
+
+        print(f"{args.districts:,} districts, {args.rows:,} rows per history dataset")
+        print(f"{'configuration':<26} {'ready ms':>10} {'first paint ms':>15} {'next page ms':>13} {'KiB':>8}")
+        for label, config_args in CONFIGS:
+            if '--server' in config_args and config_args[config_args.index('--server') + 1] == 'waitress':
+                try:
+                    import waitress  # noqa: F401
+                except ImportError:
+                    print(f"{label:<26} skipped (waitress not installed)")
+                    continue
+            ready, painted, navigated, transferred = run(config_args, data_dir, static_dir)
+            print(f"{label:<26} {ready * 1000:10.0f} {painted * 1000:15.0f} {navigated * 1000:13.0f} "
+                  f"{transferred / 1024:8.0f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark for the NDJSON streaming mode of /api/simulate_policy and the table routes.
+
+    python -m benchmarks.bench_streaming [--districts 1000000] [--iterations 100]
+
+Serves a synthetic data directory and, for each route, compares the buffered JSON
+response with the streamed one (?stream=1): time to first byte, total time and
+peak traced memory while the body is produced. Checks that the streamed records
+and trailing summary equal the buffered response.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from backend.server import create_app
+from .synthetic import write_data_dir
+
+
+def measure(client, method, path, payload):
+    """
+    (first byte s, total s, peak MiB) of one request. The body is consumed chunk by
+    chunk and dropped, as a client writing it out would, so the peak is the server's.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    resp = client.open(path, method=method, json=payload, buffered=False)
+    chunks = iter(resp.response)
+    next(chunks, b'')
+    first = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    total = time.perf_counter() - start
+    resp.close()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    assert resp.status_code == 200, (path, resp.status_code)
+    return first, total, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--districts', type=int, default=1_000_000)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='fw-stream-')
+    try:
+        write_data_dir(data_dir, args.districts, 1000, history_rows=1000)
+        app = create_app(data_dir)
+        client = app.test_client()
+        client.get('/api/districts?limit=1')     # loads and indexes districts.csv
+        payload = {'water_subsidy_input': 60, 'climate_policy_input': 40, 'iterations': args.iterations, 'seed': 0}
+        cases = [
+            ('POST /api/simulate_policy', 'POST', '/api/simulate_policy', payload, 'districts'),
+            ('GET /api/districts', 'GET', '/api/districts', None, None)
+        ]
+        print(f"{'case':<44} {'first byte ms':>14} {'total ms':>10} {'peak MiB':>9}")
+        for label, method, path, body, key in cases:
+            for mode, suffix in (('buffered', ''), ('stream', '?stream=1')):
+                first, total, peak = measure(client, method, path + suffix, body)
+                print(f"{label + ' [' + mode + ']':<44} {first * 1000:14.1f} {total * 1000:10.1f} {peak:9.1f}")
+
+            expected = client.open(path, method=method, json=body).get_json()
+            records = [json.loads(line) for line in client.open(path + '?stream=1', method=method, json=body)
+                       .get_data(as_text=True).splitlines()]
+            if key is None:
+                assert records[:-1] == expected and records[-1]['summary']['rows'] == len(expected), label
+            else:
+                assert records[:-1] == expected[key] and records[-1]['summary'] == expected['summary'], label
+        print('streamed records and summaries match the buffered responses')
+        app.extensions['jobs'].shutdown()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
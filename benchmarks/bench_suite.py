@@ -0,0 +1,296 @@
+"""
+Benchmark suite for every backend engine and Flask route on synthetic data.
+
+    python -m benchmarks.bench_suite [--scales 1000 100000] [--out baseline.json]
+    python -m benchmarks.bench_suite --compare baseline.json [--threshold 1.2]
+
+For each scale (rows per event/score/Maharashtra table; districts default to
+scale // 10) a synthetic data dir is written with benchmarks.synthetic, then each
+engine is timed directly and each route through the Flask test client. Reports
+p50/p99 latency, throughput (rows/s at p50), the first (cold) call and the peak
+traced allocation of one extra call under tracemalloc. --out saves the results
+as JSON; --compare diffs them against a saved baseline and exits non-zero when a
+case's p50 regressed by more than --threshold (and --min-delta-ms).
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from backend.datastore import DatasetRegistry
+from backend.ml_models import (
+    BudgetAllocator, CausalDiscoveryEngine, FairnessAuditor, ImpactPredictor, LaggedDependenceEngine, PolicyAIModel,
+    RecommendationEngine, RefutationEngine
+)
+from backend.rules import RECOMMENDATION_RULES, RuleSet, RuleState
+from backend.scorecard import ScorecardIndex
+from backend.spatial import SpatialIndex
+from backend.table_query import TableQueryEngine
+from backend.columnar import ColumnarStore
+from backend.server import create_app
+from .synthetic import write_data_dir
+
+
+def measure(fn, repeat, budget):
+    """Runs fn once cold, then up to `repeat` times (at least 3, within `budget` seconds)."""
+    start = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - start
+
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < repeat and (len(samples) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples = np.asarray(samples)
+    return {
+        "runs": len(samples),
+        "cold_ms": round(cold * 1000, 3),
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(samples, 99)) * 1000, 3),
+        "mean_ms": round(float(samples.mean()) * 1000, 3),
+        "peak_mib": round(peak / 2 ** 20, 2)
+    }
+
+
+def engine_cases(data_dir):
+    """(name, rows processed per call, fn) for each engine, on a warm registry."""
+    datasets = DatasetRegistry(data_dir)
+    districts = datasets.get('districts.csv')
+    water = datasets.get('water_stress_maharashtra.csv')
+    crop = datasets.get('crop_failure_maharashtra.csv')
+    risk = datasets.get('district_at_risk_maharashtra.csv')
+    scores_rows = len(datasets.get('resilience_scores.csv'))
+    model = PolicyAIModel(districts)
+    grid = np.linspace(0, 100, 10)
+    queries = TableQueryEngine(datasets)
+    query_args = {'sort': '-drought_index', 'water_stress_index__gte': '50', 'limit': '100'}
+    spatial = SpatialIndex.from_districts(districts)
+    rules = RuleState(RuleSet(RECOMMENDATION_RULES, districts.columns), districts)
+    columnar = ColumnarStore(data_dir)
+    columnar.aggregate('crop_failure_by_district', {})
+
+    def load(csv_name):
+        return lambda: pd.read_csv(os.path.join(data_dir, csv_name))
+
+    return [
+        ('csv_load:districts', len(districts), load('districts.csv')),
+        ('csv_load:resilience_scores', scores_rows, load('resilience_scores.csv')),
+        ('csv_load:water_stress', len(water), load('water_stress_maharashtra.csv')),
+        ('PolicyAIModel.simulate', len(districts), lambda: model.simulate(60, 40, 5, True)),
+        ('PolicyAIModel.simulate_grid[100]', 100 * len(districts),
+         lambda: model.simulate_grid(*[a.ravel() for a in np.meshgrid(grid, grid, indexing='ij')], 0, False)),
+        ('PolicyAIModel.monte_carlo[100]', 100 * len(districts),
+         lambda: model.monte_carlo(60, 40, 5, True, iterations=100, seed=0)),
+        ('PolicyAIModel.migration_flows', len(districts),
+         lambda: model.migration_flows(60, 40, 5, True, index=spatial)),
+        ('SpatialIndex.build', len(districts), lambda: SpatialIndex.from_districts(districts)),
+        ('SpatialIndex.knn[k=8]', len(districts), lambda: spatial.knn(76.0, 18.5, 8)),
+        ('CausalDiscoveryEngine.discover', len(districts), lambda: CausalDiscoveryEngine(districts).discover()),
+        ('RefutationEngine.refute[1000 placebo]', 1400 * len(districts),
+         lambda: RefutationEngine(districts, 'drought_index', 'crop_failure_rate', ['water_stress_index']).refute()),
+        ('FairnessAuditor.calculate_fairness_metrics', len(districts),
+         lambda: FairnessAuditor(districts).calculate_fairness_metrics()),
+        ('FairnessAuditor.stratified_audit[2000]', len(districts),
+         lambda: FairnessAuditor(districts).stratified_audit(risk, n_bootstrap=2000)),
+        ('RecommendationEngine.get_recommendations', len(districts),
+         lambda: RecommendationEngine(districts).get_recommendations()),
+        ('ImpactPredictor.predict_districts[100]', 100 * len(districts),
+         lambda: ImpactPredictor(districts).predict_districts(np.linspace(0, 2000, 100), 10, 50)),
+        ('BudgetAllocator.allocate', len(districts),
+         lambda: BudgetAllocator(districts).allocate(10 * len(districts), step=10)),
+        ('RuleState.evaluate', len(districts),
+         lambda: RuleState(RuleSet(RECOMMENDATION_RULES, districts.columns), districts)),
+        ('RecommendationEngine.district_recommendations[50]', len(districts),
+         lambda: RecommendationEngine(districts, rules=rules).district_recommendations(50)),
+        ('ScorecardIndex.build', scores_rows, lambda: ScorecardIndex(datasets).scorecard_json()),
+        ('LaggedDependenceEngine.analyze', len(water) + len(crop),
+         lambda: LaggedDependenceEngine(water, crop).analyze()),
+        ('TableQueryEngine.query', len(districts),
+         lambda: TableQueryEngine(datasets).query('districts.csv', query_args)),
+        ('TableQueryEngine.query (indexed)', len(districts), lambda: queries.query('districts.csv', query_args)),
+        ('ColumnarStore.aggregate', len(crop), lambda: columnar.aggregate('crop_failure_by_district', {}))
+    ]
+
+
+def route_cases(client, data_dir):
+    """(name, fn) for each route; each fn raises if the route does not answer 2xx."""
+    district_id = int(pd.read_csv(os.path.join(data_dir, 'districts.csv'), usecols=['id'], nrows=1)['id'][0])
+    counter = iter(range(10 ** 9))
+
+    def call(method, path, payload=None):
+        def fn():
+            body = payload() if callable(payload) else payload
+            resp = client.open(path, method=method, json=body)
+            if resp.status_code >= 300:
+                raise RuntimeError(f'{method} {path} answered {resp.status_code}: {resp.get_data(as_text=True)[:200]}')
+            resp.get_data()
+        return fn
+
+    gets = [
+        '/api/districts', '/api/districts?sort=-drought_index&limit=100', '/api/causal_links',
+        '/api/counterfactual_scenarios', '/api/fairness_audit', '/api/resilience_scores',
+        '/api/resilience_scorecard', '/api/resilience_scorecard?latest_only=true', '/api/simulation_runs',
+        '/api/causal_certificates', '/api/migration_events', '/api/policy_interventions',
+        '/api/discover_causality', '/api/lagged_dependence', '/api/ai_recommendations',
+        '/api/ai_recommendations/districts?limit=50',
+        '/api/aggregates/crop_failure_by_district', '/api/metrics', '/api/districts?stream=1'
+    ]
+    cases = [(f'GET {path}', call('GET', path)) for path in gets]
+    cases += [
+        # Fresh lever settings each call, so the result memo never hits
+        ('POST /api/simulate_policy', call('POST', '/api/simulate_policy', lambda: {
+            'water_subsidy_input': next(counter) % 10_000 / 100.0, 'climate_policy_input': 40, 'seed': 0})),
+        ('POST /api/simulate_policy?stream=1', call('POST', '/api/simulate_policy?stream=1', {
+            'water_subsidy_input': 60, 'climate_policy_input': 40, 'seed': 0})),
+        ('POST /api/simulate_policy (memo hit)', call('POST', '/api/simulate_policy', {
+            'water_subsidy_input': 55, 'climate_policy_input': 40, 'seed': 0})),
+        ('POST /api/simulate_policy_grid', call('POST', '/api/simulate_policy_grid', {
+            'water_subsidy_input': list(range(0, 101, 10)), 'climate_policy_input': list(range(0, 101, 10))})),
+        ('POST /api/generate_dynamic_counterfactuals', call('POST', '/api/generate_dynamic_counterfactuals', {
+            'water_subsidy': 70, 'climate_policy': 40})),
+        ('POST /api/predict_impact', call('POST', '/api/predict_impact', {'district_id': district_id})),
+        ('POST /api/predict_impact/batch', call('POST', '/api/predict_impact/batch', {
+            'budget': [100, 500, 1000], 'scale': [25, 50, 75]})),
+        ('POST /api/allocate_budget', call('POST', '/api/allocate_budget', {
+            'total_budget': 5000, 'objective': 'projected_migration_reduction'})),
+        ('GET /api/fairness_audit?mode=stratified', call('GET', '/api/fairness_audit?mode=stratified')),
+        ('GET /api/districts/<id>/neighbors', call('GET', f'/api/districts/{district_id}/neighbors?k=8')),
+        ('POST /api/migration_flows', call('POST', '/api/migration_flows', {'water_subsidy_input': 60}))
+    ]
+    # Refutes whichever link discovery finds in the synthetic data, if any
+    links = client.get('/api/discover_causality').get_json()
+    if links:
+        cases.append(('POST /api/causal_certificates/refute', call('POST', '/api/causal_certificates/refute', {
+            'cause_variable': links[0]['cause_variable'], 'effect_variable': links[0]['effect_variable'],
+            'n_placebo': 200, 'n_common_cause': 50, 'n_subsets': 50})))
+    return cases
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(scales, districts, repeat, budget, only):
+    results = {}
+    for scale in scales:
+        n_districts = districts or max(50, scale // 10)
+        data_dir = tempfile.mkdtemp(prefix=f'fw-suite-{scale}-')
+        start = time.perf_counter()
+        write_data_dir(data_dir, n_districts, scale, history_rows=min(scale, 10_000))
+        print(f"\n== scale {scale:,} rows, {n_districts:,} districts "
+              f"(generated in {time.perf_counter() - start:.1f}s, {data_dir})")
+        print(f"{'case':<52} {'p50 ms':>10} {'p99 ms':>10} {'cold ms':>10} {'rows/s':>12} {'peak MiB':>9}")
+
+        def report(group, name, rows, stats):
+            if rows:
+                stats['rows'] = rows
+                stats['rows_per_s'] = round(rows / max(stats['p50_ms'] / 1000, 1e-9))
+            results[f'{scale}/{group}/{name}'] = stats
+            throughput = f"{stats['rows_per_s']:,}" if rows else '-'
+            print(f"{name:<52} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} {stats['cold_ms']:>10.3f} "
+                  f"{throughput:>12} {stats['peak_mib']:>9.2f}")
+
+        if only in (None, 'engines'):
+            for name, rows, fn in engine_cases(data_dir):
+                report('engine', name, rows, measure(fn, repeat, budget))
+        if only in (None, 'routes'):
+            app = create_app(data_dir)
+            try:
+                for name, fn in route_cases(app.test_client(), data_dir):
+                    try:
+                        report('route', name, None, measure(fn, repeat, budget))
+                    except RuntimeError as e:
+                        results[f'{scale}/route/{name}'] = {"error": str(e)}
+                        print(f"{name:<52} ERROR {e}")
+            finally:
+                app.extensions['jobs'].shutdown()
+    return results
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """
+    Prints p50 ratios current/baseline; returns the names of cases slower than
+    threshold by more than min_delta_ms (sub-millisecond cases are mostly noise).
+    """
+    regressions = []
+    print(f"\n{'case':<72} {'base p50':>10} {'new p50':>10} {'ratio':>7}")
+    for name in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(name, {}), current.get(name, {})
+        if 'p50_ms' not in old or 'p50_ms' not in new:
+            print(f"{name:<72} {old.get('p50_ms', '-')!s:>10} {new.get('p50_ms', '-')!s:>10}       -")
+            continue
+        ratio = new['p50_ms'] / max(old['p50_ms'], 1e-6)
+        flag = ''
+        if ratio > threshold and new['p50_ms'] - old['p50_ms'] > min_delta_ms:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / threshold and old['p50_ms'] - new['p50_ms'] > min_delta_ms:
+            flag = '  faster'
+        print(f"{name:<72} {old['p50_ms']:>10.3f} {new['p50_ms']:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--districts', type=int, default=None, help='districts per scale (default scale // 10)')
+    parser.add_argument('--repeat', type=int, default=30, help='max timed runs per case')
+    parser.add_argument('--budget', type=float, default=2.0, help='seconds of timed runs per case')
+    parser.add_argument('--only', choices=['engines', 'routes'], default=None)
+    parser.add_argument('--out', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON to diff against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='p50 ratio that counts as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='ignore p50 changes smaller than this')
+    args = parser.parse_args()
+
+    results = run_suite(args.scales, args.districts, args.repeat, args.budget, args.only)
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scales": args.scales
+        },
+        "cases": results
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {len(results)} cases to {args.out}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Baseline: {baseline['meta'].get('git_revision')} ({baseline['meta'].get('created_at')})")
+        regressions = compare(baseline['cases'], results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.threshold}x the baseline")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Stress test for the append-only run store.
+
+    python -m benchmarks.stress_run_store [--requests 400] [--threads 32]
+
+Starts the app on a threaded local server over a temporary copy of data/,
+fires parallel POSTs at /api/simulate_policy, /api/simulation_runs and
+/api/causal_certificates, then checks that every posted row was persisted
+exactly once.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from werkzeug.serving import WSGIRequestHandler, make_server
+from backend.datastore import DATA_DIR
+from backend.server import create_app
+
+ROUTES = [
+    ('/api/simulate_policy', 'simulation_runs.csv', lambda i: {"water_subsidy_input": i % 100, "run_name": f"stress-{i}", "iterations": 10}),
+    ('/api/simulation_runs', 'simulation_runs.csv', lambda i: {"run_name": f"stress-{i}", "status": "completed"}),
+    ('/api/causal_certificates', 'causal_certificates.csv', lambda i: {"certificate_type": "placebo", "validity_reason": f"stress-{i}"}),
+]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def post(base_url, path, payload):
+    req = urllib.request.Request(
+        base_url + path, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(req) as resp:
+        return resp.status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=32)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='fw-stress-')
+    shutil.copytree(DATA_DIR, data_dir, dirs_exist_ok=True)
+    server = make_server('127.0.0.1', 0, create_app(data_dir), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    before = {csv: len(pd.read_csv(f'{data_dir}/{csv}')) for _, csv, _ in ROUTES}
+    expected = dict.fromkeys(before, 0)
+    jobs = []
+    for i in range(args.requests):
+        path, csv, payload = ROUTES[i % len(ROUTES)]
+        expected[csv] += 1
+        jobs.append((path, payload(i)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        statuses = list(pool.map(lambda job: post(base_url, *job), jobs))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    ok = True
+    for csv, n_before in before.items():
+        df = pd.read_csv(f'{data_dir}/{csv}')
+        added = len(df) - n_before
+        duplicated = int(df['id'].duplicated().sum())
+        print(f"{csv:<26} expected +{expected[csv]:<5} got +{added:<5} duplicate ids: {duplicated}")
+        ok = ok and added == expected[csv] and duplicated == 0
+    print(f"{args.requests} requests on {args.threads} threads in {elapsed:.2f}s, statuses: {sorted(set(statuses))}")
+    shutil.rmtree(data_dir)
+    if not ok:
+        raise SystemExit("rows were lost or duplicated")
+
+
+if __name__ == '__main__':
+    main()
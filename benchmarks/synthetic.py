@@ -0,0 +1,356 @@
+"""
+Schema-faithful synthetic versions of the datasets under data/, for benchmarks.
+
+    python -m benchmarks.synthetic OUT_DIR [--districts 1000] [--rows 100000]
+"""
+import os
+import uuid
+import argparse
+import numpy as np
+import pandas as pd
+
+BASE_DISTRICTS = [
+    'Ahmednagar', 'Akola', 'Amravati', 'Aurangabad', 'Beed', 'Bhandara', 'Buldhana',
+    'Chandrapur', 'Dhule', 'Gadchiroli', 'Gondia', 'Hingoli', 'Jalgaon', 'Jalna',
+    'Kolhapur', 'Latur', 'Mumbai', 'Nagpur', 'Nanded', 'Nandurbar', 'Nashik',
+    'Osmanabad', 'Palghar', 'Parbhani', 'Pune', 'Raigad', 'Ratnagiri', 'Sangli',
+    'Satara', 'Sindhudurg', 'Solapur', 'Thane', 'Wardha', 'Washim', 'Yavatmal'
+]
+
+
+def make_districts(n, seed=0):
+    """Synthetic frame with the columns and value ranges of data/districts.csv."""
+    rng = np.random.default_rng(seed)
+    base = rng.choice(BASE_DISTRICTS, size=n)
+    ids = np.arange(1, n + 1)
+    now = pd.Timestamp('2026-01-26T06:19:58.545119')
+    return pd.DataFrame({
+        'id': ids,
+        'name': [f"{b} - Locality {i}" for b, i in zip(base, range(n))],
+        'code': [f"{b[:3].upper()}{i:03d}" for b, i in zip(base, range(n))],
+        'x_coord': np.round(rng.uniform(72.0, 80.0, n), 4),
+        'y_coord': np.round(rng.uniform(15.0, 22.0, n), 4),
+        'elevation': rng.integers(50, 1200, n),
+        'area_sq_km': rng.integers(50, 5000, n),
+        'population': rng.integers(50_000, 2_000_000, n),
+        'drought_index': rng.integers(10, 92, n),
+        'water_stress_index': rng.integers(10, 95, n),
+        'crop_failure_rate': rng.integers(0, 80, n),
+        'net_migration': rng.integers(-15_000, 15_000, n),
+        'gender_ratio_male': np.round(rng.uniform(50.0, 53.0, n), 1),
+        'gender_ratio_female': np.round(rng.uniform(47.3, 50.0, n), 1),
+        'marginalized_pop_pct': rng.integers(5, 40, n),
+        'elderly_pop_pct': rng.integers(5, 20, n),
+        'created_at': (now - pd.Timedelta(days=365)).isoformat(),
+        'updated_at': now.isoformat()
+    })
+
+
+def make_resilience_scores(n, district_ids, seed=0):
+    """Synthetic frame with the columns of data/resilience_scores.csv."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365, n), unit='D')
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'district_id': rng.choice(np.asarray(district_ids), size=n),
+        'score_date': dates.strftime('%Y-%m-%d'),
+        'climate_resilience': np.round(rng.uniform(0, 100, n), 1),
+        'social_risk_index': rng.integers(0, 100, n),
+        'infrastructure_score': rng.integers(0, 100, n),
+        'economic_diversity': rng.integers(0, 100, n),
+        'water_security': rng.integers(0, 100, n),
+        'overall_score': np.round(rng.uniform(0, 100, n), 1),
+        'trend': rng.choice(['improving', 'stable', 'declining'], size=n),
+        'created_at': '2025-09-15T06:19:58.976948'
+    })
+
+
+def make_crop_failure(n, seed=0):
+    """Synthetic frame with the columns of data/crop_failure_maharashtra.csv."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'City_District': rng.choice(BASE_DISTRICTS, size=n),
+        'Year': rng.integers(2019, 2025, n),
+        'Season': rng.choice(['Kharif', 'Rabi', 'Zaid'], size=n),
+        'Crop_Type': rng.choice(['Cotton', 'Jowar', 'Soybean', 'Sugarcane', 'Rice', 'Wheat'], size=n),
+        'Failure_Rate_Percentage': np.round(rng.uniform(5, 95, n), 2),
+        'Affected_Area_Hectares': np.round(rng.uniform(100, 5000, n), 2),
+        'Primary_Cause': rng.choice(['Drought', 'Flood', 'Pest Attack', 'Unseasonal Rain'], size=n),
+        'Economic_Loss_Crores': np.round(rng.uniform(1, 200, n), 2)
+    })
+
+
+def make_water_stress(n, cities=None, seed=0, start='2023-01-01', days=3 * 365):
+    """Synthetic frame with the columns of data/water_stress_maharashtra.csv."""
+    rng = np.random.default_rng(seed)
+    cities = BASE_DISTRICTS if cities is None else cities
+    dates = np.datetime64(start) + rng.integers(0, days, n)
+    availability = rng.integers(40, 120, n)
+    demand = rng.integers(100, 200, n)
+    stress = np.round(np.clip(demand / availability * 2 + rng.normal(0, 1, n), 0, 10), 2)
+    return pd.DataFrame({
+        'City': rng.choice(cities, size=n),
+        'Date': dates.astype(str),
+        'Water_Stress_Index': stress,
+        'Availability_Liters_Per_Capita': availability,
+        'Demand_Liters_Per_Capita': demand,
+        'Groundwater_Level_Meters': np.round(rng.uniform(5, 80, n), 1),
+        'Risk_Category': np.select([stress > 7, stress > 5, stress > 3], ['Extremely High', 'High', 'Medium'], 'Low')
+    })
+
+
+ORIGINS = {
+    'Bihar': ['Patna', 'Gaya', 'Muzaffarpur'], 'Uttar Pradesh': ['Lucknow', 'Varanasi', 'Kanpur'],
+    'Madhya Pradesh': ['Indore', 'Bhopal', 'Jabalpur'], 'Rajasthan': ['Jaipur', 'Jodhpur', 'Udaipur'],
+    'West Bengal': ['Kolkata', 'Howrah', 'Siliguri'], 'Odisha': ['Bhubaneswar', 'Cuttack'],
+    'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara'], 'Telangana': ['Hyderabad', 'Warangal'],
+    'Andhra Pradesh': ['Visakhapatnam', 'Vijayawada'], 'Chhattisgarh': ['Raipur', 'Bhilai'],
+    'Karnataka': ['Bengaluru', 'Belagavi', 'Hubli']
+}
+CAUSAL_VARIABLES = [
+    'drought_index', 'water_stress_index', 'crop_failure_rate', 'net_migration', 'elevation',
+    'population', 'economic_loss', 'policy_index', 'infrastructure_quality'
+]
+
+
+def _timestamps(rng, n, start, days):
+    """ISO timestamps (microsecond precision) in [start, start + days), like the app's created_at columns."""
+    offsets = rng.integers(0, days * 86_400_000_000, n).astype('timedelta64[us]')
+    return np.datetime_as_string(np.datetime64(start, 'us') + offsets, unit='us')
+
+
+def _dates(rng, n, start, days):
+    return np.datetime_as_string(np.datetime64(start, 'D') + rng.integers(0, days, n), unit='D')
+
+
+def _numbered(prefix, ids, width):
+    return np.char.add(prefix, np.char.zfill(ids.astype(str), width))
+
+
+def make_migration_events(n, district_ids, seed=0):
+    """Synthetic frame with the columns of data/migration_events.csv."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'district_id': rng.choice(np.asarray(district_ids), size=n),
+        'event_type': rng.choice(['Drought', 'Heatwave', 'Water Crisis', 'Crop Failure', 'Flood'], size=n),
+        'severity': rng.choice(['Low', 'Medium', 'High', 'Critical'], size=n),
+        'impact_score': np.round(rng.uniform(0.1, 0.99, n), 2),
+        'event_date': _dates(rng, n, '2023-01-01', 3 * 365),
+        'description': 'Automated monitoring detected surge in regional indicators.',
+        'created_at': _timestamps(rng, n, '2025-01-26', 365)
+    })
+
+
+def make_active_migrants(n, seed=0):
+    """Synthetic frame with the columns of data/active_migrants_maharashtra.csv."""
+    rng = np.random.default_rng(seed)
+    states = np.array(list(ORIGINS))
+    state = rng.integers(0, len(states), n)
+    # Origin city drawn from the origin state's own cities
+    cities = [np.array(ORIGINS[s]) for s in states]
+    pick = rng.random(n)
+    origin_city = np.empty(n, dtype=object)
+    for i, options in enumerate(cities):
+        mask = state == i
+        origin_city[mask] = options[(pick[mask] * len(options)).astype(int)]
+    return pd.DataFrame({
+        'Migrant_ID': _numbered('MIG', np.arange(1, n + 1), 5),
+        'Current_City': rng.choice(BASE_DISTRICTS + ['Navi Mumbai', 'Mira-Bhayandar', 'Kalyan-Dombivli'], size=n),
+        'Origin_State': states[state],
+        'Origin_City': origin_city,
+        'Age': rng.integers(18, 61, n),
+        'Gender': rng.choice(['Male', 'Female', 'Other'], size=n, p=[0.6, 0.35, 0.05]),
+        'Occupation': rng.choice([
+            'Construction Worker', 'Factory Worker', 'Daily Wage Laborer', 'Domestic Help',
+            'Security Guard', 'Driver', 'Small Vendor', 'Agricultural Laborer'
+        ], size=n),
+        'Migration_Reason': rng.choice(['Employment', 'Family Move', 'Education', 'Displacement', 'Marriage'], size=n),
+        'Migration_Date': _dates(rng, n, '2021-01-01', 5 * 365),
+        'Status': 'Active'
+    })
+
+
+def make_district_at_risk(n, seed=0):
+    """Synthetic frame with the columns of data/district_at_risk_maharashtra.csv."""
+    rng = np.random.default_rng(seed)
+    water, economic, infrastructure = (np.round(rng.uniform(1, 10, n), 2) for _ in range(3))
+    composite = np.round((water + economic + infrastructure) / 3, 2)
+    return pd.DataFrame({
+        'Record_ID': _numbered('DR_', np.arange(10_000, 10_000 + n), 5),
+        'District': rng.choice(BASE_DISTRICTS, size=n),
+        'Year': rng.integers(2020, 2025, n),
+        'Water_Risk_Score': water,
+        'Economic_Risk_Score': economic,
+        'Infrastructure_Risk_Score': infrastructure,
+        'Composite_Risk_Score': composite,
+        'Risk_Category': np.select([composite > 7.5, composite > 5.5, composite > 3.5], ['Critical', 'High', 'Medium'], 'Low'),
+        'Primary_Risk_Factor': rng.choice([
+            'Drought Susceptibility', 'Groundwater Depletion', 'Flood Risk', 'Unemployment',
+            'Industrial Decline', 'Inflation Impact', 'Aging Infrastructure'
+        ], size=n)
+    })
+
+
+def make_causal_links(n, seed=0):
+    """Synthetic frame with the columns of data/causal_links.csv."""
+    rng = np.random.default_rng(seed)
+    strength = np.round(rng.uniform(-0.9, 0.9, n), 2)
+    half_width = np.round(rng.uniform(0.03, 0.15, n), 2)
+    nonlinear = rng.random(n) < 0.4
+    cause = rng.integers(0, len(CAUSAL_VARIABLES), n)
+    effect = (cause + rng.integers(1, len(CAUSAL_VARIABLES), n)) % len(CAUSAL_VARIABLES)
+    return pd.DataFrame({
+        'id': [str(uuid.UUID(int=int(v))) for v in rng.integers(0, 2 ** 63, n)],
+        'cause_variable': np.array(CAUSAL_VARIABLES)[cause],
+        'effect_variable': np.array(CAUSAL_VARIABLES)[effect],
+        'lag_days': rng.integers(0, 365, n),
+        'strength': strength,
+        'confidence_lower': np.round(strength - half_width, 2),
+        'confidence_upper': np.round(strength + half_width, 2),
+        'p_value': rng.choice([0.001, 0.01, 0.02, 0.04], size=n),
+        'is_nonlinear': nonlinear,
+        'nonlinearity_type': np.where(nonlinear, rng.choice(['Quadratic', 'Sigmoid', 'Logarithmic'], size=n), None),
+        'sample_size': rng.integers(100, 2000, n),
+        'analysis_method': rng.choice(['Constraint-based', 'PC Algorithm', 'Granger Causality', 'DirectLiNGAM'], size=n),
+        'created_at': '2024-01-01T00:00:00Z',
+        'updated_at': '2024-01-01T00:00:00Z'
+    })
+
+
+def make_counterfactual_scenarios(n, seed=0):
+    """Synthetic frame with the columns of data/counterfactual_scenarios.csv."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1)
+    labels = np.char.zfill(ids.astype(str), 4)
+    baseline = {
+        'migration': rng.integers(10_000, 60_000, n), 'water_stress': rng.integers(30, 95, n),
+        'crop_failure': rng.integers(10, 80, n), 'economic_loss': rng.integers(300, 1500, n)
+    }
+    projected = {k: np.maximum(0, v - (v * rng.uniform(0.1, 0.9, n)).astype(np.int64)) for k, v in baseline.items()}
+    lower = np.round(rng.uniform(0.6, 0.85, n), 2)
+    frame = {
+        'id': ids,
+        'name': np.char.add('Scenario ', labels),
+        'description': np.char.add('Description for scenario ', labels),
+        'intervention_id': np.char.add('int-', np.char.zfill(ids.astype(str), 3))
+    }
+    frame.update({f'baseline_{k}': v for k, v in baseline.items()})
+    frame.update({f'projected_{k}': v for k, v in projected.items()})
+    frame.update({
+        'treatment_effect_migration': projected['migration'] - baseline['migration'],
+        'treatment_effect_water_stress': projected['water_stress'] - baseline['water_stress'],
+        'treatment_effect_crop_failure': projected['crop_failure'] - baseline['crop_failure'],
+        'treatment_effect_economic': projected['economic_loss'] - baseline['economic_loss'],
+        'confidence_interval_lower': lower,
+        'confidence_interval_upper': np.round(np.minimum(0.99, lower + rng.uniform(0.05, 0.15, n)), 2),
+        'created_at': '2024-01-01T00:00:00Z'
+    })
+    return pd.DataFrame(frame)
+
+
+def make_policy_interventions(n, seed=0):
+    """Synthetic frame with the columns of data/policy_interventions.csv."""
+    rng = np.random.default_rng(seed)
+    focus = rng.choice(['relief', 'urban-resilience', 'canals', 'desalination', 'insurance'], size=n)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'name': np.char.add('Policy Option ', np.char.zfill(np.arange(n).astype(str), 4)),
+        'description': np.char.add(np.char.add('A specialized intervention focused on ', focus), '.'),
+        'impact_area': rng.choice(['Climate Resilience', 'Economic Stability', 'Water Security', 'Migration Management'], size=n),
+        'efficacy': np.round(rng.uniform(0.1, 0.95, n), 2),
+        'cost': rng.choice(['Low', 'Medium', 'High', 'Critical'], size=n),
+        'status': rng.choice(['pending', 'active', 'completed'], size=n),
+        'created_at': _timestamps(rng, n, '2025-01-26', 365)
+    })
+
+
+def make_simulation_runs(n, seed=0):
+    """Synthetic frame with the columns of data/simulation_runs.csv."""
+    rng = np.random.default_rng(seed)
+    water = rng.integers(0, 101, n).astype(float)
+    climate = rng.integers(0, 101, n).astype(float)
+    reduction = np.round((water * 0.5 + climate * 0.3) * 0.85, 1)
+    successful = rng.integers(60, 101, n)
+    return pd.DataFrame({
+        'id': [str(uuid.UUID(int=int(v))) for v in rng.integers(0, 2 ** 63, n)],
+        'run_name': [f'AI Sim: W-{int(w)}% | C-{int(c)}%' for w, c in zip(water, climate)],
+        'run_timestamp': _timestamps(rng, n, '2025-12-01', 60),
+        'water_subsidy_input': water,
+        'climate_policy_input': climate,
+        'monsoon_modifier': rng.integers(-10, 11, n).astype(float),
+        'butterfly_effect_enabled': rng.random(n) < 0.5,
+        'lives_stabilized': rng.integers(1_000, 60_000, n),
+        'migration_reduction_percent': reduction,
+        'water_security_percent': np.round(reduction * 1.2, 1),
+        'economic_stability_percent': 18,
+        'total_iterations': 100,
+        'successful_iterations': successful,
+        'robustness_score': np.round(successful * rng.uniform(0.7, 1.0, n), 1),
+        'status': 'completed',
+        'created_at': _timestamps(rng, n, '2025-12-01', 60)
+    })
+
+
+def make_causal_certificates(n, seed=0):
+    """Synthetic frame with the columns of data/causal_certificates.csv."""
+    rng = np.random.default_rng(seed)
+    passed = rng.integers(80, 101, n)
+    failures = rng.integers(0, 15, n)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'certificate_type': rng.choice(['placebo', 'sensitivity', 'falsification', 'robustness'], size=n),
+        'placebo_tests_passed': passed,
+        'placebo_tests_total': 100,
+        'sensitivity_score': np.round(rng.uniform(80, 100, n), 1),
+        'falsification_attempts': 100,
+        'falsification_failures': failures,
+        'is_valid': (passed >= 85) & (failures < 10),
+        'validity_reason': 'Verified against synthetic regional noise injection.',
+        'expires_at': _timestamps(rng, n, '2027-01-01', 60),
+        'created_at': _timestamps(rng, n, '2026-01-01', 30)
+    })
+
+
+def write_data_dir(data_dir, districts, rows, history_rows=None, seed=0):
+    """
+    Writes every dataset the app reads into data_dir: `districts` districts, `rows`
+    rows for each event/score/Maharashtra table, and `history_rows` (default: districts)
+    for the run, certificate, link, scenario and intervention tables.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    history_rows = districts if history_rows is None else history_rows
+    district_df = make_districts(districts, seed=seed)
+    frames = {
+        'districts.csv': district_df,
+        'resilience_scores.csv': make_resilience_scores(rows, district_df['id'], seed=seed),
+        'migration_events.csv': make_migration_events(rows, district_df['id'], seed=seed),
+        'crop_failure_maharashtra.csv': make_crop_failure(rows, seed=seed),
+        'water_stress_maharashtra.csv': make_water_stress(rows, seed=seed),
+        'active_migrants_maharashtra.csv': make_active_migrants(rows, seed=seed),
+        'district_at_risk_maharashtra.csv': make_district_at_risk(rows, seed=seed),
+        'causal_links.csv': make_causal_links(history_rows, seed=seed),
+        'counterfactual_scenarios.csv': make_counterfactual_scenarios(history_rows, seed=seed),
+        'policy_interventions.csv': make_policy_interventions(history_rows, seed=seed),
+        'simulation_runs.csv': make_simulation_runs(history_rows, seed=seed),
+        'causal_certificates.csv': make_causal_certificates(history_rows, seed=seed)
+    }
+    for name, frame in frames.items():
+        frame.to_csv(os.path.join(data_dir, name), index=False)
+    return data_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic copy of data/ at a chosen scale.')
+    parser.add_argument('out_dir')
+    parser.add_argument('--districts', type=int, default=1_000)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--history-rows', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_data_dir(args.out_dir, args.districts, args.rows, args.history_rows, args.seed)
+    print(f'Wrote synthetic datasets to {args.out_dir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,34 @@
 import webview
 import threading
+import multiprocessing
 import sys
 import os
-from backend.server import create_app
+from backend.serving import DEFAULT_PORT, serve
 
-def start_server():
-    """Starts the Flask server."""
-    app = create_app()
-    app.run(port=5000, threaded=True)
+def start_server(ready):
+    """Starts the production server; sets `ready` once data is warm and the port is open."""
+    serve(port=DEFAULT_PORT, ready=ready)
 
 if __name__ == '__main__':
-    # Start the Flask server in a daemon thread
-    t = threading.Thread(target=start_server)
+    # Background jobs run in spawned processes; needed when the app is frozen
+    multiprocessing.freeze_support()
+
+    # Start the server in a daemon thread
+    ready = threading.Event()
+    t = threading.Thread(target=start_server, args=(ready,))
     t.daemon = True
     t.start()
 
+    # Open the window only once the server can answer the first page from memory
+    while not ready.wait(0.1):
+        if not t.is_alive():
+            sys.exit('Future Weaver server failed to start')
+
     # Create the window
     # Point to the local Flask server
     webview.create_window(
-        'Future Weaver', 
-        'http://localhost:5000',
+        'Future Weaver',
+        f'http://localhost:{DEFAULT_PORT}',
         width=1280,
         height=800,
         resizable=True
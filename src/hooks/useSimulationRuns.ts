@@ -1,5 +1,5 @@
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
-import { simulatePolicy, fetchSimulationRuns, createSimulationRun } from "@/lib/api";
+import { streamSimulatePolicy, fetchSimulationRuns, createSimulationRun } from "@/lib/api";
 
 export interface AISimulationResult {
   districts: {
@@ -85,18 +85,24 @@ export const useCreateSimulation = () => {
   });
 };
 
-export const useAISimulation = () => {
+// onDistricts receives the districts simulated so far as each streamed batch arrives
+export const useAISimulation = (onDistricts?: (districts: AISimulationResult["districts"]) => void) => {
   const queryClient = useQueryClient();
 
   return useMutation({
     mutationFn: async (input: CreateSimulationInput): Promise<AISimulationResult> => {
-      return await simulatePolicy({
+      let districts: AISimulationResult["districts"] = [];
+      const summary = await streamSimulatePolicy({
         water_subsidy_input: input.water_subsidy_input,
         climate_policy_input: input.climate_policy_input,
         monsoon_modifier: input.monsoon_modifier,
         butterfly_effect_enabled: input.butterfly_effect_enabled,
         run_name: input.run_name
+      }, (batch) => {
+        districts = districts.concat(batch);
+        onDistricts?.(districts);
       });
+      return { districts, summary };
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ["simulation_runs"] });
@@ -113,6 +113,42 @@ export const simulatePolicy = async (data: any) => {
     return await response.json();
 };
 
+// Streams /simulate_policy as NDJSON: onDistricts receives each batch of district
+// records as it arrives; resolves with the trailing summary record.
+export const streamSimulatePolicy = async (data: any, onDistricts: (districts: any[]) => void) => {
+    const response = await fetch(`${BASE_URL}/simulate_policy?stream=1`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': 'application/x-ndjson' },
+        body: JSON.stringify(data),
+    });
+    if (!response.ok || !response.body) throw new Error('Failed to simulate policy');
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffered = '';
+    let summary = null;
+    const handle = (lines: string[]) => {
+        const districts = [];
+        for (const line of lines) {
+            if (!line) continue;
+            const record = JSON.parse(line);
+            if (record.error) throw new Error(record.error);
+            if (record.summary) summary = record.summary;
+            else districts.push(record);
+        }
+        if (districts.length) onDistricts(districts);
+    };
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        const lines = (buffered + value).split('\n');
+        buffered = lines.pop() ?? '';
+        handle(lines);
+    }
+    // A last record without its trailing newline
+    handle([buffered]);
+    if (!summary) throw new Error('Simulation stream ended without a summary');
+    return summary;
+};
+
 export const generateCounterfactual = async (data: any) => {
     const response = await fetch(`${BASE_URL}/generate_dynamic_counterfactuals`, {
         method: 'POST',
@@ -18,11 +18,14 @@ const PolicySimulator = () => {
   // Simulation result states
   const [isSimulating, setIsSimulating] = useState(false);
   const [aiResult, setAIResult] = useState<AISimulationResult | null>(null);
+  const [streamedDistricts, setStreamedDistricts] = useState<AISimulationResult["districts"]>([]);
 
-  const aiSimulation = useAISimulation();
+  const aiSimulation = useAISimulation(setStreamedDistricts);
 
   const runSimulation = async () => {
     setIsSimulating(true);
+    setAIResult(null);
+    setStreamedDistricts([]);
 
     try {
       const result = await aiSimulation.mutateAsync({
@@ -45,7 +48,8 @@ const PolicySimulator = () => {
     }
   };
 
-  const suitableDistricts = aiResult?.districts.filter(d => d.is_suitable_destination) || [];
+  // Districts fill in as the simulation streams them, before the summary arrives
+  const suitableDistricts = (aiResult?.districts ?? streamedDistricts).filter(d => d.is_suitable_destination);
 
   return (
     <DashboardLayout>
@@ -0,0 +1,24 @@
+import shutil
+import pytest
+from backend.datastore import DATA_DIR
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A private copy of data/, so tests can write to it."""
+    target = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, target, ignore=shutil.ignore_patterns('jobs', 'columnar', 'profiles', '*.lock'))
+    return str(target)
+
+
+@pytest.fixture
+def app(data_dir):
+    from backend.server import create_app
+    app = create_app(data_dir)
+    yield app
+    app.extensions['jobs'].shutdown()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,42 @@
+import os
+import numpy as np
+from backend.columnar import ColumnarStore, table_dir
+from benchmarks.synthetic import make_crop_failure
+
+QUERY = {'group_by': 'Season', 'metrics': 'sum:Affected_Area_Hectares'}
+
+
+def write_csv(data_dir, n, seed):
+    frame = make_crop_failure(n, seed=seed)
+    path = os.path.join(data_dir, 'crop_failure_maharashtra.csv')
+    frame.to_csv(path, index=False)
+    # A rewrite within the same mtime tick still has to look changed
+    os.utime(path, ns=(seed * 10**9, seed * 10**9))
+    return frame
+
+
+def test_reingest_leaves_open_tables_readable(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    write_csv(str(tmp_path), 500, seed=1)
+    old = store.table('crop_failure')
+    old_total = old.array('Affected_Area_Hectares').sum()
+
+    frame = write_csv(str(tmp_path), 800, seed=2)
+    new = store.table('crop_failure')
+
+    assert new is not old and new.folder != old.folder
+    assert new.rows == 800
+    np.testing.assert_allclose(new.array('Affected_Area_Hectares').sum(), frame['Affected_Area_Hectares'].sum())
+    # The superseded version is still on disk and its maps are untouched
+    assert os.path.exists(os.path.join(old.folder, 'meta.json'))
+    assert old.array('Affected_Area_Hectares').sum() == old_total
+    assert old.aggregate(['Season'], [('sum', 'Affected_Area_Hectares')])['count'].sum() == 500
+
+
+def test_only_the_newest_versions_are_kept(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    for seed in range(1, 5):
+        frame = write_csv(str(tmp_path), 100 * seed, seed=seed)
+        result = store.aggregate('crop_failure', QUERY)
+        assert result['rows_scanned'] == len(frame)
+    assert sorted(os.listdir(table_dir('crop_failure', str(tmp_path)))) == ['00000003', '00000004']
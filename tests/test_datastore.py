@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from backend.datastore import DatasetRegistry, RunStore
+
+HEADER = 'id,name,count,ratio,flag,maybe_flag\n'
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def test_appended_rows_match_a_fresh_read(tmp_path):
+    # maybe_flag is an object column of booleans and missing values
+    write(tmp_path / 'runs.csv', HEADER + 'a,first,1,0.5,True,\nb,second,2,1.5,False,True\n')
+    datasets = DatasetRegistry(str(tmp_path))
+    runs = RunStore(datasets)
+    datasets.get('runs.csv')
+
+    runs.append('runs.csv', {'id': 'c', 'name': '123', 'count': 3, 'ratio': 2.25, 'flag': False,
+                             'maybe_flag': False})
+    runs.append('runs.csv', {'id': 'd', 'name': 'fourth', 'count': 4, 'flag': True})
+
+    cached = datasets.get('runs.csv')
+    assert datasets.stats()['reloads'] == 0
+    assert_frame_equal(cached, pd.read_csv(tmp_path / 'runs.csv'))
+    assert cached['maybe_flag'].tolist()[2] is False
+    assert cached['name'].tolist()[2] == '123'
+
+
+def test_append_changing_a_column_type_rereads_the_file(tmp_path):
+    write(tmp_path / 'runs.csv', HEADER + 'a,first,1,0.5,True,\n')
+    datasets = DatasetRegistry(str(tmp_path))
+    runs = RunStore(datasets)
+    datasets.get('runs.csv')
+
+    runs.append('runs.csv', {'id': 'b', 'name': 'second', 'count': 'many', 'flag': 'maybe'})
+
+    assert_frame_equal(datasets.get('runs.csv'), pd.read_csv(tmp_path / 'runs.csv'))
+    assert datasets.stats()['reloads'] == 1
+
+
+def test_appends_keep_crlf_line_endings(tmp_path):
+    write(tmp_path / 'runs.csv', HEADER.replace('\n', '\r\n') + 'a,first,1,0.5,True,\r\n')
+    datasets = DatasetRegistry(str(tmp_path))
+    runs = RunStore(datasets)
+
+    runs.append('runs.csv', {'id': 'b', 'name': 'second', 'count': 2})
+    # A new column rewrites the whole file
+    runs.append('runs.csv', {'id': 'c', 'name': 'third', 'note': 'new column'})
+    runs.append('runs.csv', {'id': 'd', 'name': 'fourth', 'note': 'after the rewrite'})
+
+    data = (tmp_path / 'runs.csv').read_bytes()
+    assert data.count(b'\r\n') == data.count(b'\n') == 5
+    assert pd.read_csv(tmp_path / 'runs.csv')['note'].tolist()[2:] == ['new column', 'after the rewrite']
+
+
+def test_simulation_run_rows_read_back_like_a_fresh_app(data_dir, client):
+    from backend.server import create_app
+    client.get('/api/simulation_runs')
+    resp = client.post('/api/simulate_policy', json={'water_subsidy_input': 40, 'butterfly_effect_enabled': True,
+                                                       'iterations': 10, 'run_name': 'check'})
+    assert resp.status_code == 200
+
+    cached = client.get('/api/simulation_runs').get_json()
+    fresh_app = create_app(data_dir)
+    try:
+        fresh = fresh_app.test_client().get('/api/simulation_runs').get_json()
+    finally:
+        fresh_app.extensions['jobs'].shutdown()
+    assert cached == fresh
+    assert cached[-1]['butterfly_effect_enabled'] is True
+
+
+def test_concurrent_appends_keep_every_row_once(tmp_path):
+    write(tmp_path / 'runs.csv', HEADER + 'seed,first,0,0.5,True,\n')
+    datasets = DatasetRegistry(str(tmp_path))
+    datasets.get('runs.csv')
+    # Two stores share only the file lock, like two worker processes
+    stores = [RunStore(datasets), RunStore(datasets)]
+
+    def append(i):
+        stores[i % 2].append('runs.csv', {'id': f'r{i}', 'name': f'run {i}', 'count': i, 'ratio': i / 4,
+                                          'flag': i % 3 == 0})
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(append, range(400)))
+
+    fresh = pd.read_csv(tmp_path / 'runs.csv')
+    assert len(fresh) == 401
+    assert fresh['id'].is_unique
+    assert set(fresh['id']) == {'seed'} | {f'r{i}' for i in range(400)}
+    assert_frame_equal(datasets.get('runs.csv').sort_values('id', ignore_index=True),
+                       fresh.sort_values('id', ignore_index=True))
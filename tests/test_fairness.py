@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from backend.ml_models import FairnessAuditor
+from benchmarks.bench_fairness import check_against_reference
+from benchmarks.synthetic import make_district_at_risk, make_districts
+
+
+@pytest.fixture
+def districts():
+    df = make_districts(300, seed=1)
+    # Some missing values, so imputation and the coverage metric are exercised
+    df.loc[np.random.default_rng(1).choice(len(df), 10, replace=False), 'elderly_pop_pct'] = np.nan
+    return df
+
+
+def test_stratified_audit_matches_a_row_by_row_reference(districts):
+    assert check_against_reference(districts, make_district_at_risk(300, seed=1), n_bootstrap=20, seed=4) > 10
+
+
+def test_overall_values_match_the_default_audit(districts):
+    auditor = FairnessAuditor(districts)
+    audit = auditor.stratified_audit(make_district_at_risk(300, seed=1), n_bootstrap=50)
+    default = {m['name']: m['value'] for m in auditor.calculate_fairness_metrics()['metrics']}
+    for metric in audit['overall']['metrics']:
+        if metric['name'] == 'Geographic Coverage':
+            assert metric['value'] == pytest.approx(100 * 290 / 300, abs=0.05)
+        else:
+            assert round(metric['value']) == default[metric['name']]
+        assert metric['ci_lower'] <= metric['ci_upper']
+
+
+def test_strata_partition_the_rows(districts):
+    audit = FairnessAuditor(districts).stratified_audit(make_district_at_risk(300, seed=1), n_bootstrap=20, seed=3)
+    assert audit['overall']['rows'] == len(districts)
+    assert set(audit['strata']) == {'district', 'risk_category', 'marginalized_band', 'elderly_band'}
+    for rows in audit['strata'].values():
+        assert sum(s['rows'] for s in rows) == len(districts)
+    assert audit['bootstrap'] == {"resamples": 20, "confidence_level": 0.95, "seed": 3}
+
+    again = FairnessAuditor(districts).stratified_audit(make_district_at_risk(300, seed=1), n_bootstrap=20, seed=3)
+    assert again['strata'] == audit['strata']
+    # Without risk data there is no risk stratification
+    assert 'risk_category' not in FairnessAuditor(districts).stratified_audit(n_bootstrap=5)['strata']
+
+
+def test_stratified_fairness_route(client):
+    response = client.get('/api/fairness_audit?mode=stratified&n_bootstrap=40&seed=2')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['bootstrap']['resamples'] == 40
+    assert body['ai_verification']['status'] in ('Verified', 'Needs Review')
+    assert client.get('/api/fairness_audit?mode=stratified&n_bootstrap=40&seed=2').get_json()['strata'] == body['strata']
+
+    for query in ('n_bootstrap=0', 'n_bootstrap=20001', 'n_bootstrap=x', 'seed=x'):
+        assert client.get(f'/api/fairness_audit?mode=stratified&{query}').status_code == 400
@@ -0,0 +1,19 @@
+import numpy as np
+from backend.ml_models import ImpactPredictor
+from benchmarks.synthetic import make_districts
+
+
+def test_batch_scenarios_match_predict():
+    rng = np.random.default_rng(0)
+    budget = rng.uniform(0, 5000, 2_000).round(2)
+    time_horizon = rng.integers(1, 30, 2_000)
+    scale = rng.uniform(0, 100, 2_000)
+    predictor = ImpactPredictor(make_districts(20))
+
+    result = predictor.predict_districts(budget, time_horizon, scale)
+
+    expected = [{"budget": b, "time_horizon": t, "scale": s, **predictor.predict(b, t, s)}
+                for b, t, s in zip(budget.tolist(), time_horizon.tolist(), scale.tolist())]
+    assert result['scenarios'] == expected
+    assert len(result['districts']) == 20
+    assert all(len(d['migrants_retained']) == len(expected) for d in result['districts'])
@@ -0,0 +1,47 @@
+import multiprocessing
+import signal
+import sys
+import time
+import pytest
+from backend.jobs import JobQueue, _stop
+from benchmarks.synthetic import make_districts
+
+
+def _ignore_terminate():
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    time.sleep(60)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='terminate() is already a hard kill on Windows')
+def test_stop_kills_a_process_that_ignores_terminate():
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_ignore_terminate, daemon=True)
+    process.start()
+    sender.close()
+    time.sleep(0.2)
+
+    _stop({'process': process, 'conn': receiver}, timeout=0.5)
+
+    assert not process.is_alive()
+    assert process.exitcode == -signal.SIGKILL
+    assert receiver.closed
+
+
+def test_cancel_reaps_the_running_process(data_dir):
+    # Large enough that the job is still running when it is cancelled
+    make_districts(200_000).to_csv(f'{data_dir}/districts.csv', index=False)
+    jobs = JobQueue(data_dir)
+    try:
+        job = jobs.submit('simulate_policy', {'iterations': 100_000})
+        deadline = time.monotonic() + 60
+        while jobs.get(job['id'])['status'] != 'running' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        process = jobs._running[job['id']]['process']
+
+        assert jobs.cancel(job['id'])['status'] == 'cancelled'
+        assert not process.is_alive()
+        assert process.exitcode is not None
+        assert jobs.stats()['running'] == 0
+    finally:
+        jobs.shutdown()
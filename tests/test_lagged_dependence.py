@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from backend.ml_models import LaggedDependenceEngine
+from backend.stats import chi2_sf, f_sf, granger_f_tests, lagged_correlations
+from benchmarks.bench_lagged_dependence import planted_series
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    S = rng.normal(size=(3, 3, 40)).cumsum(axis=-1)
+    S[rng.random(S.shape) < 0.15] = np.nan
+    # A sparse, seasonal-like effect series
+    S[:, 2, rng.random(40) < 0.4] = np.nan
+    return S
+
+
+def test_lagged_correlations_match_brute_force(series):
+    r, n = lagged_correlations(series, max_lag=5)
+    for d in range(series.shape[0]):
+        for i in range(3):
+            for j in range(3):
+                for lag in range(6):
+                    a, b = series[d, i, :40 - lag], series[d, j, lag:]
+                    both = ~np.isnan(a) & ~np.isnan(b)
+                    assert n[d, i, j, lag] == both.sum()
+                    if both.sum() >= 3:
+                        assert r[d, i, j, lag] == pytest.approx(np.corrcoef(a[both], b[both])[0, 1], abs=1e-9)
+
+
+def brute_granger(s, cause, effect, q):
+    """OLS F-test of effect on [1, its previous q observations] vs. also the cause's previous q steps."""
+    rows = []
+    for t in range(q, s.shape[-1]):
+        previous = s[effect, :t][~np.isnan(s[effect, :t])][::-1][:q]
+        lags = s[cause, t - q:t]
+        if len(previous) == q and not np.isnan(lags).any() and not np.isnan(s[effect, t]):
+            rows.append((np.concatenate([[1.0], previous, lags]), s[effect, t]))
+    dfd = len(rows) - (2 * q + 1)
+    if dfd <= 0:
+        return np.nan, len(rows)
+    X = np.array([x for x, _ in rows])
+    y = np.array([v for _, v in rows])
+
+    def rss(X):
+        beta = np.linalg.lstsq(X, y, rcond=None)[0]
+        return ((y - X @ beta) ** 2).sum()
+
+    f = ((rss(X[:, :q + 1]) - rss(X)) / q) / (rss(X) / dfd)
+    return f_sf(f, q, dfd), len(y)
+
+
+@pytest.mark.parametrize('q', [1, 3])
+def test_granger_tests_match_per_pair_least_squares(series, q):
+    pairs = np.array([(0, 1), (1, 0), (0, 2), (2, 1)])
+    p, n_obs = granger_f_tests(series, pairs, q)
+    for d in range(series.shape[0]):
+        for t, (cause, effect) in enumerate(pairs):
+            expected_p, expected_n = brute_granger(series[d], cause, effect, q)
+            assert n_obs[d, t] == expected_n
+            assert p[d, t] == pytest.approx(expected_p, rel=1e-6, abs=1e-12, nan_ok=True)
+
+
+def test_tail_approximations_at_known_critical_values():
+    # 5% critical values of chi-square(1), chi-square(10), F(3, 20) and F(6, 100)
+    assert chi2_sf(3.841, 1) == pytest.approx(0.05, abs=0.005)
+    assert chi2_sf(18.307, 10) == pytest.approx(0.05, abs=0.002)
+    assert f_sf(3.098, 3, 20) == pytest.approx(0.05, abs=0.002)
+    assert f_sf(2.191, 6, 100) == pytest.approx(0.05, abs=0.002)
+
+
+def test_engine_recovers_a_planted_lag():
+    water, crop = planted_series(districts=60, years=8, lag_months=3, rows_per_month=2)
+    results = LaggedDependenceEngine(water, crop, max_lag=8, max_order=4).analyze()
+    by_pair = {(r['cause_variable'], r['effect_variable']): r for r in results}
+    planted = by_pair[('Water_Stress_Index', 'Failure_Rate_Percentage')]
+    assert planted['lag_months'] == 3
+    assert planted['lag_days'] == round(3 * LaggedDependenceEngine.DAYS_PER_MONTH)
+    assert planted['is_significant']
+    assert planted['districts'] == 60
+
+
+def test_lagged_dependence_route(client):
+    response = client.get('/api/lagged_dependence?max_lag=6&max_order=2')
+    assert response.status_code == 200
+    for record in response.get_json():
+        assert record['cause_variable'] != record['effect_variable']
+        assert 1 <= record['lag_months'] <= 6
+
+    for query in ('max_lag=x', 'max_lag=0', 'max_lag=37', 'max_order=13'):
+        assert client.get(f'/api/lagged_dependence?{query}').status_code == 400
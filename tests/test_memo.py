@@ -0,0 +1,56 @@
+import pandas as pd
+from backend.datastore import DatasetRegistry, RunStore
+from backend.memo import ResultMemo
+
+
+def test_results_are_recomputed_when_the_dataset_version_changes(tmp_path):
+    (tmp_path / 'points.csv').write_text('x\n1\n2\n')
+    # Files are stat()ed on every access, so the edit below is seen at once
+    datasets = DatasetRegistry(str(tmp_path), check_interval=0)
+    memo = ResultMemo(datasets)
+    calls = []
+
+    def total(df):
+        calls.append(datasets.version('points.csv'))
+        return int(df['x'].sum())
+
+    assert memo.get_or_compute('points.csv', 'total', total) == 3
+    assert memo.get_or_compute('points.csv', 'total', total) == 3
+    assert len(calls) == 1
+
+    # An appended row and an edit of the file both give a new version
+    RunStore(datasets).append('points.csv', {'x': 4})
+    assert memo.get_or_compute('points.csv', 'total', total) == 7
+    (tmp_path / 'points.csv').write_text('x\n10\n20\n30\n')
+    assert memo.get_or_compute('points.csv', 'total', total) == 60
+    assert len(calls) == 3 and len(set(calls)) == 3
+    # Entries of older versions are dropped
+    assert memo.stats()['entries'] == 1
+
+
+def test_simulate_policy_is_memoized_per_districts_version(data_dir, app, client):
+    app.extensions['datasets'].check_interval = 0
+    payload = {'water_subsidy_input': 60, 'iterations': 10, 'seed': 3}
+    first = client.post('/api/simulate_policy', json=payload).get_json()
+    again = client.post('/api/simulate_policy', json=payload).get_json()
+    assert first == again
+    stats = client.get('/api/cache_stats').get_json()['results']
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+    path = f'{data_dir}/districts.csv'
+    df = pd.read_csv(path)
+    df['net_migration'] = df['net_migration'] * 2
+    df.to_csv(path, index=False)
+
+    changed = client.post('/api/simulate_policy', json=payload).get_json()
+    assert client.get('/api/cache_stats').get_json()['results']['misses'] == 2
+    assert changed['summary'] != first['summary']
+
+
+def test_unseeded_simulations_are_not_memoized(client):
+    payload = {'water_subsidy_input': 60, 'iterations': 200}
+    first = client.post('/api/simulate_policy', json=payload).get_json()
+    again = client.post('/api/simulate_policy', json=payload).get_json()
+    assert first['districts'] == again['districts']
+    assert first['summary']['monte_carlo'] != again['summary']['monte_carlo']
+    assert client.get('/api/cache_stats').get_json()['results']['entries'] == 0
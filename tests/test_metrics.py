@@ -0,0 +1,81 @@
+import re
+from backend.metrics import MetricsRegistry
+
+# name{labels} value, as in the Prometheus text exposition format
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def samples(text):
+    """{(name, labels): value} of a scrape, checking every line's format."""
+    assert text.endswith('\n')
+    values, typed = {}, set()
+    for line in text[:-1].split('\n'):
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert kind in ('counter', 'gauge', 'histogram', 'untyped')
+            typed.add(name)
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        assert re.sub('_(bucket|sum|count)$', '', name) in typed, line
+        values[(name, labels or '')] = float(value)
+    return values
+
+
+def test_render_histograms_counters_and_collectors():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe('latency_seconds', 'histogram', 'Latency.')
+    registry.describe('requests_total', 'counter', 'Requests.')
+    for value in (0.05, 0.1, 0.5, 3.0):
+        registry.observe('latency_seconds', value, route='/a')
+    registry.inc('requests_total', route='/a', status=200)
+    registry.inc('requests_total', 2, route='/a "quoted"\n', status=500)
+
+    def collector():
+        yield ('queue_size', 'gauge', 'Queued.', {}, 7)
+
+    text = registry.render([collector])
+    assert text == (
+        '# HELP futureweaver_latency_seconds Latency.\n'
+        '# TYPE futureweaver_latency_seconds histogram\n'
+        'futureweaver_latency_seconds_bucket{route="/a",le="0.1"} 2\n'
+        'futureweaver_latency_seconds_bucket{route="/a",le="1"} 3\n'
+        'futureweaver_latency_seconds_bucket{route="/a",le="+Inf"} 4\n'
+        'futureweaver_latency_seconds_sum{route="/a"} 3.65\n'
+        'futureweaver_latency_seconds_count{route="/a"} 4\n'
+        '# HELP futureweaver_queue_size Queued.\n'
+        '# TYPE futureweaver_queue_size gauge\n'
+        'futureweaver_queue_size 7\n'
+        '# HELP futureweaver_requests_total Requests.\n'
+        '# TYPE futureweaver_requests_total counter\n'
+        'futureweaver_requests_total{route="/a",status="200"} 1\n'
+        'futureweaver_requests_total{route="/a \\"quoted\\"\\n",status="500"} 2\n'
+    )
+    samples(text)
+
+
+def test_metrics_route(client):
+    def scrape():
+        response = client.get('/api/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert response.mimetype_params['version'] == '0.0.4'
+        return samples(response.get_data(as_text=True))
+
+    key = ('futureweaver_http_requests_total', '{method="GET",route="/api/districts",status="200"}')
+    before = scrape().get(key, 0)
+    client.get('/api/districts')
+    client.get('/api/districts?limit=2')
+    after = scrape()
+
+    assert after[key] == before + 2
+    count = after[('futureweaver_http_request_duration_seconds_count', '{method="GET",route="/api/districts"}')]
+    assert after[('futureweaver_http_request_duration_seconds_bucket',
+                  '{method="GET",route="/api/districts",le="+Inf"}')] == count
+    assert ('futureweaver_cache_hits_total', '{cache="encoded_tables"}') in after
+    assert after[('futureweaver_jobs_running', '')] == 0
+    assert any(name == 'futureweaver_span_duration_seconds_count' and 'stage="csv_load"' in labels
+               for name, labels in after)
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from backend.ml_models import PolicyAIModel
+from benchmarks.bench_policy_model import reference_simulate
+from benchmarks.synthetic import make_districts
+
+LEVERS = [(50, 30, 0, False), (100, 100, 20, True), (0, 0, 0, False), (75, 50, -10, True)]
+
+
+@pytest.mark.parametrize('levers', LEVERS)
+def test_simulate_matches_the_row_loop(levers):
+    df = make_districts(2_000)
+    fast = PolicyAIModel(df).simulate(*levers)
+    ref = reference_simulate(df, *levers)
+    assert fast['districts'] == ref['districts']
+    for key, value in ref['summary'].items():
+        assert fast['summary'][key] == value, key
+
+
+def test_simulate_matches_the_row_loop_on_the_shipped_data(data_dir):
+    df = pd.read_csv(f'{data_dir}/districts.csv')
+    for levers in LEVERS:
+        fast = PolicyAIModel(df).simulate(*levers)
+        ref = reference_simulate(df, *levers)
+        assert fast['districts'] == ref['districts']
+        for key, value in ref['summary'].items():
+            assert fast['summary'][key] == value, key
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+from backend import tasks
+
+LINK = {'cause_variable': 'population', 'effect_variable': 'water_stress_index'}
+
+
+def test_refute_records_a_certificate(data_dir, client):
+    resp = client.post('/api/causal_certificates/refute', json=dict(
+        LINK, n_placebo=20, n_common_cause=5, n_subsets=5, workers=1000))
+    assert resp.status_code == 201
+    certificate = resp.get_json()['certificate']
+    assert certificate['placebo_tests_total'] == 20
+    saved = pd.read_csv(f'{data_dir}/causal_certificates.csv')
+    assert saved['id'].iloc[-1] == certificate['id']
+
+
+@pytest.mark.parametrize('extra', [
+    {'n_placebo': -5}, {'n_common_cause': 0}, {'n_subsets': 0}, {'n_placebo': '100'},
+    {'subset_fraction': 0}, {'subset_fraction': 1.5}, {'alpha': 2},
+    {'workers': '4'}, {'workers': 0}, {'seed': 'x'}, {'cause_variable': ''}
+])
+def test_refute_rejects_bad_settings(data_dir, client, extra):
+    before = len(pd.read_csv(f'{data_dir}/causal_certificates.csv'))
+    for path in ('/api/causal_certificates/refute', '/api/causal_certificates/refute?async=1'):
+        resp = client.post(path, json=dict(LINK, **extra))
+        assert resp.status_code == 400
+        assert 'error' in resp.get_json()
+    assert len(pd.read_csv(f'{data_dir}/causal_certificates.csv')) == before
+
+
+def test_refutation_workers_are_capped(monkeypatch):
+    monkeypatch.setattr(tasks.os, 'cpu_count', lambda: 64)
+    assert tasks.refutation_params(dict(LINK, workers=1000))['workers'] == tasks.MAX_REFUTATION_WORKERS
+    monkeypatch.setattr(tasks.os, 'cpu_count', lambda: 2)
+    assert tasks.refutation_params(dict(LINK, workers=3))['workers'] == 2
+    assert tasks.refutation_params(LINK)['workers'] is None
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.datastore import DatasetRegistry, RunStore
+from backend.rules import RECOMMENDATION_RULES, RuleIndex, RuleSet, RuleState, TopK
+from benchmarks.synthetic import make_districts
+
+
+def expected_top(values, k):
+    """Full stable sort: the k largest values, earlier position first on ties, NaN/-inf excluded."""
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind='stable')[:k]
+    return order[np.isfinite(values[order]) | (values[order] == np.inf)]
+
+
+def test_topk_extend_matches_a_full_sort():
+    rng = np.random.default_rng(0)
+    # Few distinct values, so ties decide most of the ranking
+    values = rng.integers(0, 50, 20_000).astype(float)
+    values[rng.choice(len(values), 500, replace=False)] = np.nan
+    values[rng.choice(len(values), 500, replace=False)] = -np.inf
+    top = TopK(values[:15_000], 10)
+    for lo, hi in ((15_000, 15_001), (15_001, 17_000), (17_000, 20_000)):
+        top.extend(values[lo:hi])
+        np.testing.assert_array_equal(top.positions, expected_top(values[:hi], 10))
+        np.testing.assert_array_equal(top.values, values[top.positions])
+
+
+def test_topk_with_fewer_ranked_values_than_k():
+    top = TopK([np.nan, 3.0, -np.inf], 5)
+    top.extend([1.0, np.nan])
+    np.testing.assert_array_equal(top.positions, [1, 3])
+
+
+def test_incremental_rule_state_matches_a_rebuild():
+    df = make_districts(5_000)
+    extra = make_districts(700, seed=1)
+    grown = pd.concat([df, extra], ignore_index=True)
+    ruleset = RuleSet(RECOMMENDATION_RULES, df.columns)
+
+    state = RuleState(ruleset, df)
+    updated = state.copy()
+    updated.extend(extra)
+    rebuilt = RuleState(ruleset, grown)
+
+    np.testing.assert_array_equal(updated.scores, rebuilt.scores)
+    np.testing.assert_array_equal(updated.best, rebuilt.best)
+    for j, rule in enumerate(ruleset.rules):
+        np.testing.assert_array_equal(updated.rule_top[rule['id']].positions, rebuilt.rule_top[rule['id']].positions)
+        np.testing.assert_array_equal(updated.rule_top[rule['id']].positions,
+                                      expected_top(rebuilt.scores[:, j], state.k))
+    for c in ruleset.columns:
+        np.testing.assert_array_equal(updated.column_top[c].positions, expected_top(grown[c], state.k))
+    # The state readers already hold is left as it was
+    assert len(state.scores) == len(df)
+
+
+def test_rule_index_folds_in_appended_districts(tmp_path):
+    make_districts(300).to_csv(tmp_path / 'districts.csv', index=False)
+    datasets = DatasetRegistry(str(tmp_path))
+    index = RuleIndex(datasets)
+    _, before = index.state()
+
+    record = make_districts(1, seed=3).iloc[0].to_dict()
+    record.update(id=10_000, drought_index=99, water_stress_index=99)
+    RunStore(datasets).append('districts.csv', record)
+    df, after = index.state()
+
+    assert after is not before and len(before.best) == 300
+    rebuilt = RuleState(RuleSet(RECOMMENDATION_RULES, df.columns), df)
+    np.testing.assert_array_equal(after.scores, rebuilt.scores)
+    assert after.rule_top['emergency_irrigation'].positions[0] == 300
+
+
+def test_district_recommendations_route(client):
+    page = client.get('/api/ai_recommendations/districts?limit=5').get_json()
+    assert page['limit'] == 5 and len(page['districts']) <= 5
+    scores = [d['score'] for d in page['districts']]
+    assert scores == sorted(scores, reverse=True)
+    for district in page['districts']:
+        assert [r['score'] for r in district['recommendations']] == sorted(
+            (r['score'] for r in district['recommendations']), reverse=True)
+
+    second = client.get('/api/ai_recommendations/districts?limit=5&offset=5').get_json()
+    assert second['total'] == page['total']
+    first_ids = {d['district_id'] for d in page['districts']}
+    assert first_ids.isdisjoint(d['district_id'] for d in second['districts'])
+
+    by_rule = client.get('/api/ai_recommendations/districts?rule=water_grid&limit=100').get_json()
+    assert all(any(r['rule'] == 'water_grid' for r in d['recommendations']) for d in by_rule['districts'])
+
+    district_id = page['districts'][0]['district_id']
+    one = client.get(f'/api/ai_recommendations/districts?district_id={district_id}').get_json()
+    assert one['districts'][0]['district_id'] == district_id
+
+
+@pytest.mark.parametrize('query, status', [
+    ('limit=x', 400), ('offset=-1', 400), ('rule=nope', 400), ('district_id=no-such-district', 404)
+])
+def test_district_recommendations_rejects_bad_queries(client, query, status):
+    assert client.get(f'/api/ai_recommendations/districts?{query}').status_code == status
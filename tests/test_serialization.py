@@ -0,0 +1,59 @@
+import json
+import numpy as np
+import pandas as pd
+from backend.datastore import DatasetRegistry
+from backend.serialization import EncodedTableCache, encode_ndjson, encode_record_lines, encode_records
+
+
+def jsonify_bytes(df):
+    """What the routes wrote before encode_records(): clean_data() through jsonify (compact, sorted keys)."""
+    records = df.astype(object).where(pd.notnull(df), None).to_dict(orient='records')
+    return json.dumps(records, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'ratio': [49.7, 0.1 + 0.2, 1e-07, np.nan],
+        'big': [123456789.123, 5e20, 2.0, 1 / 3],
+        'count': [1, -2, 3, 40],
+        'flag': [True, False, True, False],
+        'maybe_flag': [True, None, False, np.nan],
+        'name': ['Pune', 'Thāne "east"', None, '123'],
+        'code': pd.Series(['a', None, 'c', 'd'], dtype='str')
+    })
+
+
+def test_records_match_jsonify():
+    df = sample_frame()
+    body = encode_records(df)
+    assert body == jsonify_bytes(df)
+    assert b'"ratio":49.7}' in body and b'49.700000' not in body
+    assert json.loads(body)[3]['big'] == 1 / 3
+
+
+def test_record_lines_and_ndjson_match_records():
+    df = sample_frame()
+    expected = json.loads(encode_records(df))
+    assert [json.loads(line) for line in encode_record_lines(df)] == expected
+    chunks = list(encode_ndjson(df, chunk_rows=3))
+    assert len(chunks) == 2
+    assert [json.loads(line) for line in b''.join(chunks).splitlines()] == expected
+    picked = b''.join(encode_ndjson(df, positions=np.array([2, 0]), columns=['ratio'])).splitlines()
+    assert picked == [b'{"ratio":1e-07}', b'{"ratio":49.7}']
+
+
+def test_encoded_table_cache_follows_the_snapshot(tmp_path):
+    (tmp_path / 'points.csv').write_text('x,y\n1,2\n')
+    datasets = DatasetRegistry(str(tmp_path), check_interval=0)
+    cache = EncodedTableCache(datasets)
+
+    body, etag = cache.get('points.csv')
+    assert cache.get('points.csv') == (body, etag)
+    assert cache.stats() == {"hits": 1, "misses": 1, "cached": 1}
+
+    (tmp_path / 'points.csv').write_text('x,y\n1,2\n3,4\n')
+    df, _ = datasets.snapshot('points.csv')
+    body, new_etag = cache.get('points.csv')
+    assert body == encode_records(df)
+    assert json.loads(body) == [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+    assert new_etag != etag
@@ -0,0 +1,131 @@
+import json
+import pandas as pd
+import pytest
+from backend.ml_models import PolicyAIModel
+
+
+def test_simulate_policy_grid_sweeps_and_zips(data_dir, client):
+    model = PolicyAIModel(pd.read_csv(f'{data_dir}/districts.csv'))
+    summary_keys = ('total_prevented_migration', 'avg_drought_reduction', 'suitable_destinations_count')
+
+    product = client.post('/api/simulate_policy_grid', json={'water_subsidy_input': [0, 50, 100],
+                                                              'climate_policy_input': [10, 20]}).get_json()
+    assert product['scenario_count'] == 6
+    scenarios = product['scenarios']
+    assert list(zip(scenarios['water_subsidy_input'], scenarios['climate_policy_input'])) == [
+        (0, 10), (0, 20), (50, 10), (50, 20), (100, 10), (100, 20)]
+
+    zipped = client.post('/api/simulate_policy_grid', json={'mode': 'zip', 'water_subsidy_input': [0, 50, 100],
+                                                             'climate_policy_input': [10, 20, 30],
+                                                             'monsoon_modifier': -10,
+                                                             'butterfly_effect_enabled': True}).get_json()
+    assert zipped['scenario_count'] == 3
+    scenarios = zipped['scenarios']
+    assert list(zip(scenarios['water_subsidy_input'], scenarios['climate_policy_input'])) == [
+        (0, 10), (50, 20), (100, 30)]
+
+    for grid, levers in ((product, (50, 20, 0, False)), (zipped, (100, 30, -10, True))):
+        i = [(w, c) for w, c in zip(grid['scenarios']['water_subsidy_input'],
+                                    grid['scenarios']['climate_policy_input'])].index(levers[:2])
+        expected = model.simulate(*levers)['summary']
+        assert {key: grid['scenarios'][key][i] for key in summary_keys} == {key: expected[key] for key in summary_keys}
+
+
+@pytest.mark.parametrize('payload', [
+    {'mode': 'zip', 'water_subsidy_input': [0, 50, 100], 'climate_policy_input': [10, 20]},
+    {'water_subsidy_input': ['high', 50]},
+    {'water_subsidy_input': [[0, 50], [100]]},
+    {'climate_policy_input': []},
+    {'monsoon_modifier': None},
+    {'butterfly_effect_enabled': 'yes'},
+    {'mode': 'diagonal'}
+])
+def test_simulate_policy_grid_rejects_bad_levers(client, payload):
+    resp = client.post('/api/simulate_policy_grid', json=payload)
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
+
+
+def test_resilience_scorecard_filters_by_date(data_dir, client):
+    path = f'{data_dir}/resilience_scores.csv'
+    scores = pd.read_csv(path)
+    scores['district_id'] = pd.read_csv(f'{data_dir}/districts.csv')['id'].iloc[:len(scores)].to_numpy()
+    scores.to_csv(path, index=False)
+
+    recent = client.get('/api/resilience_scorecard?date_from=2025-01-01&date_to=2025-06-30').get_json()
+    dates = [s['score_date'] for d in recent for s in d['resilience_scores']]
+    expected = scores['score_date'][scores['score_date'].between('2025-01-01', '2025-06-30')]
+    assert sorted(dates) == sorted(expected)
+    assert dates
+
+
+@pytest.mark.parametrize('query', ['date_from=yesterday', 'date_to=2024-13-45', 'date_from=NaT'])
+def test_resilience_scorecard_rejects_bad_dates(client, query):
+    resp = client.get(f'/api/resilience_scorecard?{query}')
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
+
+
+@pytest.mark.parametrize('payload', [
+    {'iterations': 0},
+    {'iterations': 2.5},
+    {'iterations': '100'},
+    {'iterations': True},
+    {'seed': 'abc'},
+    {'seed': -1},
+    {'seed': 1.5},
+    {'water_subsidy_input': 'lots'},
+    {'monsoon_modifier': None}
+])
+def test_simulate_policy_rejects_bad_settings(app, client, payload):
+    resp = client.post('/api/simulate_policy', json=dict(payload, run_name='bad'))
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
+    assert client.get('/api/cache_stats').get_json()['results']['entries'] == 0
+    queued = client.post('/api/simulate_policy?async=1', json=payload)
+    assert queued.status_code == 400
+    assert app.extensions['jobs'].stats()['by_status'] == {}
+
+
+def test_simulate_policy_caps_iterations(client):
+    resp = client.post('/api/simulate_policy', json={'iterations': 10**9, 'seed': None})
+    assert resp.status_code == 200
+
+
+@pytest.mark.parametrize('payload', [
+    {'water_subsidy_input': 'abc'},
+    {'climate_policy_input': None},
+    {'monsoon_modifier': float('nan')},
+    {'capacity_pct': -1},
+    {'capacity_pct': float('inf')},
+    {'max_km': float('nan')},
+    {'k': 0}
+])
+def test_migration_flows_rejects_bad_settings(client, payload):
+    resp = client.post('/api/migration_flows', data=json.dumps(payload), content_type='application/json')
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
+
+
+def test_predict_impact_batch_grids_and_zips(client):
+    ids = [d['id'] for d in client.get('/api/districts').get_json()[:3]]
+    product = client.post('/api/predict_impact/batch', json={'district_ids': ids, 'budget': [100, 500],
+                                                             'scale': [25, 50, 75]}).get_json()
+    assert len(product['scenarios']) == 6 and len(product['districts']) == 3
+    zipped = client.post('/api/predict_impact/batch', json={'mode': 'zip', 'budget': [100, 500, 900],
+                                                            'scale': [25, 50, 75]}).get_json()
+    assert [(s['budget'], s['scale']) for s in zipped['scenarios']] == [(100, 25), (500, 50), (900, 75)]
+
+
+@pytest.mark.parametrize('payload', [
+    {'district_ids': '12'},
+    {'district_ids': [[1]]},
+    {'mode': 'diagonal'},
+    {'mode': 'zip', 'budget': [100, 200], 'scale': [1, 2, 3]},
+    {'budget': ['a']},
+    {'time_horizon': []}
+])
+def test_predict_impact_batch_rejects_bad_payloads(client, payload):
+    resp = client.post('/api/predict_impact/batch', json=payload)
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
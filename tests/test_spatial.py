@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend.spatial import SpatialIndex, assign_migration_flows
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(72.6, 80.9, 3_000)
+    y = rng.uniform(15.6, 22.0, 3_000)
+    # A few districts without coordinates are never returned
+    x[::500] = np.nan
+    return x, y
+
+
+def brute_distances(index, x, y, qx, qy):
+    px, py = index.project(x, y)
+    (qx,), (qy,) = index.project([qx], [qy])
+    dist = np.hypot(px - qx, py - qy)
+    return np.where(np.isfinite(dist), dist, np.inf)
+
+
+@pytest.mark.parametrize('query', [(76.0, 19.0), (72.61, 21.9), (90.0, 30.0)])
+def test_knn_matches_brute_force(points, query):
+    x, y = points
+    index = SpatialIndex(x, y)
+    mask = np.random.default_rng(1).random(len(x)) < 0.3
+    for k, m in [(1, None), (25, None), (25, mask)]:
+        positions, distances = index.knn(*query, k, mask=m)
+        dist = brute_distances(index, x, y, *query)
+        if m is not None:
+            dist = np.where(m, dist, np.inf)
+        expected = np.argsort(dist, kind='stable')[:k]
+        assert positions.tolist() == expected.tolist()
+        np.testing.assert_allclose(distances, dist[expected])
+
+
+def test_radius_matches_brute_force(points):
+    x, y = points
+    index = SpatialIndex(x, y)
+    for radius_km in (0.0, 12.5, 80.0):
+        positions, distances = index.radius(76.0, 19.0, radius_km)
+        dist = brute_distances(index, x, y, 76.0, 19.0)
+        expected = np.flatnonzero(dist <= radius_km)
+        expected = expected[np.argsort(dist[expected], kind='stable')]
+        assert positions.tolist() == expected.tolist()
+        np.testing.assert_allclose(distances, dist[expected])
+
+
+def brute_flows(index, x, y, outflow, capacity, max_km=None):
+    """Largest source first, each filling the nearest open destination until placed."""
+    remaining = np.asarray(capacity, dtype=np.float64).copy()
+    flows, unplaced = [], np.zeros(len(outflow))
+    for source in np.argsort(-outflow, kind='stable'):
+        need = outflow[source]
+        if need <= 0:
+            break
+        dist = brute_distances(index, x, y, x[source], y[source])
+        for dest in np.argsort(dist, kind='stable'):
+            if need <= 0 or (max_km is not None and dist[dest] > max_km):
+                break
+            if remaining[dest] <= 0:
+                continue
+            moved = min(need, remaining[dest])
+            flows.append((source, dest, moved))
+            need -= moved
+            remaining[dest] -= moved
+        unplaced[source] = max(need, 0.0)
+    return flows, unplaced
+
+
+@pytest.mark.parametrize('k, max_km', [(1, None), (8, None), (8, 60.0)])
+def test_migration_flows_match_brute_force(k, max_km):
+    rng = np.random.default_rng(2)
+    x = rng.uniform(72.6, 80.9, 400)
+    y = rng.uniform(15.6, 22.0, 400)
+    source = rng.random(400) < 0.4
+    outflow = np.where(source, rng.uniform(100, 5_000, 400), 0.0)
+    capacity = np.where(~source & (rng.random(400) < 0.5), rng.uniform(100, 3_000, 400), 0.0)
+    index = SpatialIndex(x, y)
+
+    (sources, destinations, _, people), unplaced = assign_migration_flows(
+        index, x, y, outflow, capacity, k=k, max_km=max_km
+    )
+
+    expected, expected_unplaced = brute_flows(index, x, y, outflow, capacity, max_km=max_km)
+    assert list(zip(sources.tolist(), destinations.tolist())) == [(s, d) for s, d, _ in expected]
+    np.testing.assert_allclose(people, [moved for _, _, moved in expected])
+    np.testing.assert_allclose(unplaced, expected_unplaced)
+
+
+def test_neighbors_route_matches_brute_force(client, data_dir):
+    df = pd.read_csv(f'{data_dir}/districts.csv')
+    index = SpatialIndex.from_districts(df)
+    row = 7
+    dist = brute_distances(index, df['x_coord'].to_numpy(), df['y_coord'].to_numpy(),
+                           df['x_coord'].iloc[row], df['y_coord'].iloc[row])
+    dist[row] = np.inf
+    nearest = np.argsort(dist, kind='stable')
+
+    body = client.get(f"/api/districts/{df['id'].iloc[row]}/neighbors?k=4").get_json()
+    assert [n['district_id'] for n in body['neighbors']] == df['id'].iloc[nearest[:4]].tolist()
+    assert [n['distance_km'] for n in body['neighbors']] == np.round(dist[nearest[:4]], 2).tolist()
+
+    radius_km = float(dist[nearest[5]]) + 0.01
+    body = client.get(f"/api/districts/{df['id'].iloc[row]}/neighbors?k=50&radius_km={radius_km}").get_json()
+    assert [n['district_id'] for n in body['neighbors']] == df['id'].iloc[nearest[:6]].tolist()
+
+    assert client.get('/api/districts/no-such-district/neighbors').status_code == 404
+    assert client.get(f"/api/districts/{df['id'].iloc[row]}/neighbors?k=0").status_code == 400
+    assert client.get(f"/api/districts/{df['id'].iloc[row]}/neighbors?radius_km=x").status_code == 400
+
+
+def test_migration_flows_route(client, data_dir):
+    response = client.post('/api/migration_flows', json={"water_subsidy_input": 0, "capacity_pct": 0.5, "k": 3})
+    assert response.status_code == 200
+    body = response.get_json()
+    summary = body['summary']
+    assert summary['routed_migrants'] + summary['unplaced_migrants'] == pytest.approx(summary['total_outflow'], abs=1)
+    assert sum(f['migrants'] for f in body['flows']) == pytest.approx(summary['routed_migrants'], abs=len(body['flows']))
+
+    population = pd.read_csv(f'{data_dir}/districts.csv').set_index('id')['population']
+    received = pd.DataFrame(body['flows']).groupby('destination_district_id')['migrants'].sum()
+    assert (received <= population[received.index] * 0.5 / 100 + 1).all()
+
+    assert client.post('/api/migration_flows', json={"k": 0}).status_code == 400
+    assert client.post('/api/migration_flows', json={"water_subsidy_input": "lots"}).status_code == 400
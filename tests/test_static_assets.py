@@ -0,0 +1,90 @@
+import gzip
+import os
+import pytest
+from werkzeug.test import EnvironBuilder
+from backend import static_assets
+from backend.static_assets import IMMUTABLE_CACHE, REVALIDATE_CACHE, StaticAssets
+
+BUNDLE = b'export const rows = [' + b', '.join(b'{"id": %d}' % i for i in range(400)) + b'];\n'
+INDEX = b'<!doctype html><div id="root"></div>'
+
+
+@pytest.fixture
+def build(tmp_path):
+    root = tmp_path / 'dist'
+    (root / 'assets').mkdir(parents=True)
+    (root / 'assets' / 'index-3f2a.js').write_bytes(BUNDLE)
+    (root / 'index.html').write_bytes(INDEX)
+    return root
+
+
+@pytest.fixture
+def static_client(build, data_dir):
+    from backend.server import create_app
+    app = create_app(data_dir, str(build))
+    yield app.test_client()
+    app.extensions['jobs'].shutdown()
+
+
+def test_encoding_negotiation(static_client):
+    plain = static_client.get('/assets/index-3f2a.js', headers={'Accept-Encoding': 'identity'})
+    assert plain.data == BUNDLE
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Cache-Control'] == IMMUTABLE_CACHE
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+
+    gz = static_client.get('/assets/index-3f2a.js', headers={'Accept-Encoding': 'gzip'})
+    assert gz.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gz.data) == BUNDLE
+
+    if static_assets.brotli is not None:
+        br = static_client.get('/assets/index-3f2a.js', headers={'Accept-Encoding': 'gzip, br'})
+        assert br.headers['Content-Encoding'] == 'br'
+        assert static_assets.brotli.decompress(br.data) == BUNDLE
+        assert len({plain.headers['ETag'], gz.headers['ETag'], br.headers['ETag']}) == 3
+
+    # Too small to be worth compressing
+    index = static_client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+    assert index.data == INDEX
+    assert 'Content-Encoding' not in index.headers
+    assert index.headers['Cache-Control'] == REVALIDATE_CACHE
+
+
+def test_conditional_requests_get_304(static_client):
+    first = static_client.get('/assets/index-3f2a.js', headers={'Accept-Encoding': 'gzip'})
+    again = static_client.get('/assets/index-3f2a.js',
+                              headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+    # The gzip ETag does not validate the identity variant
+    other = static_client.get('/assets/index-3f2a.js',
+                              headers={'Accept-Encoding': 'identity', 'If-None-Match': first.headers['ETag']})
+    assert other.status_code == 200
+    assert other.data == BUNDLE
+
+
+def test_client_routes_fall_back_to_index(static_client):
+    response = static_client.get('/policy/simulator')
+    assert response.status_code == 200
+    assert response.data == INDEX
+    assert response.mimetype == 'text/html'
+
+
+def test_new_build_is_picked_up(build):
+    assets = StaticAssets(str(build), check_interval=0)
+    (build / 'index.html').write_bytes(INDEX + b'<!-- v2 -->')
+    os.utime(build / 'index.html', ns=(1, 1))
+    assert assets.stats()['files'] == 2
+
+    response = assets.response('', EnvironBuilder().get_request())
+    assert response.data.endswith(b'<!-- v2 -->')
+
+
+def test_missing_build_is_404(tmp_path, data_dir):
+    from backend.server import create_app
+    app = create_app(data_dir, str(tmp_path / 'no-build'))
+    try:
+        assert app.test_client().get('/').status_code == 404
+    finally:
+        app.extensions['jobs'].shutdown()
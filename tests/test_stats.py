@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from backend.datastore import DatasetRegistry, RunStore
+from backend.stats import MomentsStore, RunningMoments
+
+
+def test_running_moments_match_a_full_recompute():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1_000, 4)) @ rng.normal(size=(4, 4)) + [0, 5, -3, 100]
+    moments = RunningMoments(4, n_blocks=16)
+    for lo, hi in [(0, 1), (1, 37), (37, 500), (500, 1_000)]:
+        moments.update(X[lo:hi])
+
+    assert moments.n == 1_000
+    np.testing.assert_allclose(moments.mean(), X.mean(axis=0))
+    np.testing.assert_allclose(moments.std(), X.std(axis=0, ddof=1))
+    np.testing.assert_allclose(moments.corr(), np.corrcoef(X, rowvar=False), atol=1e-12)
+    rebuilt = RunningMoments.from_matrix(X, n_blocks=16)
+    for ours, theirs in zip(moments.blocks(), rebuilt.blocks()):
+        np.testing.assert_allclose(ours, theirs, atol=1e-9)
+
+
+def test_missing_values_are_imputed_with_the_column_mean():
+    X = np.array([[1.0, 2.0], [np.nan, 4.0], [3.0, np.nan], [5.0, 8.0]])
+    moments = RunningMoments.from_matrix(X)
+    filled = pd.DataFrame(X).fillna(pd.DataFrame(X).mean()).to_numpy()
+    np.testing.assert_allclose(moments.mean(), filled.mean(axis=0))
+    np.testing.assert_allclose(moments.std(), filled.std(axis=0, ddof=1))
+
+
+def test_moments_store_folds_in_appended_rows(tmp_path):
+    (tmp_path / 'points.csv').write_text('x,y\n1,2\n2,5\n4,3\n')
+    datasets = DatasetRegistry(str(tmp_path))
+    store = MomentsStore(datasets, n_blocks=4)
+
+    def matrix(df):
+        return df[['x', 'y']].to_numpy(dtype=float)
+
+    first = store.get('points.csv', 'xy', matrix)
+    for i in range(10):
+        RunStore(datasets).append('points.csv', {'x': i * 1.5, 'y': 10 - i})
+    moments = store.get('points.csv', 'xy', matrix)
+
+    # Folded into a copy; the moments handed out before the appends are unchanged
+    assert moments is not first and first.n == 3
+    assert datasets.stats()['reloads'] == 0
+    X = pd.read_csv(tmp_path / 'points.csv')[['x', 'y']].to_numpy(dtype=float)
+    assert moments.n == len(X)
+    np.testing.assert_allclose(moments.mean(), X.mean(axis=0))
+    np.testing.assert_allclose(moments.corr(), np.corrcoef(X, rowvar=False), atol=1e-12)
@@ -0,0 +1,68 @@
+import json
+import pandas as pd
+from backend import tasks
+from backend.ml_models import PolicyAIModel
+from backend.serialization import NDJSON_MIMETYPE, encode_ndjson, encode_record_lines
+
+
+def ndjson_records(response):
+    body = response.get_data(as_text=True)
+    # Every record, the last one included, ends with a newline
+    assert body.endswith('\n')
+    return [json.loads(line) for line in body[:-1].split('\n')]
+
+
+def test_encode_ndjson_frames_whole_lines_per_block():
+    df = pd.DataFrame({"id": range(25), "x": [i / 3 for i in range(25)], "name": ["a\nb"] * 25})
+    blocks = list(encode_ndjson(df, chunk_rows=10))
+    assert len(blocks) == 3
+    assert all(block.endswith(b'\n') for block in blocks)
+    assert b''.join(blocks).decode('utf-8').split('\n')[:-1] == encode_record_lines(df)
+
+    blocks = list(encode_ndjson(df, positions=[24, 3], columns=['id'], chunk_rows=1))
+    assert blocks == [b'{"id":24}\n', b'{"id":3}\n']
+
+
+def test_table_stream_ends_with_a_summary(client):
+    plain = client.get('/api/districts?sort=-population&population__gt=100000').get_json()
+
+    response = client.get('/api/districts?stream=1&sort=-population&population__gt=100000')
+    assert response.mimetype == NDJSON_MIMETYPE
+    records = ndjson_records(response)
+    assert records[:-1] == plain
+    assert records[-1] == {"summary": {"rows": len(plain), "total": int(response.headers['X-Total-Count'])}}
+
+    response = client.get('/api/districts?limit=3', headers={'Accept': NDJSON_MIMETYPE})
+    records = ndjson_records(response)
+    assert len(records) == 4
+    assert records[-1]['summary']['rows'] == 3
+
+    assert client.get('/api/districts?stream=1&sort=nope').status_code == 400
+
+
+def test_simulate_policy_stream_matches_the_json_response(client, monkeypatch):
+    monkeypatch.setattr(PolicyAIModel, 'STREAM_CHUNK_ROWS', 7)
+    payload = {"water_subsidy_input": 60, "iterations": 5, "seed": 3}
+    plain = client.post('/api/simulate_policy', json=payload).get_json()
+    runs = len(client.get('/api/simulation_runs').get_json())
+
+    response = client.post('/api/simulate_policy?stream=1', json=payload)
+    assert response.mimetype == NDJSON_MIMETYPE
+    records = ndjson_records(response)
+    assert records[:-1] == plain['districts']
+    assert records[-1] == {"summary": plain['summary']}
+    # The streamed run is recorded once the summary is in
+    assert len(client.get('/api/simulation_runs').get_json()) == runs + 1
+
+
+def test_stream_failure_ends_with_an_error_record(client, monkeypatch):
+    def failing(df, params, chunk_rows=None):
+        yield "districts", df[['id']].head(2)
+        raise RuntimeError("model failed")
+
+    monkeypatch.setattr(tasks, 'stream_policy_simulation', failing)
+    response = client.post('/api/simulate_policy?stream=1', json={})
+    assert response.status_code == 200
+    records = ndjson_records(response)
+    assert len(records) == 3
+    assert records[-1] == {"error": "model failed"}
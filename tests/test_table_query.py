@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from werkzeug.datastructures import MultiDict
+from backend.table_query import MAX_LIMIT, QueryError, TableIndex
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 500
+    score = rng.integers(0, 20, n).astype(float)
+    score[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "city": rng.choice(["Pune", "Nagpur", "Latur", "Beed"], n),
+        "score": score,
+        "count": rng.integers(0, 50, n),
+        "date": pd.Series(pd.date_range('2024-01-01', periods=n, freq='D').strftime('%Y-%m-%d')).sample(
+            frac=1, random_state=0).to_numpy()
+    })
+
+
+def select(df, query):
+    positions, cols, total = TableIndex(df).select(MultiDict(query))
+    return positions.tolist(), cols, total
+
+
+@pytest.mark.parametrize('query, mask', [
+    ([("city", "Pune")], lambda d: d['city'] == "Pune"),
+    ([("city", "Pune,Beed")], lambda d: d['city'].isin(["Pune", "Beed"])),
+    ([("city", "Pune"), ("count", "7")], lambda d: (d['city'] == "Pune") & (d['count'] == 7)),
+    ([("score__gte", "5"), ("score__lt", "12")], lambda d: (d['score'] >= 5) & (d['score'] < 12)),
+    ([("score__gt", "5"), ("score__lte", "12")], lambda d: (d['score'] > 5) & (d['score'] <= 12)),
+    ([("date__gte", "2024-03-01"), ("date__lt", "2024-04-01")],
+     lambda d: (d['date'] >= "2024-03-01") & (d['date'] < "2024-04-01")),
+    ([("score", "3.0")], lambda d: d['score'] == 3),
+    ([("city", "Mumbai")], lambda d: d['city'] == "Mumbai"),
+])
+def test_filters_match_pandas(df, query, mask):
+    positions, cols, total = select(df, query)
+    expected = np.flatnonzero(mask(df).to_numpy()).tolist()
+    assert positions == expected
+    assert total == len(expected)
+    assert cols is None
+
+
+@pytest.mark.parametrize('sort', ['score', '-score', 'city', '-city', 'date', '-count'])
+def test_sort_and_paging_match_pandas(df, sort):
+    col = sort.lstrip('-')
+    # Stable, missing values last in both directions
+    expected = df.sort_values(col, ascending=not sort.startswith('-'), kind='stable', na_position='last')
+    expected = expected['id'].tolist()
+
+    assert select(df, [("sort", sort)])[0] == expected
+    positions, _, total = select(df, [("sort", sort), ("offset", "40"), ("limit", "25")])
+    assert positions == expected[40:65]
+    assert total == len(df)
+
+
+def test_filters_sort_and_fields_together(df):
+    positions, cols, total = select(df, [("city", "Latur"), ("sort", "-score"), ("limit", "5"),
+                                         ("fields", "id, score")])
+    matching = df[df['city'] == "Latur"].sort_values('score', ascending=False, kind='stable')
+    assert positions == matching['id'].tolist()[:5]
+    assert cols == ["id", "score"]
+    assert total == len(matching)
+
+
+def test_page_size_is_capped(df):
+    big = pd.DataFrame({"id": np.arange(MAX_LIMIT + 5)})
+    assert len(select(big, [])[0]) == MAX_LIMIT
+    positions, _, _ = TableIndex(big).select(MultiDict([("limit", str(MAX_LIMIT + 5))]), max_limit=None)
+    assert len(positions) == MAX_LIMIT + 5
+
+
+@pytest.mark.parametrize('query', [
+    [("nope", "1")], [("sort", "nope")], [("fields", "id,nope")], [("score__ne", "1")],
+    [("score", "high")], [("limit", "x")], [("offset", "-1")],
+])
+def test_malformed_queries_raise(df, query):
+    with pytest.raises(QueryError):
+        select(df, query)
+
+
+def test_table_routes(client):
+    response = client.get('/api/districts?sort=-population&limit=3&fields=id,population')
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert len(rows) == 3
+    assert all(set(row) == {"id", "population"} for row in rows)
+    assert [r['population'] for r in rows] == sorted((r['population'] for r in rows), reverse=True)
+    assert int(response.headers['X-Total-Count']) == len(client.get('/api/districts').get_json())
+
+    assert client.get('/api/districts?sort=nope').status_code == 400
+    assert client.get('/api/districts?population__ne=1').status_code == 400